@@ -0,0 +1,193 @@
+"""
+Compact seat availability records for the polling fast path.
+
+``search_availability`` on the SRT/Korail clients parses only the fields the
+reservation loop looks at into :class:`Availability` records keyed by train
+number. The full train object is built only for the train that is actually
+reserved. Responses are decoded by :func:`decode`, with orjson when it is
+installed.
+
+:class:`AvailabilityTracker` keeps the last seen seat state of every train and
+reports only what changed between two searches as :class:`Transition` objects,
+so the reservation loop, notifications and history do not re-process
+unchanged rows.
+"""
+
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads
+
+
+def decode(text: str):
+    """Decode a JSON search response (orjson when installed, else json)."""
+    return loads(text)
+
+
+class Availability:
+    """Seat availability of one train in a search result.
+
+    Attributes:
+        train_no: Train number, as in ``train_number`` of the full train
+        dep_time: Departure time (HHMMSS)
+        general: General seats available
+        special: Special seats available
+        standby: Standby (예약대기) available
+    """
+
+    __slots__ = ("train_no", "dep_time", "general", "special", "standby", "_data", "_factory")
+
+    def __init__(self, train_no, dep_time, general, special, standby, data, factory) -> None:
+        self.train_no = train_no
+        self.dep_time = dep_time
+        self.general = general
+        self.special = special
+        self.standby = standby
+        self._data = data
+        self._factory = factory
+
+    def __repr__(self) -> str:
+        return (
+            f"Availability({self.train_no} {self.dep_time}: general={self.general}, "
+            f"special={self.special}, standby={self.standby})"
+        )
+
+    def has_seat(self) -> bool:
+        return self.general or self.special
+
+    def seat_available(self, option) -> bool:
+        """Whether a reservation with ``option`` (SeatType or ReserveOption) can
+        succeed; falls back to standby when the train is sold out."""
+        if not self.has_seat():
+            return self.standby
+        name = getattr(option, "name", option)  # ReserveOption values are plain strings
+        if name in ("GENERAL_FIRST", "SPECIAL_FIRST"):
+            return True
+        if name == "GENERAL_ONLY":
+            return self.general
+        return self.special
+
+    def train(self):
+        """Full train object (SRTTrain or Train) for reserving."""
+        return self._factory(self._data)
+
+
+class SeatKey(NamedTuple):
+    """Identity of a train across searches: number, departure date and route
+    (seat availability differs per route on the same train)."""
+
+    train_no: str
+    date: str
+    dep: str = ""
+    arr: str = ""
+
+
+SeatState = Tuple[bool, bool, bool]  # (general, special, standby)
+
+
+def state_of(availability: Availability) -> SeatState:
+    return (bool(availability.general), bool(availability.special), bool(availability.standby))
+
+
+class Transition:
+    """Change of one train's seat state between two searches.
+
+    Attributes:
+        key: SeatKey of the train
+        before: Previous (general, special, standby) state, None if not seen before
+        availability: Current Availability record
+    """
+
+    __slots__ = ("key", "before", "availability")
+
+    def __init__(self, key: SeatKey, before: Optional[SeatState], availability: Availability) -> None:
+        self.key = key
+        self.before = before
+        self.availability = availability
+
+    def __repr__(self) -> str:
+        return f"Transition({self.key.train_no} {self.key.date}: {self.kind})"
+
+    @property
+    def after(self) -> SeatState:
+        return state_of(self.availability)
+
+    @property
+    def kind(self) -> str:
+        """``"new"``, ``"opened"`` (sold out -> 예약가능), ``"sold_out"``,
+        ``"standby_opened"``, ``"standby_closed"`` or ``"changed"``."""
+        if self.before is None:
+            return "new"
+        had_seat, has_seat = any(self.before[:2]), any(self.after[:2])
+        if has_seat != had_seat:
+            return "opened" if has_seat else "sold_out"
+        if self.before[2] != self.after[2] and not has_seat:
+            return "standby_opened" if self.after[2] else "standby_closed"
+        return "changed"
+
+    def opened_for(self, option) -> bool:
+        """Whether a reservation with ``option`` became possible with this change."""
+        if not self.availability.seat_available(option):
+            return False
+        if self.before is None:
+            return True
+        general, special, standby = self.before
+        was = Availability(self.key.train_no, "", general, special, standby, None, None)
+        return not was.seat_available(option)
+
+
+class AvailabilityTracker:
+    """Last known seat state per train; turns search results into transitions.
+
+    Subscribers are called with every :class:`Transition` in the order of the
+    search result. After a failed reservation, :meth:`invalidate` forgets a
+    train so the next search reports it again if it still shows seats.
+
+    Examples:
+        >>> tracker = AvailabilityTracker()
+        >>> tracker.subscribe(print)
+        >>> transitions = tracker.update(await srt.search_availability(...), date, dep, arr)
+    """
+
+    def __init__(self) -> None:
+        self._states: Dict[SeatKey, SeatState] = {}
+        self._subscribers: List[Callable[[Transition], None]] = []
+
+    def subscribe(self, callback: Callable[[Transition], None]) -> None:
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Transition], None]) -> None:
+        self._subscribers.remove(callback)
+
+    def update(
+        self, availability: Dict[str, Availability], date: str, dep: str = "", arr: str = ""
+    ) -> List[Transition]:
+        """Record a search result and return the trains whose seat state changed.
+
+        Args:
+            availability: Result of ``search_availability``
+            date: Departure date searched (YYYYMMDD)
+            dep: Departure station searched
+            arr: Arrival station searched
+        """
+        transitions = []
+        states = self._states
+        for train_no, record in availability.items():
+            key = SeatKey(train_no, date, dep, arr)
+            state = state_of(record)
+            before = states.get(key)
+            if before != state:
+                states[key] = state
+                transitions.append(Transition(key, before, record))
+        for transition in transitions:
+            for callback in self._subscribers:
+                callback(transition)
+        return transitions
+
+    def state(self, key: SeatKey) -> Optional[SeatState]:
+        return self._states.get(key)
+
+    def invalidate(self, key: SeatKey) -> None:
+        self._states.pop(key, None)
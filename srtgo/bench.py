@@ -0,0 +1,209 @@
+"""
+End-to-end throughput benchmark against the local mock server.
+
+Runs the real SRT/Korail clients (sync and async) against
+:class:`~srtgo.mockserver.MockRailServer` and reports requests/sec, p50/p99
+search latency and the time from seats opening to a finished reservation::
+
+    python -m srtgo.bench --requests 200 --concurrency 8
+"""
+
+import asyncio
+import contextlib
+import io
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List
+
+import click
+
+from .ktx import AsyncKorail, Korail
+from .mockserver import MockConfig, MockRailServer, redirect
+from .pacing import GammaPacer
+from .srt import SRT, AsyncSRT
+from .watch import SearchTarget, WatchEngine
+
+
+ROUTES = {"SRT": ("수서", "부산"), "KTX": ("서울", "부산")}
+CLIENTS = {"SRT": (SRT, AsyncSRT), "KTX": (Korail, AsyncKorail)}
+
+# Dummy credentials; the mock server accepts anything
+USER_ID = "010-0000-0000"
+PASSWORD = "benchmark"
+
+
+@dataclass
+class BenchResult:
+    name: str
+    requests: int
+    elapsed: float
+    latencies: List[float]
+    errors: int = 0
+
+    @property
+    def rps(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def row(self) -> str:
+        return (
+            f"{self.name:<24} {self.requests:>6} {self.rps:>9.1f} "
+            f"{percentile(self.latencies, 50) * 1000:>9.1f} "
+            f"{percentile(self.latencies, 99) * 1000:>9.1f} {self.errors:>6}"
+        )
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[min(int(pct), 99) - 1]
+
+
+def search_args(rail_type: str) -> tuple:
+    date = (datetime.now() + timedelta(days=7)).strftime("%Y%m%d")
+    return (*ROUTES[rail_type], date, "080000")
+
+
+def make_client(server: MockRailServer, rail_type: str, use_async: bool = False):
+    client = CLIENTS[rail_type][use_async](USER_ID, PASSWORD, auto_login=False)
+    # Measure the clients alone, not a request budget coordinator that may be running
+    client._budget = None
+    return redirect(client, server.url)
+
+
+def bench_sync(server: MockRailServer, rail_type: str, requests: int, concurrency: int) -> BenchResult:
+    """Searches from ``concurrency`` threads, one logged-in client per thread."""
+    clients = [make_client(server, rail_type) for _ in range(concurrency)]
+    with contextlib.redirect_stdout(io.StringIO()):  # login banners
+        for client in clients:
+            client.login()
+    args = search_args(rail_type)
+    kwargs = {"available_only": False} if rail_type == "SRT" else {"include_no_seats": True}
+
+    def search(i):
+        start = time.perf_counter()
+        try:
+            clients[i % concurrency].search_train(*args, **kwargs)
+            return time.perf_counter() - start, None
+        except Exception as ex:
+            return time.perf_counter() - start, ex
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(search, range(requests)))
+    elapsed = time.perf_counter() - start
+    return BenchResult(
+        f"{rail_type} sync x{concurrency}",
+        requests,
+        elapsed,
+        [latency for latency, error in results if error is None],
+        sum(error is not None for _, error in results),
+    )
+
+
+async def bench_async(
+    server: MockRailServer, rail_type: str, requests: int, concurrency: int, fast: bool = False
+) -> BenchResult:
+    """Searches from one async client with ``concurrency`` requests in flight.
+
+    With ``fast``, uses ``search_availability`` (the watch engine's fast path).
+    """
+    client = make_client(server, rail_type, use_async=True)
+    args = search_args(rail_type)
+    if fast:
+        search_fn, kwargs = client.search_availability, {}
+    else:
+        search_fn = client.search_train
+        kwargs = {"available_only": False} if rail_type == "SRT" else {"include_no_seats": True}
+    slots = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def search():
+        nonlocal errors
+        async with slots:
+            start = time.perf_counter()
+            try:
+                await search_fn(*args, **kwargs)
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            await client.login()
+        start = time.perf_counter()
+        await asyncio.gather(*(search() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+    finally:
+        await client.close()
+    name = f"{rail_type} async{' fast' if fast else ''} x{concurrency}"
+    return BenchResult(name, requests, elapsed, latencies, errors)
+
+
+async def bench_open_to_reserve(
+    server: MockRailServer, rail_type: str, interval: float, open_after: float = 1.0
+) -> float:
+    """Seconds from seats opening until the watch engine holds the reservation."""
+    client = make_client(server, rail_type, use_async=True)
+    server.reset(seats_open_at=open_after, seats=1)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            await client.login()
+        engine = WatchEngine(
+            client,
+            [SearchTarget(*search_args(rail_type))],
+            pacing=lambda target: GammaPacer(interval, minimum=interval / 4),
+            deadline=datetime.now() + timedelta(seconds=open_after + 30),
+        )
+        result = await engine.run()
+    finally:
+        await client.close()
+    if result is None:
+        raise RuntimeError(f"{rail_type}: no reservation before the deadline")
+    return time.monotonic() - server.seats_open_time()
+
+
+@click.command()
+@click.option("--rail", "rails", type=click.Choice(["SRT", "KTX"]), multiple=True, help="Rails to benchmark (default: both)")
+@click.option("--requests", default=200, show_default=True, help="Searches per throughput run")
+@click.option("--concurrency", default=8, show_default=True, help="Threads / requests in flight")
+@click.option("--latency", default=0.02, show_default=True, help="Mock server latency (s)")
+@click.option("--jitter", default=0.01, show_default=True, help="Mock server latency jitter (s)")
+@click.option("--throttle-rate", default=0.0, show_default=True, help="Fraction of throttled searches")
+@click.option("--interval", default=0.2, show_default=True, help="Mean search interval for the open-to-reserve runs (s)")
+@click.option("--trials", default=3, show_default=True, help="Open-to-reserve runs per rail")
+def main(rails, requests, concurrency, latency, jitter, throttle_rate, interval, trials):
+    """Benchmark the SRT/Korail clients against a local mock server."""
+    config = MockConfig(latency=latency, jitter=jitter, throttle_rate=throttle_rate)
+    with MockRailServer(config) as server:
+        click.echo(f"{'run':<24} {'reqs':>6} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>6}")
+        for rail_type in rails or ("SRT", "KTX"):
+            for result in (
+                bench_sync(server, rail_type, requests, 1),
+                bench_sync(server, rail_type, requests, concurrency),
+                asyncio.run(bench_async(server, rail_type, requests, concurrency)),
+                asyncio.run(bench_async(server, rail_type, requests, concurrency, fast=True)),
+            ):
+                click.echo(result.row())
+
+        click.echo()
+        server.reset(throttle_rate=0.0)
+        for rail_type in rails or ("SRT", "KTX"):
+            times = [
+                asyncio.run(bench_open_to_reserve(server, rail_type, interval))
+                for _ in range(trials)
+            ]
+            click.echo(
+                f"{rail_type} seat open -> reserved: "
+                f"mean {statistics.mean(times) * 1000:.0f} ms, "
+                f"min {min(times) * 1000:.0f} ms, max {max(times) * 1000:.0f} ms "
+                f"({trials} trials, interval {interval}s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
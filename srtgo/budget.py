@@ -0,0 +1,378 @@
+"""
+Host-wide request budget shared by every srtgo process on a machine.
+
+Each worker runs its own reserve loop, so without coordination the aggregate
+request rate to the SRT/Korail servers grows with the number of jobs. A single
+coordinator process owns a token bucket and serves it over a Unix socket::
+
+    srtgo budget --rate 4 --burst 4
+
+Every :class:`~srtgo.srt.SRT` / :class:`~srtgo.ktx.Korail` client created while
+the coordinator is listening draws one token before each API request. Urgent
+requests (reserve, payment) are served ahead of queued searches. Without a
+coordinator the clients send requests unthrottled, as before.
+"""
+
+import asyncio
+import getpass
+import heapq
+import itertools
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import click
+
+
+BUDGET_SOCKET_ENV = "SRTGO_BUDGET_SOCKET"
+
+DEFAULT_RATE = 4.0  # requests per second, all workers together
+DEFAULT_BURST = 4
+
+# Priorities (lower is served first)
+URGENT = 0
+NORMAL = 1
+PRIORITY_NAMES = {URGENT: "urgent", NORMAL: "normal"}
+
+# Seconds between checks whether a queued client is still waiting
+ABANDON_CHECK_INTERVAL = 0.1
+
+# Endpoints that must not queue behind searches: reserving, paying, and the
+# reservation lookups in between (SRT tickets, Korail reservation view/list)
+URGENT_ENDPOINTS = frozenset(
+    {
+        "reserve",
+        "standby_option",
+        "tickets",
+        "myreservationview",
+        "myreservationlist",
+        "payment",
+        "pay",
+    }
+)
+
+
+def priority_of(endpoint: str) -> int:
+    return URGENT if endpoint in URGENT_ENDPOINTS else NORMAL
+
+
+def user_socket(name: str) -> Path:
+    """Per-user default socket ``srtgo-<name>-<user>.sock`` in the temp directory."""
+    try:
+        user = getpass.getuser()
+    except (KeyError, OSError):  # no USER/LOGNAME and no passwd entry
+        user = str(os.getuid())
+    return Path(tempfile.gettempdir()) / f"srtgo-{name}-{user}.sock"
+
+
+def socket_path() -> Path:
+    return Path(os.environ.get(BUDGET_SOCKET_ENV) or user_socket("budget"))
+
+
+class TokenBucket:
+    """Token bucket that hands out tokens strictly by (priority, arrival) order.
+
+    Args:
+        rate: Tokens added per second
+        burst: Maximum number of tokens that can be saved up
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._stats = {
+            p: {"granted": 0, "total_delay": 0.0, "max_delay": 0.0}
+            for p in PRIORITY_NAMES
+        }
+
+    def acquire(
+        self, priority: int = NORMAL, abandoned: Optional[Callable[[], bool]] = None
+    ) -> Optional[float]:
+        """Block until a token is granted.
+
+        Args:
+            priority: URGENT or NORMAL
+            abandoned: Polled while waiting; once it returns True the request
+                leaves the queue without taking a token
+
+        Returns:
+            float: Seconds spent waiting in the queue, None if abandoned
+        """
+        priority = URGENT if priority == URGENT else NORMAL
+        started = time.monotonic()
+        entry = (priority, next(self._seq))
+        check = ABANDON_CHECK_INTERVAL if abandoned else None
+
+        with self._cond:
+            heapq.heappush(self._queue, entry)
+            while True:
+                self._refill()
+                if self._queue[0] == entry:
+                    if self._tokens >= 1:
+                        break
+                    # Only the head of the queue waits for the next token
+                    timeout = (1 - self._tokens) / self.rate
+                    self._cond.wait(min(timeout, check) if check else timeout)
+                else:
+                    self._cond.wait(check)
+                if abandoned and abandoned():
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+                    return None
+
+            heapq.heappop(self._queue)
+            self._tokens -= 1
+            self._cond.notify_all()
+
+            delay = time.monotonic() - started
+            stats = self._stats[priority]
+            stats["granted"] += 1
+            stats["total_delay"] += delay
+            stats["max_delay"] = max(stats["max_delay"], delay)
+        return delay
+
+    def refund(self) -> None:
+        """Return a granted token that was not used."""
+        with self._cond:
+            self._refill()
+            self._tokens = min(self.burst, self._tokens + 1)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "queued": len(self._queue),
+                **{
+                    name: {
+                        "granted": s["granted"],
+                        "avg_delay": s["total_delay"] / s["granted"] if s["granted"] else 0.0,
+                        "max_delay": s["max_delay"],
+                    }
+                    for p, name in PRIORITY_NAMES.items()
+                    for s in (self._stats[p],)
+                },
+            }
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+
+# Coordinator
+if hasattr(socket, "AF_UNIX"):
+
+    class _BudgetHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            # One JSON object per line: {"op": "acquire", "priority": 0} or {"op": "stats"}
+            bucket = self.server.bucket
+            for line in self.rfile:
+                granted = False
+                try:
+                    request = json.loads(line)
+                    if request.get("op") == "stats":
+                        reply = bucket.stats()
+                    else:
+                        # A client cancelled while queued closes its connection;
+                        # do not spend a token on it
+                        delay = bucket.acquire(request.get("priority", NORMAL), self._disconnected)
+                        if delay is None:
+                            return
+                        granted = True
+                        reply = {"delay": delay}
+                except ValueError as ex:
+                    reply = {"error": str(ex)}
+                try:
+                    self.wfile.write(json.dumps(reply).encode() + b"\n")
+                except OSError:
+                    # Closed between the grant and the reply: the token was not used
+                    if granted:
+                        bucket.refund()
+                    return
+
+        def _disconnected(self) -> bool:
+            try:
+                return self.connection.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b""
+            except BlockingIOError:
+                return False
+            except OSError:
+                return True
+
+    class BudgetServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        """Unix socket server granting tokens from a shared :class:`TokenBucket`."""
+
+        daemon_threads = True
+
+        def __init__(self, bucket: TokenBucket, path: Path | None = None) -> None:
+            self.bucket = bucket
+            self.path = Path(path or socket_path())
+            if self.path.exists():
+                if _is_listening(self.path):
+                    raise OSError(f"Budget coordinator already running at {self.path}")
+                self.path.unlink()
+            super().__init__(str(self.path), _BudgetHandler)
+
+        def server_close(self):
+            super().server_close()
+            self.path.unlink(missing_ok=True)
+
+
+def _is_listening(path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+            return True
+        except OSError:
+            return False
+
+
+# Clients
+class BudgetClient:
+    """Blocking client of the budget coordinator, safe to share between threads.
+
+    If the coordinator goes away the client stops throttling instead of failing
+    requests, and reconnects on a later call.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.last_delay = 0.0
+        self._local = threading.local()
+
+    def acquire(self, priority: int = NORMAL) -> float:
+        """Wait for a token; returns the queueing delay in seconds."""
+        try:
+            conn, rfile = self._connection()
+            conn.sendall(json.dumps({"op": "acquire", "priority": priority}).encode() + b"\n")
+            reply = rfile.readline()
+            if not reply:
+                raise ConnectionError("Budget coordinator closed the connection")
+            self.last_delay = json.loads(reply).get("delay", 0.0)
+        except (OSError, ValueError):
+            self.close()
+            self.last_delay = 0.0
+        return self.last_delay
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn[1].close()
+            conn[0].close()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(str(self.path))
+            except OSError:
+                sock.close()
+                raise
+            conn = self._local.conn = (sock, sock.makefile("rb"))
+        return conn
+
+
+class AsyncBudgetClient:
+    """asyncio client of the budget coordinator.
+
+    Each outstanding :meth:`acquire` uses its own connection so an urgent request
+    is never stuck behind a search waiting on the same socket; idle connections
+    are reused.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.last_delay = 0.0
+        self._idle = []
+
+    async def acquire(self, priority: int = NORMAL) -> float:
+        """Wait for a token; returns the queueing delay in seconds."""
+        try:
+            reader, writer = self._idle.pop() if self._idle else (
+                await asyncio.open_unix_connection(str(self.path))
+            )
+        except OSError:
+            self.last_delay = 0.0
+            return self.last_delay
+
+        try:
+            writer.write(json.dumps({"op": "acquire", "priority": priority}).encode() + b"\n")
+            await writer.drain()
+            reply = await reader.readline()
+            if not reply:
+                raise ConnectionError("Budget coordinator closed the connection")
+            self.last_delay = json.loads(reply).get("delay", 0.0)
+        except (OSError, ValueError):
+            writer.close()
+            self.last_delay = 0.0
+        except BaseException:
+            # Cancelled while queued: the reply would be read by the next caller
+            writer.close()
+            raise
+        else:
+            self._idle.append((reader, writer))
+        return self.last_delay
+
+    async def close(self) -> None:
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+
+def connect() -> BudgetClient | None:
+    """Client of the running coordinator, or None if none is listening."""
+    path = socket_path()
+    if not hasattr(socket, "AF_UNIX") or not path.exists():
+        return None
+    return BudgetClient(path)
+
+
+def connect_async() -> AsyncBudgetClient | None:
+    """Async client of the running coordinator, or None if none is listening."""
+    path = socket_path()
+    if not hasattr(socket, "AF_UNIX") or not path.exists():
+        return None
+    return AsyncBudgetClient(path)
+
+
+@click.command()
+@click.option("--rate", default=DEFAULT_RATE, show_default=True, help="Requests per second for all workers")
+@click.option("--burst", default=DEFAULT_BURST, show_default=True, help="Maximum burst size")
+@click.option("--socket", "path", type=click.Path(path_type=Path), default=None, help="Unix socket path")
+@click.option("--report", default=60.0, show_default=True, help="Seconds between queueing delay reports (0: off)")
+def main(rate, burst, path, report):
+    """Run the host-wide request budget coordinator."""
+    bucket = TokenBucket(rate, burst)
+    with BudgetServer(bucket, path) as server:
+        print(f"요청 예산 {rate}/s (burst {burst}) : {server.path}")
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            while True:
+                time.sleep(report or 3600)
+                if report:
+                    print(json.dumps(bucket.stats(), ensure_ascii=False))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
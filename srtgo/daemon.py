@@ -0,0 +1,297 @@
+"""
+Long-running reservation daemon.
+
+The daemon keeps one logged-in client per (rail, account alias) and runs every
+job of that account on it, so several trips watched by one account no longer log
+each other out. Jobs are added and removed at runtime through a Unix control
+socket that speaks one JSON object per line::
+
+    {"cmd": "add", "job": {...job file fields...}}  -> {"ok": true, "id": "1"}
+    {"cmd": "remove", "id": "1"}                    -> {"ok": true}
+    {"cmd": "list"}                                 -> {"ok": true, "jobs": [...]}
+    {"cmd": "shutdown"}                             -> {"ok": true}
+
+``srtgo daemon`` starts it and ``srtgo ctl`` talks to it. With shared polling
+(``srtgo daemon --shared-polling``) jobs of different accounts watching the same
+route and date share one search loop (:class:`~srtgo.watch.SharedPoller`); each
+job still reserves with its own account.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import socket
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional
+
+from .accounts import get_account_credentials
+from .budget import user_socket
+from .cards import get_card_credentials
+from .jobs import Job, JobError, job_from_dict
+from .ktx import AsyncKorail
+from .scheduler import async_wait_for_server_time
+from .srt import AsyncSRT
+from .watch import WARMUP_BEFORE, LoginGuard, SharedPoller, WatchEngine
+
+
+DAEMON_SOCKET_ENV = "SRTGO_DAEMON_SOCKET"
+
+
+def socket_path() -> Path:
+    return Path(os.environ.get(DAEMON_SOCKET_ENV) or user_socket("daemon"))
+
+
+class AccountSession:
+    """One logged-in client shared by all jobs of an account."""
+
+    def __init__(
+        self,
+        rail_type: str,
+        alias: str,
+        debug: bool = False,
+        on_error: Optional[Callable[[Exception, Optional[str]], bool]] = None,
+    ) -> None:
+        user_id, password = get_account_credentials(rail_type, alias)
+        rail_cls = AsyncSRT if rail_type == "SRT" else AsyncKorail
+        self.rail_type = rail_type
+        self.alias = alias
+        self.rail = rail_cls(user_id, password, auto_login=False, verbose=debug)
+        self.login_guard = LoginGuard(self.rail, on_error=on_error)
+        self.jobs = set()
+        self._started = False
+        self._start_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        """Log in (once), keep the login fresh and, for SRT, the NetFunnel key."""
+        async with self._start_lock:
+            if self._started:
+                return
+            if not self.login_guard.logged_in():
+                await self.login_guard.login()
+            self.login_guard.start_monitor()
+            if self.rail_type == "SRT":
+                self.rail.start_netfunnel_refresh()
+            self._started = True
+
+    async def close(self) -> None:
+        await self.login_guard.stop_monitor()
+        await self.rail.close()
+
+
+@dataclass
+class DaemonJob:
+    id: str
+    job: Job
+    status: str = "pending"  # pending, watching, reserved, expired, failed, removed
+    added_at: datetime = field(default_factory=datetime.now)
+    engine: Optional[WatchEngine] = None
+    result: Optional[str] = None
+    error: Optional[str] = None
+    task: Optional[asyncio.Task] = None
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "rail": self.job.rail,
+            "account": self.job.account,
+            "route": f"{self.job.departure}~{self.job.arrival}",
+            "dates": self.job.dates,
+            "status": self.status,
+            "added_at": self.added_at.isoformat(timespec="seconds"),
+            "attempts": self.engine.attempts if self.engine else 0,
+            "rates": self.engine.rates() if self.engine else {},
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class Daemon:
+    """Multiplex reservation jobs over one shared session per account.
+
+    Args:
+        path: Control socket path (default: :func:`socket_path`)
+        debug: Verbose clients
+        on_reserved: Awaited as ``on_reserved(rail, reservation, card_alias)`` after
+            a job reserved a train (payment, notification)
+        on_error: Error callback of the watch engines (see :class:`WatchEngine`)
+        shared_polling: Search each route once per rail for all accounts, on the
+            session of the first job that needed it
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        debug: bool = False,
+        on_reserved: Optional[Callable[[object, object, Optional[str]], Awaitable[None]]] = None,
+        on_error: Optional[Callable[[Exception, Optional[str]], bool]] = None,
+        shared_polling: bool = False,
+    ) -> None:
+        self.path = Path(path or socket_path())
+        self.debug = debug
+        self.on_reserved = on_reserved
+        self.on_error = on_error
+        self.jobs: Dict[str, DaemonJob] = {}
+        self.sessions: Dict[tuple, AccountSession] = {}
+        self.shared_polling = shared_polling
+        self.pollers: Dict[str, tuple] = {}  # rail -> (SharedPoller, AccountSession)
+        self._ids = itertools.count(1)
+        self._stopped = None
+
+    async def serve(self) -> None:
+        """Serve the control socket until a ``shutdown`` command."""
+        self._stopped = asyncio.Event()
+        if self.path.exists():
+            try:
+                send_command({"cmd": "list"}, self.path)
+            except OSError:
+                self.path.unlink()
+            else:
+                raise OSError(f"srtgo daemon already running at {self.path}")
+        server = await asyncio.start_unix_server(self._handle_client, str(self.path))
+        print(f"srtgo daemon: {self.path}", flush=True)
+        try:
+            async with server:
+                await self._stopped.wait()
+        finally:
+            for entry in list(self.jobs.values()):
+                if entry.task:
+                    entry.task.cancel()
+            await asyncio.gather(
+                *(e.task for e in self.jobs.values() if e.task), return_exceptions=True
+            )
+            self.path.unlink(missing_ok=True)
+
+    def add(self, job: Job) -> DaemonJob:
+        if job.card:
+            get_card_credentials(job.card)
+        entry = DaemonJob(str(next(self._ids)), job)
+        session = self._acquire_session(job, entry.id)
+        self.jobs[entry.id] = entry
+        entry.task = asyncio.create_task(self._run(entry, session))
+        return entry
+
+    async def remove(self, job_id: str) -> None:
+        entry = self.jobs.pop(job_id, None)
+        if entry is None:
+            raise KeyError(f"Unknown job id: {job_id}")
+        if entry.task and not entry.task.done():
+            entry.task.cancel()
+            await asyncio.gather(entry.task, return_exceptions=True)
+
+    async def _run(self, entry: DaemonJob, session: AccountSession) -> None:
+        job = entry.job
+        try:
+            start = None
+            if job.start_at and job.start_at > datetime.now():
+                start = await async_wait_for_server_time(
+                    job.start_at, job.rail, job.lead, WARMUP_BEFORE
+                )
+            await session.start()
+
+            entry.engine = WatchEngine(
+                session.rail,
+                job.targets(),
+                passengers=job.passenger_list(),
+                option=job.seat_option(),
+                deadline=job.deadline(),
+                on_error=self.on_error,
+                login_guard=session.login_guard,
+                refresh_netfunnel=False,
+                poller=self._acquire_poller(session) if self.shared_polling else None,
+                speculative=job.speculative,
+                race=job.race,
+            )
+            entry.status = "watching"
+            result = await entry.engine.run(start)
+            if result is None:
+                entry.status = "expired"
+                return
+
+            entry.status = "reserved"
+            entry.result = str(result.reservation)
+            if self.on_reserved:
+                await self.on_reserved(session.rail, result.reservation, job.card)
+        except asyncio.CancelledError:
+            entry.status = "removed"
+            raise
+        except Exception as ex:
+            entry.status = "failed"
+            entry.error = str(ex)
+        finally:
+            await self._release_poller(job.rail)
+            await self._release_session(session, entry.id)
+
+    def _acquire_session(self, job: Job, job_id: str) -> AccountSession:
+        key = (job.rail, job.account)
+        if key not in self.sessions:
+            self.sessions[key] = AccountSession(job.rail, job.account, self.debug, self.on_error)
+        session = self.sessions[key]
+        session.jobs.add(job_id)
+        return session
+
+    def _acquire_poller(self, session: AccountSession) -> SharedPoller:
+        if session.rail_type not in self.pollers:
+            poller = SharedPoller(session.rail, session.login_guard, on_error=self.on_error)
+            # Keep the searching session open while the poller uses it
+            session.jobs.add(f"poller:{session.rail_type}")
+            self.pollers[session.rail_type] = (poller, session)
+        return self.pollers[session.rail_type][0]
+
+    async def _release_poller(self, rail_type: str) -> None:
+        poller, session = self.pollers.get(rail_type, (None, None))
+        if poller is None or poller.routes():
+            return
+        del self.pollers[rail_type]
+        await poller.close()
+        await self._release_session(session, f"poller:{rail_type}")
+
+    async def _release_session(self, session: AccountSession, job_id: str) -> None:
+        session.jobs.discard(job_id)
+        if not session.jobs:
+            self.sessions.pop((session.rail_type, session.alias), None)
+            await session.close()
+
+    async def _handle_client(self, reader, writer) -> None:
+        try:
+            while line := await reader.readline():
+                try:
+                    reply = await self._dispatch(json.loads(line))
+                except (JobError, KeyError, ValueError) as ex:
+                    reply = {"ok": False, "error": str(ex.args[0] if ex.args else ex)}
+                except Exception as ex:
+                    # Bad request shape, keyring or card lookup failures: the
+                    # client still gets a reply
+                    reply = {"ok": False, "error": f"{type(ex).__name__}: {ex}"}
+                writer.write(json.dumps(reply, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request: dict) -> dict:
+        cmd = request.get("cmd")
+        if cmd == "add":
+            entry = self.add(job_from_dict(request["job"]))
+            return {"ok": True, "id": entry.id}
+        if cmd == "remove":
+            await self.remove(str(request["id"]))
+            return {"ok": True}
+        if cmd == "list":
+            return {"ok": True, "jobs": [e.summary() for e in self.jobs.values()]}
+        if cmd == "shutdown":
+            self._stopped.set()
+            return {"ok": True}
+        raise ValueError(f"Unknown command: {cmd!r}")
+
+
+def send_command(request: dict, path: Path | None = None) -> dict:
+    """Send one control command to the running daemon and return its reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(path or socket_path()))
+        sock.sendall(json.dumps(request, ensure_ascii=False, default=str).encode() + b"\n")
+        line = sock.makefile("rb").readline()
+    if not line:
+        raise ConnectionError("srtgo daemon closed the connection without a reply")
+    return json.loads(line)
@@ -0,0 +1,96 @@
+"""
+Structured event log of the reservation loop.
+
+Events are JSON objects written one per line to a rotating file::
+
+    {"ts": "2025-01-01T07:00:00.123", "event": "search", "rail": "SRT",
+     "target": "수서~부산 20250101 080000", "attempt": 12, "latency": 0.084,
+     "outcome": "ok", "seats": [...]}
+
+:func:`emit` only puts the event on a queue; timestamps are taken in the caller
+but JSON encoding and file I/O happen on a background writer thread, so the polling
+loop never waits for the disk. Until :func:`configure` is called, :func:`emit`
+returns immediately and callers can skip building expensive fields by checking
+:func:`enabled`.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+EVENT_LOG_ENV = "SRTGO_EVENT_LOG"
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+
+_queue = None
+_writer = None
+_STOP = object()
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record) -> str:
+        ts = datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds")
+        return json.dumps(
+            {"ts": ts, "event": record.msg, **record.fields},
+            ensure_ascii=False,
+            default=str,
+        )
+
+
+def _write(events: queue.SimpleQueue, handler: logging.Handler) -> None:
+    while (item := events.get()) is not _STOP:
+        created, event, fields = item
+        record = logging.makeLogRecord({"msg": event, "fields": fields})
+        record.created = created
+        handler.handle(record)
+    handler.close()
+
+
+def configure(path, max_bytes: int = MAX_BYTES, backup_count: int = BACKUP_COUNT) -> None:
+    """Start writing events to ``path``, rotated at ``max_bytes``."""
+    global _queue, _writer
+    close()
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+    )
+    handler.setFormatter(_JsonFormatter())
+    _queue = queue.SimpleQueue()
+    _writer = threading.Thread(
+        target=_write, args=(_queue, handler), name="srtgo-events", daemon=True
+    )
+    _writer.start()
+
+
+@atexit.register
+def close() -> None:
+    """Flush pending events and stop the writer thread."""
+    global _queue, _writer
+    events, writer = _queue, _writer
+    _queue = _writer = None
+    if writer is not None:
+        events.put(_STOP)
+        writer.join()
+
+
+def enabled() -> bool:
+    return _queue is not None
+
+
+def emit(event: str, **fields) -> None:
+    """Queue one event; a no-op unless :func:`configure` was called."""
+    events = _queue
+    if events is not None:
+        events.put((time.time(), event, fields))
+
+
+def elapsed(started: float) -> float:
+    """Seconds since ``started`` (``time.monotonic()``), rounded for the log."""
+    return round(time.monotonic() - started, 4)
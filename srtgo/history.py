@@ -0,0 +1,340 @@
+"""
+Persistent seat availability history (SQLite).
+
+The watch engine's :class:`~srtgo.availability.AvailabilityTracker` already
+reduces every search to the trains whose seat state changed, so the history
+stores only those transitions plus a per-hour count of searches per route (and
+per departure date, by days before departure); the state of any train at any
+time can be rebuilt from them. Seat states are
+encoded as a bit mask (:data:`GENERAL`, :data:`SPECIAL`, :data:`STANDBY`).
+
+Like :mod:`srtgo.events`, :func:`record` and :func:`count_search` only queue the
+data; a writer thread inserts it in batches, so the polling loop never waits for
+the disk::
+
+    srtgo --history ~/.srtgo/history.db run job.toml
+    srtgo --history ~/.srtgo/history.db history 수서 부산
+"""
+
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .availability import SeatState, Transition
+from .pacing import LEAD_DAYS, HourlyProfile, LeadTimeProfile, lead_bucket
+
+HISTORY_ENV = "SRTGO_HISTORY"
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 2.0
+
+GENERAL, SPECIAL, STANDBY = 1, 2, 4
+SEATS = GENERAL | SPECIAL
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transitions (
+    ts REAL NOT NULL,
+    rail TEXT NOT NULL,
+    dep TEXT NOT NULL,
+    arr TEXT NOT NULL,
+    date TEXT NOT NULL,
+    train TEXT NOT NULL,
+    dep_time TEXT NOT NULL,
+    before INTEGER,
+    after INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transitions_route ON transitions (dep, arr, ts);
+CREATE TABLE IF NOT EXISTS searches (
+    hour INTEGER NOT NULL,
+    rail TEXT NOT NULL,
+    dep TEXT NOT NULL,
+    arr TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (hour, rail, dep, arr)
+);
+CREATE TABLE IF NOT EXISTS lead_searches (
+    hour INTEGER NOT NULL,
+    lead INTEGER NOT NULL,
+    rail TEXT NOT NULL,
+    dep TEXT NOT NULL,
+    arr TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (hour, lead, rail, dep, arr)
+);
+"""
+
+_path = None
+_queue = None
+_writer = None
+_STOP = object()
+_SEARCH = object()
+
+
+def encode(state: Optional[SeatState]) -> Optional[int]:
+    """(general, special, standby) as a bit mask; None stays None."""
+    if state is None:
+        return None
+    general, special, standby = state
+    return general * GENERAL | special * SPECIAL | standby * STANDBY
+
+
+def connect(path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def lead_days(date: str, ts: float) -> int:
+    """Days from the local date of ``ts`` to the departure ``date`` (YYYYMMDD)."""
+    day = datetime.fromtimestamp(ts).date()
+    return (datetime.strptime(date, "%Y%m%d").date() - day).days
+
+
+def _flush(
+    conn: sqlite3.Connection, rows: list, searches: Counter, leads: Counter
+) -> None:
+    with conn:
+        conn.executemany("INSERT INTO transitions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.executemany(
+            "INSERT INTO searches VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (hour, rail, dep, arr) DO UPDATE SET count = count + excluded.count",
+            [(*key, n) for key, n in searches.items()],
+        )
+        conn.executemany(
+            "INSERT INTO lead_searches VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (hour, lead, rail, dep, arr) DO UPDATE SET count = count + excluded.count",
+            [(*key, n) for key, n in leads.items()],
+        )
+    rows.clear()
+    searches.clear()
+    leads.clear()
+
+
+def _write(items: queue.SimpleQueue, path: Path) -> None:
+    conn = connect(path)
+    rows, searches, leads = [], Counter(), Counter()
+    stop = False
+    while not stop:
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while len(rows) < BATCH_SIZE:
+            try:
+                item = items.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            if item[0] is _SEARCH:
+                _, key, lead = item
+                searches[key] += 1
+                if lead is not None:
+                    leads[(key[0], lead, *key[1:])] += 1
+            else:
+                rows.append(item)
+        if rows or searches:
+            _flush(conn, rows, searches, leads)
+    conn.close()
+
+
+def configure(path) -> None:
+    """Start recording to the SQLite database at ``path``."""
+    global _path, _queue, _writer
+    close()
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connect(path).close()  # fail here, not in the writer thread
+    _path = path
+    _queue = queue.SimpleQueue()
+    _writer = threading.Thread(
+        target=_write, args=(_queue, path), name="srtgo-history", daemon=True
+    )
+    _writer.start()
+
+
+@atexit.register
+def close() -> None:
+    """Write pending records and stop the writer thread."""
+    global _queue, _writer
+    items, writer = _queue, _writer
+    _queue = _writer = None
+    if writer is not None:
+        items.put(_STOP)
+        writer.join()
+
+
+def enabled() -> bool:
+    return _queue is not None
+
+
+def database() -> Optional[Path]:
+    """Path passed to :func:`configure`, if any."""
+    return _path
+
+
+def record(rail: str, transition: Transition) -> None:
+    """Queue one seat state change; a no-op unless :func:`configure` was called.
+
+    Subscribe it to an AvailabilityTracker with ``functools.partial(record, rail)``.
+    """
+    items = _queue
+    if items is not None:
+        key = transition.key
+        items.put(
+            (
+                time.time(),
+                rail,
+                key.dep,
+                key.arr,
+                key.date,
+                key.train_no,
+                transition.availability.dep_time,
+                encode(transition.before),
+                encode(transition.after),
+            )
+        )
+
+
+def count_search(rail: str, dep: str, arr: str, date: Optional[str] = None) -> None:
+    """Count one search of a route in the current hour.
+
+    With the departure ``date`` (YYYYMMDD) the search is also counted by days
+    before departure.
+    """
+    items = _queue
+    if items is not None:
+        now = time.time()
+        lead = lead_days(date, now) if date else None
+        items.put((_SEARCH, (int(now // 3600), rail, dep, arr), lead))
+
+
+def _route_filter(dep: str, arr: str, rail: Optional[str], since: Optional[float]):
+    sql, params = "dep = ? AND arr = ?", [dep, arr]
+    if rail:
+        sql += " AND rail = ?"
+        params.append(rail)
+    if since is not None:
+        sql += " AND ts >= ?"
+        params.append(since)
+    return sql, params
+
+
+def openings(
+    conn: sqlite3.Connection,
+    dep: str,
+    arr: str,
+    rail: Optional[str] = None,
+    since: Optional[float] = None,
+) -> List[tuple]:
+    """Seat openings (sold out -> seats) of a route as (ts, date, train, dep_time)."""
+    where, params = _route_filter(dep, arr, rail, since)
+    return conn.execute(
+        "SELECT ts, date, train, dep_time FROM transitions "
+        f"WHERE {where} AND before IS NOT NULL AND before & {SEATS} = 0 AND after & {SEATS} != 0 "
+        "ORDER BY ts",
+        params,
+    ).fetchall()
+
+
+def openings_per_hour(
+    conn: sqlite3.Connection,
+    dep: str,
+    arr: str,
+    rail: Optional[str] = None,
+    since: Optional[float] = None,
+) -> Dict[int, int]:
+    """Number of seat openings of a route by local hour of day (0-23)."""
+    counts = dict.fromkeys(range(24), 0)
+    for ts, *_ in openings(conn, dep, arr, rail, since):
+        counts[time.localtime(ts).tm_hour] += 1
+    return counts
+
+
+def searches_per_hour(
+    conn: sqlite3.Connection,
+    dep: str,
+    arr: str,
+    rail: Optional[str] = None,
+    since: Optional[float] = None,
+) -> Dict[int, int]:
+    """Number of recorded searches of a route by local hour of day (0-23)."""
+    sql, params = "SELECT hour, count FROM searches WHERE dep = ? AND arr = ?", [dep, arr]
+    if rail:
+        sql += " AND rail = ?"
+        params.append(rail)
+    if since is not None:
+        sql += " AND hour >= ?"
+        params.append(int(since // 3600))
+    counts = dict.fromkeys(range(24), 0)
+    for hour, n in conn.execute(sql, params):
+        counts[time.localtime(hour * 3600).tm_hour] += n
+    return counts
+
+
+def openings_per_lead(
+    conn: sqlite3.Connection,
+    dep: str,
+    arr: str,
+    rail: Optional[str] = None,
+    since: Optional[float] = None,
+) -> Dict[int, int]:
+    """Number of seat openings of a route by :data:`~srtgo.pacing.LEAD_DAYS` bucket."""
+    counts = dict.fromkeys(range(len(LEAD_DAYS)), 0)
+    for ts, date, *_ in openings(conn, dep, arr, rail, since):
+        counts[lead_bucket(lead_days(date, ts))] += 1
+    return counts
+
+
+def searches_per_lead(
+    conn: sqlite3.Connection,
+    dep: str,
+    arr: str,
+    rail: Optional[str] = None,
+    since: Optional[float] = None,
+) -> Dict[int, int]:
+    """Number of recorded searches of a route by :data:`~srtgo.pacing.LEAD_DAYS` bucket."""
+    sql, params = "SELECT lead, count FROM lead_searches WHERE dep = ? AND arr = ?", [dep, arr]
+    if rail:
+        sql += " AND rail = ?"
+        params.append(rail)
+    if since is not None:
+        sql += " AND hour >= ?"
+        params.append(int(since // 3600))
+    counts = dict.fromkeys(range(len(LEAD_DAYS)), 0)
+    for lead, n in conn.execute(sql, params):
+        counts[lead_bucket(lead)] += n
+    return counts
+
+
+def route_profile(
+    conn: sqlite3.Connection,
+    dep: str,
+    arr: str,
+    rail: Optional[str] = None,
+    days: int = 30,
+) -> HourlyProfile:
+    """Hourly search rate profile of a route from the last ``days`` of history."""
+    since = time.time() - days * 86400
+    return HourlyProfile.from_counts(
+        openings_per_hour(conn, dep, arr, rail, since),
+        searches_per_hour(conn, dep, arr, rail, since),
+    )
+
+
+def route_lead_profile(
+    conn: sqlite3.Connection,
+    dep: str,
+    arr: str,
+    rail: Optional[str] = None,
+    days: int = 30,
+) -> LeadTimeProfile:
+    """Search rate profile of a route by days before departure, from the last ``days``."""
+    since = time.time() - days * 86400
+    return LeadTimeProfile.from_counts(
+        openings_per_lead(conn, dep, arr, rail, since),
+        searches_per_lead(conn, dep, arr, rail, since),
+    )
@@ -0,0 +1,260 @@
+"""
+Job files for headless reservation runs (``srtgo run job.toml``).
+
+A job file describes one reservation job in TOML or JSON::
+
+    rail = "SRT"                # SRT or KTX
+    account = "personal"        # login alias (로그인 설정)
+    departure = "수서"
+    arrival = "부산"
+    dates = ["20250101", "20250102"]
+    time = "080000"             # earliest departure (HHMMSS)
+    time_limit = "120000"       # optional: latest departure (HHMMSS)
+    trains = ["305", "307"]     # optional: train numbers, in order of preference
+    seat = "general_first"      # general_first, general_only, special_first, special_only
+    card = "company"            # optional: card alias; pay right after reserving
+    duration = 30               # optional: minutes to keep trying (0: unlimited)
+    start_at = "2025-01-01 07:00:00"  # optional: wait until this time (server clock) first
+    lead = 0.0                  # optional: start this many seconds before start_at
+    race = 1                    # optional: reserve up to this many trains that open at
+                                #   once, keep the most preferred and cancel the rest
+    speculative = false         # optional: at start_at, reserve the first of trains
+                                #   right away without searching first
+    interval = 1.25             # optional: mean seconds between searches
+    pacing = "adaptive"         # optional: adaptive, fixed or history (needs --history)
+    ktx_only = false            # optional (KTX): search KTX trains only
+
+    [passengers]
+    adult = 1
+    child = 0
+"""
+
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .ktx import (
+    STATIONS as KTX_STATIONS,
+    AdultPassenger,
+    ChildPassenger,
+    Disability1To3Passenger,
+    Disability4To6Passenger,
+    ReserveOption,
+    SeniorPassenger,
+    TrainType,
+)
+from .pacing import RESERVE_INTERVAL, GammaPacer
+from .srt import STATION_CODE, Adult, Child, Disability1To3, Disability4To6, SeatType, Senior
+from .watch import SearchTarget, history_pacer
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+
+PASSENGER_CLASSES = {
+    "SRT": {
+        "adult": Adult,
+        "child": Child,
+        "senior": Senior,
+        "disability1to3": Disability1To3,
+        "disability4to6": Disability4To6,
+    },
+    "KTX": {
+        "adult": AdultPassenger,
+        "child": ChildPassenger,
+        "senior": SeniorPassenger,
+        "disability1to3": Disability1To3Passenger,
+        "disability4to6": Disability4To6Passenger,
+    },
+}
+
+STATIONS = {"SRT": tuple(STATION_CODE), "KTX": KTX_STATIONS}
+
+SEAT_OPTIONS = ("general_first", "general_only", "special_first", "special_only")
+
+PACING_MODES = ("adaptive", "fixed", "history")
+
+MAX_PASSENGERS = 9
+
+
+class JobError(ValueError):
+    """Invalid job file."""
+
+
+@dataclass
+class Job:
+    rail: str
+    account: str
+    departure: str
+    arrival: str
+    dates: List[str]
+    time: str = "000000"
+    time_limit: Optional[str] = None
+    trains: Optional[List[str]] = None
+    passengers: Dict[str, int] = field(default_factory=lambda: {"adult": 1})
+    seat: str = "general_first"
+    card: Optional[str] = None
+    duration: int = 0
+    start_at: Optional[datetime] = None
+    lead: float = 0.0
+    race: int = 1
+    speculative: bool = False
+    interval: float = RESERVE_INTERVAL
+    pacing: str = "adaptive"
+    ktx_only: bool = False
+
+    def __post_init__(self) -> None:
+        self.rail = self.rail.upper()
+        if self.rail not in PASSENGER_CLASSES:
+            raise JobError(f"rail must be SRT or KTX, not {self.rail!r}")
+        for station in (self.departure, self.arrival):
+            if station not in STATIONS[self.rail]:
+                raise JobError(f"Unknown {self.rail} station: {station!r}")
+        if self.departure == self.arrival:
+            raise JobError("출발역과 도착역이 같습니다")
+        if not self.dates:
+            raise JobError("dates is empty")
+        for date in self.dates:
+            _check_format(date, "%Y%m%d", "date")
+        _check_format(self.time, "%H%M%S", "time")
+        if self.time_limit:
+            _check_format(self.time_limit, "%H%M%S", "time_limit")
+        if self.trains is not None:
+            self.trains = [str(train) for train in self.trains]
+
+        unknown = set(self.passengers) - set(PASSENGER_CLASSES[self.rail])
+        if unknown:
+            raise JobError(f"Unknown passenger types: {', '.join(sorted(unknown))}")
+        total = sum(self.passengers.values())
+        if total < 1:
+            raise JobError("승객수는 0이 될 수 없습니다")
+        if total > MAX_PASSENGERS:
+            raise JobError(f"승객수는 {MAX_PASSENGERS}명을 초과할 수 없습니다")
+
+        if self.seat.lower() not in SEAT_OPTIONS:
+            raise JobError(f"seat must be one of {', '.join(SEAT_OPTIONS)}")
+        if self.duration < 0:
+            raise JobError("duration must not be negative")
+        if self.interval <= 0:
+            raise JobError("interval must be positive")
+        if self.race < 1:
+            raise JobError("race must be at least 1")
+        self.pacing = self.pacing.lower()
+        if self.pacing not in PACING_MODES:
+            raise JobError(f"pacing must be one of {', '.join(PACING_MODES)}")
+        if isinstance(self.start_at, str):
+            try:
+                self.start_at = datetime.fromisoformat(self.start_at)
+            except ValueError:
+                raise JobError(f"Invalid start_at: {self.start_at!r}")
+        if self.start_at is not None:
+            if not isinstance(self.start_at, datetime):
+                raise JobError(f"Invalid start_at: {self.start_at!r}")
+            if self.start_at.tzinfo is not None:
+                # Compared with datetime.now(): keep it in naive local time
+                self.start_at = self.start_at.astimezone().replace(tzinfo=None)
+        if self.speculative and not (self.start_at and self.trains):
+            # Without both the engine would silently just poll
+            raise JobError("speculative needs start_at and trains")
+
+    @property
+    def is_srt(self) -> bool:
+        return self.rail == "SRT"
+
+    def passenger_list(self) -> list:
+        classes = PASSENGER_CLASSES[self.rail]
+        return [classes[key](count) for key, count in self.passengers.items() if count > 0]
+
+    def seat_option(self):
+        return getattr(SeatType if self.is_srt else ReserveOption, self.seat.upper())
+
+    def targets(self) -> List[SearchTarget]:
+        """Search targets of the job, each with its rate controller unless adaptive."""
+        options = {"train_type": TrainType.KTX} if self.ktx_only and not self.is_srt else {}
+        targets = [
+            SearchTarget(
+                dep=self.departure,
+                arr=self.arrival,
+                date=date,
+                time=self.time,
+                trains=self.trains,
+                time_limit=self.time_limit,
+                interval=self.interval,
+                options=dict(options),
+            )
+            for date in self.dates
+        ]
+        if self.pacing == "fixed":
+            for target in targets:
+                target.pacer = GammaPacer(target.interval)
+        elif self.pacing == "history":
+            try:
+                pacing = history_pacer(self.rail)
+            except RuntimeError as ex:
+                raise JobError(str(ex))
+            for target in targets:
+                target.pacer = pacing(target)
+        return targets
+
+    def deadline(self) -> Optional[datetime]:
+        """End of the reservation window, counted from ``start_at`` (or now)."""
+        if not self.duration:
+            return None
+        return (self.start_at or datetime.now()) + timedelta(minutes=self.duration)
+
+
+def _check_format(value: str, fmt: str, name: str) -> None:
+    try:
+        datetime.strptime(value, fmt)
+    except (TypeError, ValueError):
+        raise JobError(f"Invalid {name}: {value!r}")
+
+
+def load_job(path) -> Job:
+    """Read a job from a ``.toml`` or ``.json`` file.
+
+    Raises:
+        JobError: If the file cannot be parsed or describes an invalid job
+    """
+    return job_from_dict(read_job_file(path))
+
+
+def read_job_file(path) -> dict:
+    """Parse a ``.toml`` or ``.json`` job file without validating it."""
+    path = Path(path)
+    try:
+        if path.suffix.lower() == ".toml":
+            if tomllib is None:
+                raise JobError("TOML job files need Python 3.11+ or the tomli package")
+            with path.open("rb") as f:
+                data = tomllib.load(f)
+        else:
+            data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as ex:
+        if isinstance(ex, JobError):
+            raise
+        raise JobError(f"Cannot read job file {path}: {ex}")
+
+    if not isinstance(data, dict):
+        raise JobError("A job file must contain a single table/object")
+    return data
+
+
+def job_from_dict(data: dict) -> Job:
+    """Build a validated :class:`Job` from parsed job file data."""
+    data = dict(data)
+    if "date" in data and "dates" not in data:
+        data["dates"] = [data.pop("date")]
+    data["dates"] = [str(date) for date in data.get("dates", [])]
+
+    try:
+        return Job(**data)
+    except TypeError as ex:
+        raise JobError(str(ex))
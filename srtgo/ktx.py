@@ -6,6 +6,7 @@ korail2.korail2
 :license: BSD, see LICENSE for more details.
 """
 
+import asyncio
 import base64
 import curl_cffi
 import itertools
@@ -14,9 +15,13 @@ import re
 import time
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from functools import reduce
 
+from . import budget, events, metrics
+from .availability import Availability, decode
+
 
 # Constants
 EMAIL_REGEX = re.compile(r"[^@]+@[^@]+\.[^@]+")
@@ -48,11 +53,67 @@ API_ENDPOINTS = {
     "code": f"{KORAIL_MOBILE}.common.code.do",
 }
 
+# Stations of the station menu, also accepted in job files
+STATIONS = (
+    "서울",
+    "용산",
+    "영등포",
+    "광명",
+    "수원",
+    "천안아산",
+    "오송",
+    "대전",
+    "서대전",
+    "김천구미",
+    "동대구",
+    "경주",
+    "포항",
+    "밀양",
+    "구포",
+    "부산",
+    "울산(통도사)",
+    "마산",
+    "창원중앙",
+    "경산",
+    "논산",
+    "익산",
+    "정읍",
+    "광주송정",
+    "목포",
+    "전주",
+    "순천",
+    "여수EXPO",
+    "청량리",
+    "강릉",
+    "행신",
+    "정동진",
+)
+
+# Maximum number of concurrent per-ticket/per-reservation detail requests
+DETAIL_FETCH_CONCURRENCY = 8
+
 
 # Schedule classes
 class Schedule:
     """Base class for train schedules"""
 
+    __slots__ = (
+        "train_type",
+        "train_type_name",
+        "train_group",
+        "train_no",
+        "delay_time",
+        "dep_name",
+        "dep_code",
+        "dep_date",
+        "dep_time",
+        "arr_name",
+        "arr_code",
+        "arr_date",
+        "arr_time",
+        "run_date",
+    )
+
     def __init__(self, data):
         self.train_type = data.get("h_trn_clsf_cd")
         self.train_type_name = data.get("h_trn_clsf_nm")
@@ -90,6 +151,14 @@ class Schedule:
 class Train(Schedule):
     """Train schedule with seat availability"""
 
+    __slots__ = (
+        "reserve_possible",
+        "reserve_possible_name",
+        "special_seat",
+        "general_seat",
+        "wait_reserve_flag",
+    )
+
     def __init__(self, data):
         super().__init__(data)
         self.reserve_possible = data.get("h_rsv_psb_flg")
@@ -140,6 +209,22 @@ class Train(Schedule):
 class Ticket(Train):
     """Train ticket information"""
 
+    __slots__ = (
+        "seat_no_end",
+        "seat_no_count",
+        "buyer_name",
+        "sale_date",
+        "pnr_no",
+        "sale_info1",
+        "sale_info2",
+        "sale_info3",
+        "sale_info4",
+        "price",
+        "car_no",
+        "seat_no",
+        "is_ticket",  # set by the reservation menu
+    )
+
     def __init__(self, data):
         raw_data = data["ticket_list"][0]["train_info"][0]
         super().__init__(raw_data)
@@ -178,6 +263,21 @@ class Ticket(Train):
 class Reservation(Train):
     """Train reservation information"""
 
+    __slots__ = (
+        "rsv_id",
+        "seat_no_count",
+        "buy_limit_date",
+        "buy_limit_time",
+        "price",
+        "journey_no",
+        "journey_cnt",
+        "rsv_chg_no",
+        "is_waiting",
+        "tickets",  # set by Korail.reservations
+        "wct_no",
+        "is_ticket",  # set by the reservation menu
+    )
+
     def __init__(self, data):
         super().__init__(data)
         self.dep_date = data.get("h_run_dt")
@@ -211,6 +311,17 @@ class Reservation(Train):
 class Seat:
     """Train seat information"""
 
+    __slots__ = (
+        "car",
+        "seat",
+        "seat_type",
+        "passenger_type",
+        "price",
+        "original_price",
+        "discount",
+        "is_waiting",
+    )
+
     def __init__(self, data: dict):
         self.car = data.get("h_srcar_no")
         self.seat = data.get("h_seat_no")
@@ -415,7 +526,7 @@ class NetFunnelHelper:
     }
 
     def __init__(self):
-        self._session = curl_cffi.Session(impersonate="chrome131_android")
+        self._session = self._create_session()
         self._session.headers.update(self.DEFAULT_HEADERS)
         self._cached_key = None
         self._last_fetch_time = 0
@@ -451,6 +562,9 @@ class NetFunnelHelper:
         self._cached_key = None
         self._last_fetch_time = 0
 
+    def _create_session(self):
+        return curl_cffi.Session(impersonate="chrome131_android")
+
     def _start(self):
         return self._make_request("getTidchkEnter")
 
@@ -462,9 +576,12 @@ class NetFunnelHelper:
 
     def _make_request(self, opcode: str):
         params = self._build_params(self.OP_CODE[opcode])
-        response = self._parse(
+        return self._handle_response(
             self._session.get(self.NETFUNNEL_URL, params=params).text
         )
+
+    def _handle_response(self, text: str):
+        response = self._parse(text)
         return response.get("status"), response.get("key"), response.get("nwait")
 
     def _build_params(self, opcode: str, key: str = None) -> dict:
@@ -497,12 +614,65 @@ class NetFunnelHelper:
         )
 
 
+class AsyncNetFunnelHelper(NetFunnelHelper):
+    """NetFunnelHelper for asyncio clients.
+
+    Waits in the queue with ``asyncio.sleep`` so one route stuck in the queue does
+    not stall the other coroutines, and lets concurrent callers share one key.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = asyncio.Lock()
+
+    async def run(self):
+        if self._is_cache_valid(time.time()):
+            return self._cached_key
+
+        async with self._lock:
+            current_time = time.time()
+            if self._is_cache_valid(current_time):
+                return self._cached_key
+
+            try:
+                status, self._cached_key, nwait = await self._start()
+                self._last_fetch_time = current_time
+
+                while status == self.WAIT_STATUS_FAIL:
+                    print(f"\r현재 {nwait}명 대기중...", end="", flush=True)
+                    await asyncio.sleep(1)
+                    status, self._cached_key, nwait = await self._check()
+
+                status, _, _ = await self._complete()
+                if status == self.WAIT_STATUS_PASS or status == self.ALREADY_COMPLETED:
+                    return self._cached_key
+
+                self.clear()
+                raise NetFunnelError("Failed to complete NetFunnel")
+
+            except Exception as ex:
+                self.clear()
+                raise NetFunnelError(str(ex))
+
+    async def close(self):
+        await self._session.close()
+
+    def _create_session(self):
+        return curl_cffi.AsyncSession(impersonate="chrome131_android")
+
+    async def _make_request(self, opcode: str):
+        params = self._build_params(self.OP_CODE[opcode])
+        r = await self._session.get(self.NETFUNNEL_URL, params=params)
+        return self._handle_response(r.text)
+
+
 class Korail:
     """Main Korail API interface"""
 
     def __init__(self, korail_id, korail_pw, auto_login=True, verbose=False):
-        self._session = curl_cffi.Session(impersonate="chrome131_android")
+        self._session = self._create_session()
         self._session.headers.update(DEFAULT_HEADERS)
+        self._budget = self._create_budget()
         self._device = "AD"
         self._version = "240531001"
         self._key = "korail1234567890"
@@ -518,15 +688,50 @@ class Korail:
         if auto_login:
             self.login(korail_id, korail_pw)
 
+    def _create_session(self):
+        return curl_cffi.Session(impersonate="chrome131_android")
+
+    def _create_budget(self):
+        return budget.connect()
+
     def _log(self, msg: str) -> None:
         if self.verbose:
             print(f"[*] {msg}")
 
-    def __enc_password(self, password):
-        url = API_ENDPOINTS["code"]
-        data = {"code": "app.login.cphd"}
-        r = self._session.post(url, data=data)
-        j = json.loads(r.text)
+    def _on_response(self, endpoint, r, latency):
+        metrics.REQUEST_SECONDS.observe(latency, "KTX", endpoint)
+        events.emit(
+            "request",
+            rail="KTX",
+            endpoint=endpoint,
+            status=r.status_code,
+            size=len(r.text),
+            latency=round(latency, 4),
+        )
+        self._log(r.text)
+
+    def _wait_budget(self, endpoint):
+        if self._budget:
+            delay = self._budget.acquire(budget.priority_of(endpoint))
+            if delay >= 0.001:
+                self._log(f"Waited {delay:.3f}s for the request budget")
+
+    def _get(self, endpoint, **kwargs):
+        self._wait_budget(endpoint)
+        start = time.perf_counter()
+        r = self._session.get(API_ENDPOINTS[endpoint], **kwargs)
+        self._on_response(endpoint, r, time.perf_counter() - start)
+        return r
+
+    def _post(self, endpoint, **kwargs):
+        self._wait_budget(endpoint)
+        start = time.perf_counter()
+        r = self._session.post(API_ENDPOINTS[endpoint], **kwargs)
+        self._on_response(endpoint, r, time.perf_counter() - start)
+        return r
+
+    def _enc_password(self, code_response, password):
+        j = json.loads(code_response)
 
         if j["strResult"] == "SUCC" and j.get("app.login.cphd"):
             self._idx = j["app.login.cphd"]["idx"]
@@ -540,12 +745,20 @@ class Korail:
             ).decode("utf-8")
         return False
 
+    @metrics.instrumented("KTX")
     def login(self, korail_id=None, korail_pw=None):
+        self._set_credentials(korail_id, korail_pw)
+        r = self._post("code", data={"code": "app.login.cphd"})
+        r = self._post("login", data=self._login_data(r.text))
+        return self._on_login(r.text)
+
+    def _set_credentials(self, korail_id, korail_pw):
         if korail_id:
             self.korail_id = korail_id
         if korail_pw:
             self.korail_pw = korail_pw
 
+    def _login_data(self, code_response):
         txt_input_flg = (
             "5"
             if EMAIL_REGEX.match(self.korail_id)
@@ -554,19 +767,18 @@ class Korail:
             else "2"
         )
 
-        data = {
+        return {
             "Device": self._device,
             "Version": self._version,
             "Key": self._key,
             "txtMemberNo": self.korail_id,
-            "txtPwd": self.__enc_password(self.korail_pw),
+            "txtPwd": self._enc_password(code_response, self.korail_pw),
             "txtInputFlg": txt_input_flg,
             "idx": self._idx,
         }
 
-        r = self._session.post(API_ENDPOINTS["login"], data=data)
-        self._log(r.text)
-        j = json.loads(r.text)
+    def _on_login(self, text):
+        j = json.loads(text)
 
         if j["strResult"] == "SUCC" and j.get("strMbCrdNo"):
             # self._key = j['Key']
@@ -583,10 +795,19 @@ class Korail:
         return False
 
     def logout(self):
-        r = self._session.get(API_ENDPOINTS["logout"])
-        self._log(r.text)
+        self._get("logout")
         self.logined = False
 
+    def adopt_login(self, other):
+        """Continue the login session of another client (e.g. a logged-in
+        :class:`Korail` for an :class:`AsyncKorail`) instead of logging in again."""
+        self._session.cookies.update(other._session.cookies)
+        self.logined = other.logined
+        self.membership_number = other.membership_number
+        self.name = other.name
+        self.email = other.email
+        self.phone_number = other.phone_number
+
     def _result_check(self, j):
         if j.get("strResult") == "FAIL":
             h_msg_cd = j.get("h_msg_cd")
@@ -597,6 +818,7 @@ class Korail:
             raise KorailError(h_msg_txt, h_msg_cd)
         return True
 
+    @metrics.instrumented("KTX")
     def search_train(
         self,
         dep,
@@ -608,6 +830,20 @@ class Korail:
         include_no_seats=False,
         include_waiting_list=False,
     ):
+        params = self._search_train_params(dep, arr, date, time, train_type, passengers)
+        r = self._get("search_schedule", params=params)
+        return self._parse_search_train(r.text, include_no_seats, include_waiting_list)
+
+    @metrics.instrumented("KTX")
+    def search_availability(
+        self, dep, arr, date=None, time=None, train_type=TrainType.ALL, passengers=None
+    ):
+        """Like search_train, but return only seat availability keyed by train number."""
+        params = self._search_train_params(dep, arr, date, time, train_type, passengers)
+        r = self._get("search_schedule", params=params)
+        return self._parse_availability(r.text)
+
+    def _search_train_params(self, dep, arr, date, time, train_type, passengers):
         kst_now = datetime.now() + timedelta(hours=9)
         date = date or kst_now.strftime("%Y%m%d")
         time = time or kst_now.strftime("%H%M%S")
@@ -631,7 +867,7 @@ class Korail:
             ),
         }
 
-        data = {
+        return {
             "Device": self._device,
             "Version": self._version,
             "Sid": "",
@@ -658,9 +894,26 @@ class Korail:
             "mbCrdNo": self.membership_number,
         }
 
-        r = self._session.get(API_ENDPOINTS["search_schedule"], params=data)
-        self._log(r.text)
-        j = json.loads(r.text)
+    def _parse_availability(self, text):
+        j = decode(text)
+        self._result_check(j)
+        availability = {}
+        for info in j.get("trn_infos", {}).get("trn_info", []):
+            availability[info["h_trn_no"]] = Availability(
+                info["h_trn_no"],
+                info["h_dpt_tm"],
+                info.get("h_gen_rsv_cd") == "11",
+                info.get("h_spe_rsv_cd") == "11",
+                int(info.get("h_wait_rsv_flg") or 0) == 9,
+                info,
+                Train,
+            )
+        if not availability:
+            raise NoResultsError()
+        return availability
+
+    def _parse_search_train(self, text, include_no_seats, include_waiting_list):
+        j = json.loads(text)
 
         if self._result_check(j):
             trains = [
@@ -680,7 +933,18 @@ class Korail:
 
             return trains
 
+    @metrics.instrumented("KTX")
     def reserve(self, train, passengers=None, option=ReserveOption.GENERAL_FIRST):
+        r = self._get("reserve", params=self._reserve_params(train, passengers, option))
+        return self._found(self.reservations(self._parse_reserve(r.text)))
+
+    @staticmethod
+    def _found(reservation):
+        if reservation is None:
+            raise KorailError("Reservation not found: check reservation status")
+        return reservation
+
+    def _reserve_params(self, train, passengers, option):
         reserving_seat = train.has_seat() or train.wait_reserve_flag < 0
         if reserving_seat:
             is_special_seat = {
@@ -746,18 +1010,43 @@ class Korail:
         for i, psg in enumerate(passengers, 1):
             data.update(psg.get_dict(i))
 
-        r = self._session.get(API_ENDPOINTS["reserve"], params=data)
-        self._log(r.text)
-        j = json.loads(r.text)
+        return data
+
+    def _parse_reserve(self, text):
+        j = json.loads(text)
         if self._result_check(j):
-            rsv_id = j.get("h_pnr_no")
-            reservation = self.reservations(rsv_id)
-            return reservation
-        else:
-            raise SoldOutError()
+            return j.get("h_pnr_no")
+        raise SoldOutError()
 
     def tickets(self):
-        data = {
+        r = self._get("myticketlist", params=self._tickets_params())
+        try:
+            tickets = self._parse_tickets(r.text)
+            for ticket, r in zip(tickets, self._map(self._fetch_ticket_seat, tickets)):
+                self._apply_ticket_seat(ticket, r.text)
+            return tickets
+        except NoResultsError:
+            return []
+
+    def _map(self, fn, items):
+        """Run blocking detail requests in parallel, keeping the input order."""
+        if len(items) < 2:
+            return [fn(item) for item in items]
+        workers = min(len(items), DETAIL_FETCH_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(fn, items))
+
+    def _fetch_ticket_seat(self, ticket):
+        self._wait_budget("myticketseat")
+        start = time.perf_counter()
+        r = self._session.get(
+            API_ENDPOINTS["myticketseat"], params=self._ticket_seat_params(ticket)
+        )
+        self._on_response("myticketseat", r, time.perf_counter() - start)
+        return r
+
+    def _tickets_params(self):
+        return {
             "Device": self._device,
             "Version": self._version,
             "Key": self._key,
@@ -769,79 +1058,98 @@ class Korail:
             "hiduserYn": "Y",
         }
 
-        r = self._session.get(API_ENDPOINTS["myticketlist"], params=data)
-        self._log(r.text)
-        j = json.loads(r.text)
-        try:
-            if self._result_check(j):
-                tickets = []
-                for info in j.get("reservation_list", []):
-                    ticket = Ticket(info)
-                    data = {
-                        "Device": self._device,
-                        "Version": self._version,
-                        "Key": self._key,
-                        "h_orgtk_wct_no": ticket.sale_info1,
-                        "h_orgtk_ret_sale_dt": ticket.sale_info2,
-                        "h_orgtk_sale_sqno": ticket.sale_info3,
-                        "h_orgtk_ret_pwd": ticket.sale_info4,
-                    }
-                    r = self._session.get(API_ENDPOINTS["myticketseat"], params=data)
-                    j = json.loads(r.text)
-                    if self._result_check(j):
-                        seat = (
-                            j.get("ticket_infos", {})
-                            .get("ticket_info", [{}])[0]
-                            .get("tk_seat_info", [{}])[0]
-                        )
-                        ticket.seat_no = seat.get("h_seat_no")
-                        ticket.seat_no_end = None
-                    tickets.append(ticket)
-                return tickets
-        except NoResultsError:
-            return []
+    def _parse_tickets(self, text):
+        j = json.loads(text)
+        if self._result_check(j):
+            return [Ticket(info) for info in j.get("reservation_list", [])]
 
-    def reservations(self, rsv_id=None):
-        data = {
+    def _ticket_seat_params(self, ticket):
+        return {
             "Device": self._device,
             "Version": self._version,
             "Key": self._key,
+            "h_orgtk_wct_no": ticket.sale_info1,
+            "h_orgtk_ret_sale_dt": ticket.sale_info2,
+            "h_orgtk_sale_sqno": ticket.sale_info3,
+            "h_orgtk_ret_pwd": ticket.sale_info4,
         }
-        r = self._session.get(API_ENDPOINTS["myreservationview"], params=data)
-        self._log(r.text)
-        j = json.loads(r.text)
-        try:
-            if not self._result_check(j):
-                return []
 
-            jrny_info = j.get("jrny_infos", {}).get("jrny_info", [])
-            reserves = []
-
-            for info in jrny_info:
-                train_info = info.get("train_infos", {}).get("train_info", [])
-                for tinfo in train_info:
-                    reservation = Reservation(tinfo)
-                    reservation.tickets, reservation.wct_no = self.ticket_info(
-                        reservation.rsv_id
-                    )
-                    if rsv_id and reservation.rsv_id == rsv_id:
-                        return reservation
-                    reserves.append(reservation)
-            return reserves
+    def _apply_ticket_seat(self, ticket, text):
+        j = json.loads(text)
+        if self._result_check(j):
+            seat = (
+                j.get("ticket_infos", {})
+                .get("ticket_info", [{}])[0]
+                .get("tk_seat_info", [{}])[0]
+            )
+            ticket.seat_no = seat.get("h_seat_no")
+            ticket.seat_no_end = None
+
+    @metrics.instrumented("KTX")
+    def reservations(self, rsv_id=None):
+        """List reservations, or look up a single one.
 
+        With ``rsv_id`` only the matching reservation has its seat details
+        fetched, and it is returned on its own (None if it is not found).
+        Without it, seat details of all reservations are fetched in parallel.
+        """
+        r = self._get("myreservationview", params=self._reservations_params())
+        try:
+            reserves = self._parse_reservations(r.text)
         except NoResultsError:
+            return None if rsv_id else []
+
+        if rsv_id:
+            reservation = self._pick(reserves, rsv_id)
+            if reservation:
+                self._set_ticket_info(reservation, self.ticket_info(rsv_id))
+            return reservation
+
+        infos = self._map(self.ticket_info, [x.rsv_id for x in reserves])
+        for reservation, info in zip(reserves, infos):
+            self._set_ticket_info(reservation, info)
+        return reserves
+
+    @staticmethod
+    def _pick(reserves, rsv_id):
+        return next((x for x in reserves if x.rsv_id == rsv_id), None)
+
+    @staticmethod
+    def _set_ticket_info(reservation, info):
+        reservation.tickets, reservation.wct_no = info or ([], None)
+
+    def _reservations_params(self):
+        return {
+            "Device": self._device,
+            "Version": self._version,
+            "Key": self._key,
+        }
+
+    def _parse_reservations(self, text):
+        j = json.loads(text)
+        if not self._result_check(j):
             return []
 
+        return [
+            Reservation(tinfo)
+            for info in j.get("jrny_infos", {}).get("jrny_info", [])
+            for tinfo in info.get("train_infos", {}).get("train_info", [])
+        ]
+
     def ticket_info(self, rsv_id=None):
-        data = {
+        r = self._get("myreservationlist", params=self._ticket_info_params(rsv_id))
+        return self._parse_ticket_info(r.text)
+
+    def _ticket_info_params(self, rsv_id):
+        return {
             "Device": self._device,
             "Version": self._version,
             "Key": self._key,
             "hidPnrNo": rsv_id,
         }
-        r = self._session.get(API_ENDPOINTS["myreservationlist"], params=data)
-        self._log(r.text)
-        j = json.loads(r.text)
+
+    def _parse_ticket_info(self, text):
+        j = json.loads(text)
         try:
             if not self._result_check(j):
                 return []
@@ -854,6 +1162,7 @@ class Korail:
         except NoResultsError:
             return None
 
+    @metrics.instrumented("KTX")
     def pay_with_card(
         self,
         rsv,
@@ -863,11 +1172,33 @@ class Korail:
         card_expire,
         installment=0,
         card_type="J",
+    ):
+        data = self._pay_data(
+            rsv,
+            card_number,
+            card_password,
+            birthday,
+            card_expire,
+            installment,
+            card_type,
+        )
+        r = self._post("pay", data=data)
+        return self._result_check(json.loads(r.text))
+
+    def _pay_data(
+        self,
+        rsv,
+        card_number,
+        card_password,
+        birthday,
+        card_expire,
+        installment,
+        card_type,
     ):
         if not isinstance(rsv, Reservation):
             raise TypeError("rsv must be a Reservation instance")
 
-        data = {
+        return {
             "Device": self._device,
             "Version": self._version,
             "Key": self._key,
@@ -890,17 +1221,15 @@ class Korail:
             "hiduserYn": "Y",
         }
 
-        r = self._session.post(API_ENDPOINTS["pay"], data=data)
-        self._log(r.text)
-        j = json.loads(r.text)
-        if self._result_check(j):
-            return True
-        return False
-
+    @metrics.instrumented("KTX")
     def cancel(self, rsv):
+        r = self._post("cancel", data=self._cancel_data(rsv))
+        return self._result_check(json.loads(r.text))
+
+    def _cancel_data(self, rsv):
         if not isinstance(rsv, Reservation):
             raise TypeError("rsv must be a Reservation instance")
-        data = {
+        return {
             "Device": self._device,
             "Version": self._version,
             "Key": self._key,
@@ -909,13 +1238,13 @@ class Korail:
             "txtJrnyCnt": rsv.journey_cnt,
             "hidRsvChgNo": rsv.rsv_chg_no,
         }
-        r = self._session.post(API_ENDPOINTS["cancel"], data=data)
-        self._log(r.text)
-        j = json.loads(r.text)
-        return self._result_check(j)
 
     def refund(self, ticket):
-        data = {
+        r = self._post("refund", data=self._refund_data(ticket))
+        return self._result_check(json.loads(r.text))
+
+    def _refund_data(self, ticket):
+        return {
             "Device": self._device,
             "Version": self._version,
             "Key": self._key,
@@ -931,7 +1260,183 @@ class Korail:
             "latitude": "",
             "longitude": "",
         }
-        r = self._session.post(API_ENDPOINTS["refund"], data=data)
-        self._log(r.text)
-        j = json.loads(r.text)
-        return self._result_check(j)
+
+
+class AsyncKorail(Korail):
+    """asyncio counterpart of :class:`Korail` built on curl_cffi's ``AsyncSession``.
+
+    Shares request building and parsing with :class:`Korail` and returns the same
+    ``Train``/``Reservation``/``Ticket``/``Seat`` objects. Use it as an async
+    context manager (logs in when ``auto_login`` is set) or await :meth:`login`.
+    """
+
+    def __init__(self, korail_id, korail_pw, auto_login=True, verbose=False):
+        super().__init__(korail_id, korail_pw, auto_login=False, verbose=verbose)
+        self._auto_login = auto_login
+
+    async def __aenter__(self):
+        if self._auto_login and not self.logined:
+            await self.login()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _create_session(self):
+        return curl_cffi.AsyncSession(impersonate="chrome131_android")
+
+    def _create_budget(self):
+        return budget.connect_async()
+
+    async def _wait_budget(self, endpoint):
+        if self._budget:
+            delay = await self._budget.acquire(budget.priority_of(endpoint))
+            if delay >= 0.001:
+                self._log(f"Waited {delay:.3f}s for the request budget")
+
+    async def _get(self, endpoint, **kwargs):
+        await self._wait_budget(endpoint)
+        start = time.perf_counter()
+        r = await self._session.get(API_ENDPOINTS[endpoint], **kwargs)
+        self._on_response(endpoint, r, time.perf_counter() - start)
+        return r
+
+    async def _post(self, endpoint, **kwargs):
+        await self._wait_budget(endpoint)
+        start = time.perf_counter()
+        r = await self._session.post(API_ENDPOINTS[endpoint], **kwargs)
+        self._on_response(endpoint, r, time.perf_counter() - start)
+        return r
+
+    async def _fetch_ticket_seat(self, ticket):
+        await self._wait_budget("myticketseat")
+        start = time.perf_counter()
+        r = await self._session.get(
+            API_ENDPOINTS["myticketseat"], params=self._ticket_seat_params(ticket)
+        )
+        self._on_response("myticketseat", r, time.perf_counter() - start)
+        return r
+
+    async def close(self):
+        await self._session.close()
+        if self._budget:
+            await self._budget.close()
+
+    @metrics.instrumented("KTX")
+    async def login(self, korail_id=None, korail_pw=None):
+        self._set_credentials(korail_id, korail_pw)
+        r = await self._post("code", data={"code": "app.login.cphd"})
+        r = await self._post("login", data=self._login_data(r.text))
+        return self._on_login(r.text)
+
+    async def logout(self):
+        await self._get("logout")
+        self.logined = False
+
+    @metrics.instrumented("KTX")
+    async def search_train(
+        self,
+        dep,
+        arr,
+        date=None,
+        time=None,
+        train_type=TrainType.ALL,
+        passengers=None,
+        include_no_seats=False,
+        include_waiting_list=False,
+    ):
+        params = self._search_train_params(dep, arr, date, time, train_type, passengers)
+        r = await self._get("search_schedule", params=params)
+        return self._parse_search_train(r.text, include_no_seats, include_waiting_list)
+
+    @metrics.instrumented("KTX")
+    async def search_availability(
+        self, dep, arr, date=None, time=None, train_type=TrainType.ALL, passengers=None
+    ):
+        params = self._search_train_params(dep, arr, date, time, train_type, passengers)
+        r = await self._get("search_schedule", params=params)
+        return self._parse_availability(r.text)
+
+    @metrics.instrumented("KTX")
+    async def reserve(self, train, passengers=None, option=ReserveOption.GENERAL_FIRST):
+        params = self._reserve_params(train, passengers, option)
+        r = await self._get("reserve", params=params)
+        return self._found(await self.reservations(self._parse_reserve(r.text)))
+
+    async def tickets(self):
+        r = await self._get("myticketlist", params=self._tickets_params())
+        try:
+            tickets = self._parse_tickets(r.text)
+            limit = asyncio.Semaphore(DETAIL_FETCH_CONCURRENCY)
+
+            async def _fetch(ticket):
+                async with limit:
+                    return await self._fetch_ticket_seat(ticket)
+
+            responses = await asyncio.gather(*(_fetch(t) for t in tickets))
+            for ticket, r in zip(tickets, responses):
+                self._apply_ticket_seat(ticket, r.text)
+            return tickets
+        except NoResultsError:
+            return []
+
+    @metrics.instrumented("KTX")
+    async def reservations(self, rsv_id=None):
+        r = await self._get("myreservationview", params=self._reservations_params())
+        try:
+            reserves = self._parse_reservations(r.text)
+        except NoResultsError:
+            return None if rsv_id else []
+
+        if rsv_id:
+            reservation = self._pick(reserves, rsv_id)
+            if reservation:
+                self._set_ticket_info(reservation, await self.ticket_info(rsv_id))
+            return reservation
+
+        limit = asyncio.Semaphore(DETAIL_FETCH_CONCURRENCY)
+
+        async def _fetch(reservation):
+            async with limit:
+                info = await self.ticket_info(reservation.rsv_id)
+            self._set_ticket_info(reservation, info)
+
+        await asyncio.gather(*(_fetch(x) for x in reserves))
+        return reserves
+
+    async def ticket_info(self, rsv_id=None):
+        params = self._ticket_info_params(rsv_id)
+        r = await self._get("myreservationlist", params=params)
+        return self._parse_ticket_info(r.text)
+
+    @metrics.instrumented("KTX")
+    async def pay_with_card(
+        self,
+        rsv,
+        card_number,
+        card_password,
+        birthday,
+        card_expire,
+        installment=0,
+        card_type="J",
+    ):
+        data = self._pay_data(
+            rsv,
+            card_number,
+            card_password,
+            birthday,
+            card_expire,
+            installment,
+            card_type,
+        )
+        r = await self._post("pay", data=data)
+        return self._result_check(json.loads(r.text))
+
+    @metrics.instrumented("KTX")
+    async def cancel(self, rsv):
+        r = await self._post("cancel", data=self._cancel_data(rsv))
+        return self._result_check(json.loads(r.text))
+
+    async def refund(self, ticket):
+        r = await self._post("refund", data=self._refund_data(ticket))
+        return self._result_check(json.loads(r.text))
@@ -0,0 +1,210 @@
+"""
+In-process metrics of the SRT/Korail clients, exposed in the Prometheus text format.
+
+The clients record latency histograms and error counts of their calls
+(:func:`instrumented`) and of every HTTP request, plus NetFunnel queue waits and
+key cache hits. :func:`serve` exposes them on a local HTTP endpoint::
+
+    srtgo --metrics-port 9108 run job.toml
+    curl localhost:9108/metrics
+"""
+
+import bisect
+import functools
+import inspect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+NWAIT_BUCKETS = (0, 10, 50, 100, 500, 1000, 5000, 10000)
+MAX_MESSAGE_LENGTH = 80
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def _labels(self, values: tuple, extra: str = "") -> str:
+        pairs = [f'{k}="{_escape(v)}"' for k, v in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return super().render() + [
+            f"{self.name}{self._labels(k)} {v:g}" for k, v in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+        # labels -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0] * (len(self.buckets) + 2)
+            counts[i] += 1
+            counts[-1] += value
+
+    def count(self, *labels) -> int:
+        return sum(self._values.get(labels, [0])[:-1])
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = {k: list(v) for k, v in self._values.items()}
+        lines = super().render()
+        for labels, counts in sorted(values.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "le=\"{}\"".format("+Inf" if bound == float("inf") else f"{bound:g}")
+                lines.append(f"{self.name}_bucket{self._labels(labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {counts[-1]:g}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {cumulative}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRY: List[_Metric] = []
+
+CALL_SECONDS = Histogram(
+    "srtgo_call_seconds", "Latency of client calls", ("rail", "call")
+)
+CALL_ERRORS = Counter(
+    "srtgo_call_errors_total", "Failed client calls", ("rail", "call", "error", "message")
+)
+REQUEST_SECONDS = Histogram(
+    "srtgo_request_seconds", "Latency of HTTP requests by endpoint", ("rail", "endpoint")
+)
+NETFUNNEL_KEYS = Counter(
+    "srtgo_netfunnel_keys_total",
+    "NetFunnel key lookups by result (hit: cached key, miss: went through the funnel)",
+    ("rail", "result"),
+)
+NETFUNNEL_WAITS = Counter(
+    "srtgo_netfunnel_waits_total", "NetFunnel responses asking to wait in the queue", ("rail",)
+)
+NETFUNNEL_NWAIT = Histogram(
+    "srtgo_netfunnel_nwait", "Queue length (nwait) reported by NetFunnel", ("rail",), NWAIT_BUCKETS
+)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+def record_error(rail: str, call: str, ex: Exception) -> None:
+    message = str(ex).strip().splitlines()[0] if str(ex).strip() else ""
+    CALL_ERRORS.inc(rail, call, type(ex).__name__, message[:MAX_MESSAGE_LENGTH])
+
+
+def instrumented(rail: str, call: str | None = None):
+    """Record latency and errors of a (sync or async) client method.
+
+    Args:
+        rail: ``rail`` label (SRT or KTX)
+        call: ``call`` label (default: the function name)
+    """
+
+    def decorator(func):
+        name = call or func.__name__.lstrip("_")
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as ex:
+                    record_error(rail, name, ex)
+                    raise
+                finally:
+                    CALL_SECONDS.observe(time.perf_counter() - start, rail, name)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception as ex:
+                record_error(rail, name, ex)
+                raise
+            finally:
+                CALL_SECONDS.observe(time.perf_counter() - start, rail, name)
+
+        return wrapper
+
+    return decorator
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve ``/metrics`` on ``host:port`` from a daemon thread."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="srtgo-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,489 @@
+"""
+Local stand-in for the SRT and Korail servers, for benchmarks and development.
+
+:class:`MockRailServer` answers the paths of ``API_ENDPOINTS`` in ``srt.py`` and
+``ktx.py`` plus the NetFunnel ``ts.wseq`` protocol of both, with configurable
+latency, throttling and seats that open (sold out -> available) at a given time.
+Point a real client at it with :func:`redirect`::
+
+    with MockRailServer(MockConfig(seats_open_at=2.0)) as server:
+        srt = SRT("010-0000-0000", "pw", auto_login=False)
+        redirect(srt, server.url)
+        srt.login()
+"""
+
+import json
+import random
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+from .ktx import API_ENDPOINTS as KTX_ENDPOINTS
+from .srt import API_ENDPOINTS as SRT_ENDPOINTS
+
+
+SRT_THROTTLE_MESSAGE = "사용자가 많아 접속이 원활하지 않습니다"
+SRT_SOLD_OUT_MESSAGE = "잔여석없음"
+KTX_SOLD_OUT_CODE = "IRT010110"
+KTX_NO_RESULTS_CODE = "P100"
+KTX_THROTTLE_CODE = "ERR_BUSY"
+
+# Fixed 32 byte key handed out by the Korail "code" endpoint (AES-256 password)
+KTX_LOGIN_KEY = "korail1234567890korail1234567890"
+
+
+@dataclass
+class MockConfig:
+    """Behaviour of :class:`MockRailServer`.
+
+    Args:
+        latency: Base response latency in seconds
+        jitter: Extra uniform random latency in seconds
+        throttle_rate: Fraction of searches answered with a throttling error
+        throttle_rps: Answer searches with a throttling error above this many
+            requests per second (None: no limit)
+        netfunnel_waits: "wait" answers before NetFunnel lets a client through
+        n_trains: Trains per search result
+        open_train: Index of the train whose seats open, or a tuple of indexes
+        seats_open_at: Seconds after :meth:`MockRailServer.reset` when seats open
+        seats: Seats released at ``seats_open_at`` (sold out again once taken)
+        clock_offset: Seconds the server clock (``Date`` header) is ahead of ours
+    """
+
+    latency: float = 0.02
+    jitter: float = 0.01
+    throttle_rate: float = 0.0
+    throttle_rps: Optional[float] = None
+    netfunnel_waits: int = 0
+    n_trains: int = 8
+    open_train: Union[int, Tuple[int, ...]] = 0
+    seats_open_at: float = 0.0
+    seats: int = 1
+    clock_offset: float = 0.0
+
+
+@dataclass
+class MockState:
+    started_at: float = field(default_factory=time.monotonic)
+    seats_left: int = 0
+    requests: Counter = field(default_factory=Counter)
+    throttled: int = 0
+    reservations: List[dict] = field(default_factory=list)
+    netfunnel: Counter = field(default_factory=Counter)
+    recent: deque = field(default_factory=deque)
+    trains: dict = field(default_factory=dict)
+
+
+class MockRailServer(ThreadingHTTPServer):
+    """Threaded HTTP server emulating both rail APIs. Use as a context manager."""
+
+    daemon_threads = True
+
+    def __init__(self, config: MockConfig | None = None, port: int = 0) -> None:
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.config = config or MockConfig()
+        self.lock = threading.Lock()
+        self.routes = {
+            urlsplit(url).path: ("SRT", name) for name, url in SRT_ENDPOINTS.items()
+        }
+        self.routes.update(
+            {urlsplit(url).path: ("KTX", name) for name, url in KTX_ENDPOINTS.items()}
+        )
+        self.reset()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self) -> "MockRailServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def reset(self, **config) -> None:
+        """Clear state and counters, optionally changing the configuration."""
+        with self.lock:
+            for key, value in config.items():
+                setattr(self.config, key, value)
+            self.state = MockState(seats_left=self.config.seats)
+
+    def seats_open_time(self) -> float:
+        """``time.monotonic()`` at which seats open."""
+        return self.state.started_at + self.config.seats_open_at
+
+    def seats_available(self) -> bool:
+        return time.monotonic() >= self.seats_open_time() and self.state.seats_left > 0
+
+    def take_seat(self, rail: str, train_no: str) -> Optional[str]:
+        """Reserve a seat on the opened train; returns the reservation number."""
+        with self.lock:
+            open_numbers = [self.train_no(i) for i in self.open_trains()]
+            if not self.seats_available() or train_no not in open_numbers:
+                return None
+            self.state.seats_left -= 1
+            pnr = f"{len(self.state.reservations) + 1:05d}{random.randint(0, 99999):05d}"
+            self.state.reservations.append(
+                {"rail": rail, "pnr": pnr, "train_no": train_no, "at": time.monotonic()}
+            )
+            return pnr
+
+    def open_trains(self) -> Tuple[int, ...]:
+        """Indexes of the trains whose seats open."""
+        open_train = self.config.open_train
+        return (open_train,) if isinstance(open_train, int) else tuple(open_train)
+
+    def throttled(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            recent = self.state.recent
+            recent.append(now)
+            while recent and recent[0] < now - 1:
+                recent.popleft()
+            throttled = random.random() < self.config.throttle_rate or (
+                self.config.throttle_rps is not None and len(recent) > self.config.throttle_rps
+            )
+            self.state.throttled += throttled
+            return throttled
+
+    @staticmethod
+    def train_no(index: int) -> str:
+        return str(301 + 2 * index)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; don't let Nagle hold the body
+    disable_nagle_algorithm = True
+    server: MockRailServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def date_time_string(self, timestamp=None):
+        return super().date_time_string((timestamp or time.time()) + self.server.config.clock_offset)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def _dispatch(self):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query, keep_blank_values=True))
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            params.update(parse_qsl(self.rfile.read(length).decode(), keep_blank_values=True))
+
+        config = self.server.config
+        time.sleep(config.latency + random.uniform(0, config.jitter))
+
+        if url.path == "/ts.wseq":
+            return self._netfunnel(params)
+
+        rail, endpoint = self.server.routes.get(url.path, (None, None))
+        with self.server.lock:
+            self.server.state.requests[f"{rail}:{endpoint}"] += 1
+        handler = getattr(self, f"_{(rail or '').lower()}_{endpoint}", None)
+        if handler is None:
+            if rail is None:
+                return self._send(404, "Not Found")
+            return self._send_json(_srt_ok() if rail == "SRT" else {"strResult": "SUCC"})
+        handler(params)
+
+    def _send(self, status: int, body: str, content_type: str = "text/plain") -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, obj: dict) -> None:
+        self._send(200, json.dumps(obj, ensure_ascii=False), "application/json")
+
+    # NetFunnel (both rails; SRT asks for the JavaScript form with js=true)
+    def _netfunnel(self, params):
+        opcode = params.get("opcode")
+        key = params.get("key") or f"mock-{random.getrandbits(48):012x}"
+        status = "200"
+        if opcode == "5002":
+            with self.server.lock:
+                self.server.state.netfunnel[key] += 1
+                if self.server.state.netfunnel[key] <= self.server.config.netfunnel_waits:
+                    status = "201"
+        elif opcode == "5101" and self.server.config.netfunnel_waits:
+            status = "201"
+
+        result = f"key={key}&nwait={3 if status == '201' else 0}"
+        if params.get("js") == "true":
+            self._send(200, f"NetFunnel.gControl.result='{opcode}:{status}:{result}';")
+        else:
+            self._send(200, f"{status}:{result}")
+
+    # SRT
+    def _srt_login(self, params):
+        self._send_json(
+            {
+                "MSG": "",
+                "userMap": {
+                    "MB_CRD_NO": "1234567890",
+                    "CUST_NM": "테스트",
+                    "MBL_PHONE": "010-0000-0000",
+                },
+            }
+        )
+
+    def _srt_search_schedule(self, params):
+        if self.server.throttled():
+            return self._send_json(_srt_fail(SRT_THROTTLE_MESSAGE))
+
+        available = self.server.seats_available()
+        trains = []
+        for i, (dep_time, arr_time) in enumerate(_schedule(params.get("dptTm"), self.server.config.n_trains)):
+            state = "예약가능" if available and i in self.server.open_trains() else "매진"
+            trains.append(
+                {
+                    "stlbTrnClsfCd": "17",
+                    "trnNo": self.server.train_no(i),
+                    "dptDt": params.get("dptDt"),
+                    "dptTm": dep_time,
+                    "dptRsStnCd": params.get("dptRsStnCd"),
+                    "dptStnRunOrdr": "000001",
+                    "dptStnConsOrdr": "000001",
+                    "arvDt": params.get("dptDt"),
+                    "arvTm": arr_time,
+                    "arvRsStnCd": params.get("arvRsStnCd"),
+                    "arvStnRunOrdr": "000010",
+                    "arvStnConsOrdr": "000010",
+                    "gnrmRsvPsbStr": state,
+                    "sprmRsvPsbStr": "매진",
+                    "rsvWaitPsbCdNm": "",
+                    "rsvWaitPsbCd": "-1",
+                }
+            )
+        self._send_json({**_srt_ok(), "outDataSets": {"dsOutput1": trains}})
+
+    def _srt_reserve(self, params):
+        pnr = self.server.take_seat("SRT", str(int(params.get("trnNo1", "0"))))
+        if pnr is None:
+            return self._send_json(_srt_fail(SRT_SOLD_OUT_MESSAGE))
+        with self.server.lock:
+            self.server.state.reservations[-1]["data"] = params
+        self._send_json({**_srt_ok(), "reservListMap": [{"pnrNo": pnr}]})
+
+    def _srt_tickets(self, params):
+        trains, pays = [], []
+        deadline = datetime.now() + timedelta(minutes=20)
+        for reservation in self._reservations("SRT"):
+            data = reservation["data"]
+            trains.append({"pnrNo": reservation["pnr"], "rcvdAmt": "52600", "tkSpecNum": "1", "seatNum": "1"})
+            pays.append(
+                {
+                    "stlbTrnClsfCd": "17",
+                    "trnNo": reservation["train_no"],
+                    "dptDt": data.get("dptDt1"),
+                    "dptTm": data.get("dptTm1"),
+                    "dptRsStnCd": data.get("dptRsStnCd1"),
+                    "arvTm": data.get("arvTm1"),
+                    "arvRsStnCd": data.get("arvRsStnCd1"),
+                    "iseLmtDt": deadline.strftime("%Y%m%d"),
+                    "iseLmtTm": deadline.strftime("%H%M%S"),
+                    "stlFlg": "N",
+                }
+            )
+        self._send_json({**_srt_ok(), "trainListMap": trains, "payListMap": pays})
+
+    def _srt_ticket_info(self, params):
+        ticket = {
+            "scarNo": "5",
+            "seatNo": "7A",
+            "psrmClCd": "1",
+            "dcntKndCd": "000",
+            "rcvdAmt": "52600",
+            "stdrPrc": "52600",
+            "dcntPrc": "0",
+        }
+        self._send_json({**_srt_ok(), "trainListMap": [ticket]})
+
+    def _srt_payment(self, params):
+        self._send_json({"outDataSets": {"dsOutput0": [{"strResult": "SUCC", "msgTxt": ""}]}})
+
+    # Korail
+    def _ktx_code(self, params):
+        self._send_json({"strResult": "SUCC", "app.login.cphd": {"idx": "1", "key": KTX_LOGIN_KEY}})
+
+    def _ktx_login(self, params):
+        self._send_json(
+            {
+                "strResult": "SUCC",
+                "strMbCrdNo": "1234567890",
+                "strCustNm": "테스트",
+                "strEmailAdr": "test@example.com",
+                "strCpNo": "010-0000-0000",
+            }
+        )
+
+    def _ktx_search_schedule(self, params):
+        if self.server.throttled():
+            return self._send_json(_ktx_fail(KTX_THROTTLE_CODE, SRT_THROTTLE_MESSAGE))
+
+        available = self.server.seats_available()
+        trains = []
+        for i, (dep_time, arr_time) in enumerate(_schedule(params.get("txtGoHour"), self.server.config.n_trains)):
+            seat = "11" if available and i in self.server.open_trains() else "13"
+            trains.append(
+                {
+                    **_ktx_train(
+                        params.get("txtGoStart"),
+                        params.get("txtGoEnd"),
+                        params.get("txtGoAbrdDt"),
+                        dep_time,
+                        arr_time,
+                    ),
+                    "h_trn_no": self.server.train_no(i),
+                    "h_rsv_psb_flg": "Y",
+                    "h_rsv_psb_nm": "예약가능" if seat == "11" else "매진",
+                    "h_spe_rsv_cd": "13",
+                    "h_gen_rsv_cd": seat,
+                    "h_wait_rsv_flg": "-1",
+                }
+            )
+        with self.server.lock:
+            self.server.state.trains.update((train["h_trn_no"], train) for train in trains)
+        self._send_json({"strResult": "SUCC", "trn_infos": {"trn_info": trains}})
+
+    def _ktx_reserve(self, params):
+        pnr = self.server.take_seat("KTX", params.get("txtTrnNo1", ""))
+        if pnr is None:
+            return self._send_json(_ktx_fail(KTX_SOLD_OUT_CODE, "잔여석없음"))
+        with self.server.lock:
+            self.server.state.reservations[-1]["data"] = params
+        self._send_json({"strResult": "SUCC", "h_pnr_no": pnr})
+
+    def _ktx_myreservationview(self, params):
+        infos = []
+        deadline = datetime.now() + timedelta(minutes=20)
+        for reservation in self._reservations("KTX"):
+            train = self.server.state.trains.get(reservation["train_no"], {})
+            infos.append(
+                {
+                    **train,
+                    "h_pnr_no": reservation["pnr"],
+                    "h_tot_seat_cnt": reservation["data"].get("txtTotPsgCnt", "1"),
+                    "h_ntisu_lmt_dt": deadline.strftime("%Y%m%d"),
+                    "h_ntisu_lmt_tm": deadline.strftime("%H%M%S"),
+                    "h_rsv_amt": "59800",
+                }
+            )
+        if not infos:
+            return self._send_json(_ktx_fail(KTX_NO_RESULTS_CODE, "조회 결과가 없습니다"))
+        self._send_json({"strResult": "SUCC", "jrny_infos": {"jrny_info": [{"train_infos": {"train_info": infos}}]}})
+
+    def _ktx_myreservationlist(self, params):
+        seat = {
+            "h_srcar_no": "5",
+            "h_seat_no": "7A",
+            "h_psrm_cl_nm": "일반실",
+            "h_psg_tp_dv_nm": "어른",
+            "h_rcvd_amt": "59800",
+            "h_seat_prc": "59800",
+            "h_dcnt_amt": "0",
+        }
+        self._send_json(
+            {
+                "strResult": "SUCC",
+                "h_wct_no": "12345",
+                "jrny_infos": {"jrny_info": [{"seat_infos": {"seat_info": [seat]}}]},
+            }
+        )
+
+    def _ktx_myticketlist(self, params):
+        self._send_json(_ktx_fail(KTX_NO_RESULTS_CODE, "조회 결과가 없습니다"))
+
+    def _reservations(self, rail: str) -> list:
+        with self.server.lock:
+            return [r for r in self.server.state.reservations if r["rail"] == rail]
+
+
+def _srt_ok() -> dict:
+    return {"resultMap": [{"strResult": "SUCC", "msgTxt": ""}]}
+
+
+def _srt_fail(msg: str) -> dict:
+    return {"resultMap": [{"strResult": "FAIL", "msgTxt": msg}]}
+
+
+def _ktx_fail(code: str, msg: str) -> dict:
+    return {"strResult": "FAIL", "h_msg_cd": code, "h_msg_txt": msg}
+
+
+def _ktx_train(dep: str, arr: str, date: str, dep_time: str, arr_time: str) -> dict:
+    return {
+        "h_trn_clsf_cd": "00",
+        "h_trn_clsf_nm": "KTX",
+        "h_trn_gp_cd": "100",
+        "h_expct_dlay_hr": "000000",
+        "h_dpt_rs_stn_nm": dep,
+        "h_dpt_rs_stn_cd": "0001",
+        "h_dpt_dt": date,
+        "h_dpt_tm": dep_time,
+        "h_arv_rs_stn_nm": arr,
+        "h_arv_rs_stn_cd": "0020",
+        "h_arv_dt": date,
+        "h_arv_tm": arr_time,
+        "h_run_dt": date,
+    }
+
+
+def _schedule(start: str | None, n_trains: int):
+    """(departure, arrival) times of ``n_trains`` trains, 30 minutes apart."""
+    start = datetime.strptime((start or "000000")[:4], "%H%M")
+    for i in range(n_trains):
+        dep = start + timedelta(minutes=30 * i)
+        yield dep.strftime("%H%M00"), (dep + timedelta(hours=2, minutes=30)).strftime("%H%M00")
+
+
+class _RedirectSession:
+    """Session wrapper sending every request to ``base`` instead of the real host."""
+
+    def __init__(self, session, base: str) -> None:
+        self._session = session
+        self._base = base.rstrip("/")
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def _rewrite(self, url: str) -> str:
+        parts = urlsplit(url)
+        return self._base + parts.path + (f"?{parts.query}" if parts.query else "")
+
+    def get(self, url, *args, **kwargs):
+        return self._session.get(self._rewrite(url), *args, **kwargs)
+
+    def post(self, url=None, *args, **kwargs):
+        return self._session.post(self._rewrite(url or kwargs.pop("url")), *args, **kwargs)
+
+
+def redirect(client, base: str):
+    """Send all requests of an SRT/Korail (sync or async) client to ``base``."""
+    client._session = _RedirectSession(client._session, base)
+    netfunnel = getattr(client, "_netfunnel", None)
+    if netfunnel is not None:
+        netfunnel._session = _RedirectSession(netfunnel._session, base)
+    return client
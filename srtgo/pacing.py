@@ -0,0 +1,350 @@
+"""
+Polling rate controllers for the watch loop.
+
+A controller decides how long to wait before the next search of a target. The
+watch engine reports the outcome of every search to :meth:`RateController.observe`
+(response latency and, on failure, the error class from
+:func:`srtgo.watch.classify_error`) and sleeps for :meth:`RateController.next_delay`.
+"""
+
+import abc
+import time
+from datetime import datetime
+from random import gammavariate
+from typing import Dict, Sequence
+
+
+# 예약 간격 (평균 간격 (초) = SHAPE * SCALE + MIN): gamma distribution (1.25 +/- 0.25 s)
+RESERVE_INTERVAL_SHAPE = 4
+RESERVE_INTERVAL_SCALE = 0.25
+RESERVE_INTERVAL_MIN = 0.25
+RESERVE_INTERVAL = RESERVE_INTERVAL_SHAPE * RESERVE_INTERVAL_SCALE + RESERVE_INTERVAL_MIN
+
+# Error classes meaning "the server is struggling": back off
+BACKOFF_ERRORS = frozenset({"netfunnel", "throttle", "connection", "decode"})
+
+
+class RateController(abc.ABC):
+    """Interface of a polling rate controller."""
+
+    @abc.abstractmethod
+    def next_delay(self) -> float:
+        """Seconds to wait before the next search."""
+
+    def observe(self, latency: float, error: str | None = None) -> None:
+        """Report a finished search.
+
+        Args:
+            latency: Seconds the search took
+            error: Error class of a failed search, None if it succeeded
+        """
+
+    @property
+    @abc.abstractmethod
+    def interval(self) -> float:
+        """Current mean interval between searches in seconds."""
+
+    @property
+    def rate(self) -> float:
+        """Current mean search rate in requests per second."""
+        return 1 / self.interval
+
+
+def jittered(interval: float, minimum: float) -> float:
+    """Gamma distributed delay with mean ``interval`` that never drops below ``minimum``."""
+    if interval - minimum <= 0:
+        # No room for jitter (gammavariate needs a positive scale)
+        return minimum
+    return gammavariate(
+        RESERVE_INTERVAL_SHAPE, (interval - minimum) / RESERVE_INTERVAL_SHAPE
+    ) + minimum
+
+
+class GammaPacer(RateController):
+    """The legacy fixed pace: gamma jitter around a constant interval.
+
+    Args:
+        interval: Mean seconds between searches
+        minimum: Shortest possible delay (default: scaled like the legacy 0.25 s of 1.25 s)
+    """
+
+    def __init__(self, interval: float = RESERVE_INTERVAL, minimum: float | None = None) -> None:
+        self._interval = interval
+        self.minimum = (
+            interval * RESERVE_INTERVAL_MIN / RESERVE_INTERVAL if minimum is None else minimum
+        )
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    def next_delay(self) -> float:
+        return jittered(self._interval, self.minimum)
+
+
+class AdaptivePacer(RateController):
+    """AIMD controller: speeds up while the server is healthy, backs off fast when not.
+
+    Every clean search shortens the interval by ``step``; other errors (sold out,
+    login expired, ...) leave it unchanged. A throttling sign
+    (NetFunnel errors, "too many users" messages, connection errors) multiplies it
+    by ``backoff``; a slow response (latency above ``slow_factor`` times the
+    running baseline) by ``sqrt(backoff)``. Closer to departure, when
+    cancellations are frequent, the interval bounds are scaled down.
+
+    Args:
+        interval: Starting mean interval in seconds
+        min_interval: Fastest allowed mean interval
+        max_interval: Slowest allowed mean interval
+        departure: Departure time of the watched train(s), if known
+        step: Interval decrease per healthy search
+        backoff: Interval multiplier on throttling
+        slow_factor: Latency / baseline ratio considered slow
+    """
+
+    def __init__(
+        self,
+        interval: float = RESERVE_INTERVAL,
+        min_interval: float = 0.5,
+        max_interval: float = 10.0,
+        departure: datetime | None = None,
+        step: float = 0.02,
+        backoff: float = 2.0,
+        slow_factor: float = 3.0,
+    ) -> None:
+        if not 0 < min_interval <= interval <= max_interval:
+            raise ValueError("Expected 0 < min_interval <= interval <= max_interval")
+        self._interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.departure = departure
+        self.step = step
+        self.backoff = backoff
+        self.slow_factor = slow_factor
+        self.latency = None  # exponential moving average of healthy latencies
+        self._cooldown_until = 0.0
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    def next_delay(self) -> float:
+        return jittered(self._interval, self._bounds()[0] / 2)
+
+    def observe(self, latency: float, error: str | None = None) -> None:
+        low, high = self._bounds()
+        now = time.monotonic()
+
+        if error in BACKOFF_ERRORS:
+            # Back off once per burst of errors, not once per failed target
+            if now >= self._cooldown_until:
+                self._interval *= self.backoff
+                self._cooldown_until = now + self._interval
+        elif self.latency is not None and latency > self.slow_factor * self.latency:
+            if now >= self._cooldown_until:
+                self._interval *= self.backoff**0.5
+                self._cooldown_until = now + self._interval
+        elif error is None:
+            self.latency = (
+                latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            )
+            if now >= self._cooldown_until:
+                self._interval -= self.step
+
+        self._interval = min(high, max(low, self._interval))
+
+    def _bounds(self) -> tuple[float, float]:
+        scale = departure_scale(self.departure)
+        return self.min_interval * scale, self.max_interval * scale
+
+
+def departure_scale(departure: datetime | None) -> float:
+    """Interval scale by time to departure: poll harder when cancellations are likely."""
+    if departure is None:
+        return 1.0
+    hours = (departure - datetime.now()).total_seconds() / 3600
+    if hours < 3:
+        return 0.75
+    if hours > 72:
+        return 1.5
+    return 1.0
+
+
+class HourlyProfile:
+    """Relative search rate by local hour of day, from recorded seat openings.
+
+    The chance that a search finds newly opened seats in hour ``h`` is estimated
+    as openings / searches of that hour, shrunk towards the overall rate by
+    ``prior_weight`` pseudo-searches. Search effort is spread in proportion to the
+    square root of that chance (more searches where openings are likely, without
+    starving the other hours), normalised so the factors average to 1 over the
+    day: the same number of requests, moved to where they pay off.
+
+    Args:
+        factors: Search rate multiplier of each hour (0-23)
+    """
+
+    def __init__(self, factors: Sequence[float]) -> None:
+        if len(factors) != 24:
+            raise ValueError("Expected 24 hourly factors")
+        self.factors = list(factors)
+
+    @classmethod
+    def flat(cls) -> "HourlyProfile":
+        return cls([1.0] * 24)
+
+    @classmethod
+    def from_counts(
+        cls,
+        openings: Dict[int, int],
+        searches: Dict[int, int],
+        prior_weight: float = 50.0,
+        min_factor: float = 0.25,
+        max_factor: float = 4.0,
+    ) -> "HourlyProfile":
+        """Profile from openings and searches per hour (see :mod:`srtgo.history`)."""
+        factors = _rate_factors(
+            openings, searches, range(24), prior_weight, min_factor, max_factor
+        )
+        return cls(factors) if factors else cls.flat()
+
+    def factor(self, when: datetime | None = None) -> float:
+        return self.factors[(when or datetime.now()).hour]
+
+
+# Lead time buckets (days before departure): same day, 1, 2, 3-6, 7-13, 14-29, 30+
+LEAD_DAYS = (0, 1, 2, 3, 7, 14, 30)
+
+
+def lead_bucket(days: int) -> int:
+    """Index in :data:`LEAD_DAYS` of a lead time in days."""
+    bucket = 0
+    for i, start in enumerate(LEAD_DAYS):
+        if days >= start:
+            bucket = i
+    return bucket
+
+
+class LeadTimeProfile:
+    """Relative search rate by days before departure, from recorded seat openings.
+
+    Estimated like :class:`HourlyProfile`, per :data:`LEAD_DAYS` bucket instead of
+    per hour, and normalised so the factors average to 1 weighted by the recorded
+    searches: the search effort moves between lead times, its total stays.
+
+    Args:
+        factors: Search rate multiplier of each :data:`LEAD_DAYS` bucket
+    """
+
+    def __init__(self, factors: Sequence[float]) -> None:
+        if len(factors) != len(LEAD_DAYS):
+            raise ValueError(f"Expected {len(LEAD_DAYS)} lead time factors")
+        self.factors = list(factors)
+
+    @classmethod
+    def flat(cls) -> "LeadTimeProfile":
+        return cls([1.0] * len(LEAD_DAYS))
+
+    @classmethod
+    def from_counts(
+        cls,
+        openings: Dict[int, int],
+        searches: Dict[int, int],
+        prior_weight: float = 50.0,
+        min_factor: float = 0.25,
+        max_factor: float = 4.0,
+    ) -> "LeadTimeProfile":
+        """Profile from openings and searches per lead time bucket (see :mod:`srtgo.history`)."""
+        factors = _rate_factors(
+            openings,
+            searches,
+            range(len(LEAD_DAYS)),
+            prior_weight,
+            min_factor,
+            max_factor,
+            weighted=True,
+        )
+        return cls(factors) if factors else cls.flat()
+
+    def factor(self, departure: datetime, now: datetime | None = None) -> float:
+        days = (departure.date() - (now or datetime.now()).date()).days
+        return self.factors[lead_bucket(days)]
+
+
+def _rate_factors(
+    openings: Dict[int, int],
+    searches: Dict[int, int],
+    keys: Sequence[int],
+    prior_weight: float,
+    min_factor: float,
+    max_factor: float,
+    weighted: bool = False,
+) -> list | None:
+    """Search rate factors per key (see :class:`HourlyProfile`); None without data."""
+    total_openings = sum(openings.values())
+    total_searches = sum(searches.values())
+    if not total_openings or not total_searches:
+        return None
+    prior = total_openings / total_searches
+    weights = [
+        ((openings.get(k, 0) + prior_weight * prior) / (searches.get(k, 0) + prior_weight))
+        ** 0.5
+        for k in keys
+    ]
+    effort = [searches.get(k, 0) for k in keys] if weighted else None
+    factors = _normalized(weights, effort)
+    return _normalized([min(max_factor, max(min_factor, f)) for f in factors], effort)
+
+
+def _normalized(values: Sequence[float], weights: Sequence[float] | None = None) -> list:
+    if weights is None:
+        weights = [1] * len(values)
+    mean = sum(v * w for v, w in zip(values, weights)) / sum(weights)
+    return [v / mean for v in values]
+
+
+class HistoryPacer(RateController):
+    """Scales another controller's pace by an :class:`HourlyProfile`.
+
+    The wrapped controller keeps reacting to latency and throttling; this one
+    only searches faster in hours where seats historically opened and slower in
+    the others, never faster than ``min_interval``. Given a ``lead`` profile and
+    the ``departure``, it also scales by the days left before departure.
+
+    Args:
+        pacer: Controller to scale (usually an :class:`AdaptivePacer`)
+        profile: Search rate factors by hour of day
+        min_interval: Fastest allowed mean interval
+        lead: Search rate factors by days before departure
+        departure: Departure time of the searched trains
+    """
+
+    def __init__(
+        self,
+        pacer: RateController,
+        profile: HourlyProfile,
+        min_interval: float = 0.5,
+        lead: LeadTimeProfile | None = None,
+        departure: datetime | None = None,
+    ) -> None:
+        self.pacer = pacer
+        self.profile = profile
+        self.min_interval = min_interval
+        self.lead = lead
+        self.departure = departure
+
+    def factor(self) -> float:
+        factor = self.profile.factor()
+        if self.lead is not None and self.departure is not None:
+            factor *= self.lead.factor(self.departure)
+        return factor
+
+    @property
+    def interval(self) -> float:
+        return max(self.min_interval, self.pacer.interval / self.factor())
+
+    def next_delay(self) -> float:
+        return self.pacer.next_delay() * self.interval / self.pacer.interval
+
+    def observe(self, latency: float, error: str | None = None) -> None:
+        self.pacer.observe(latency, error)
@@ -0,0 +1,294 @@
+"""
+Record and replay the HTTP traffic of the SRT/Korail clients.
+
+:func:`record` wraps the sessions of a client (and of its NetFunnel helper) so
+every request/response pair is appended to a gzip compressed JSON lines archive,
+with credentials, card data and personal details redacted. :func:`replay` swaps
+the sessions for a transport that answers from such an archive, at the recorded
+speed, faster, or instantly, so parsing and loop overhead can be profiled
+offline and the exact response sequence of a failed booking reproduced::
+
+    archive = record(srt, "booking.jsonl.gz")
+    ...
+    archive.close()
+
+    srt = replay(SRT("010-0000-0000", "pw", auto_login=False), "booking.jsonl.gz", speed=10)
+"""
+
+import asyncio
+import gzip
+import inspect
+import json
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+ARCHIVE_VERSION = 1
+REDACTED = "<redacted>"
+
+# Request and response fields holding credentials, card data or personal details,
+# matched against the lower-cased field name without underscores
+SENSITIVE_FIELD = re.compile(
+    r"pwd|passw|crdno|vlidtrm|athnval|phone|cpno|custnm|emailadr|srchdvnm|memberno"
+)
+
+
+class ReplayError(Exception):
+    """The archive has no (more) responses for a request."""
+
+
+def is_sensitive(name: str) -> bool:
+    return bool(SENSITIVE_FIELD.search(name.lower().replace("_", "")))
+
+
+def redact(value):
+    """Copy of a form/params mapping or parsed JSON with sensitive fields redacted."""
+    if isinstance(value, dict):
+        return {
+            k: REDACTED if is_sensitive(str(k)) and not isinstance(v, (dict, list)) else redact(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(v) for v in value]
+    return value
+
+
+def redact_text(text: str) -> str:
+    """Redact a response body if it is JSON; other bodies (NetFunnel) are kept."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return text
+    return json.dumps(redact(data), ensure_ascii=False)
+
+
+def _form(value):
+    if value is None or isinstance(value, dict):
+        return value
+    if isinstance(value, (bytes, str)):
+        text = value.decode() if isinstance(value, bytes) else value
+        return dict(parse_qsl(text, keep_blank_values=True))
+    return dict(value)
+
+
+class Archive:
+    """Append-only archive of request/response pairs (gzip JSON lines).
+
+    The first line is a header; every other line is one exchange. Each record is
+    flushed on its own so an archive stays readable after a crash.
+    """
+
+    def __init__(self, path) -> None:
+        self.path = Path(path)
+        self._file = gzip.open(self.path, "wt", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self._write(
+            {"version": ARCHIVE_VERSION, "recorded_at": datetime.now().isoformat(timespec="seconds")}
+        )
+
+    def _write(self, record: dict) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def add(self, method: str, url: str, kwargs: dict, response, started: float) -> None:
+        self._write(
+            {
+                "t": round(started - self._start, 6),
+                "elapsed": round(time.monotonic() - started, 6),
+                "method": method,
+                "url": urlsplit(url)._replace(query="").geturl(),
+                "params": redact(_form(kwargs.get("params"))),
+                "data": redact(_form(kwargs.get("data"))),
+                "status": response.status_code,
+                "text": redact_text(response.text),
+            }
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> "Archive":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def load_archive(path) -> list:
+    """Exchanges of an archive, in recorded order."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != ARCHIVE_VERSION:
+            raise ReplayError(f"Unsupported archive version: {header.get('version')}")
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class _RecordingSession:
+    def __init__(self, session, archive: Archive) -> None:
+        self._session = session
+        self._archive = archive
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def get(self, url, **kwargs):
+        started = time.monotonic()
+        r = self._session.get(url, **kwargs)
+        self._archive.add("GET", url, kwargs, r, started)
+        return r
+
+    def post(self, url=None, **kwargs):
+        url = url or kwargs.pop("url")
+        started = time.monotonic()
+        r = self._session.post(url, **kwargs)
+        self._archive.add("POST", url, kwargs, r, started)
+        return r
+
+
+class _AsyncRecordingSession(_RecordingSession):
+    async def get(self, url, **kwargs):
+        started = time.monotonic()
+        r = await self._session.get(url, **kwargs)
+        self._archive.add("GET", url, kwargs, r, started)
+        return r
+
+    async def post(self, url=None, **kwargs):
+        url = url or kwargs.pop("url")
+        started = time.monotonic()
+        r = await self._session.post(url, **kwargs)
+        self._archive.add("POST", url, kwargs, r, started)
+        return r
+
+
+class ReplayResponse:
+    def __init__(self, record: dict) -> None:
+        self.url = record["url"]
+        self.status_code = record["status"]
+        self.text = record["text"]
+        self.headers = {}
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class Replayer:
+    """Shared response source of the replay sessions of one client.
+
+    Responses are matched per URL path in recorded order, so requests to
+    different endpoints may interleave differently than when recording (e.g. the
+    background NetFunnel refresher) without desynchronising the replay.
+
+    Args:
+        records: Exchanges from :func:`load_archive`
+        speed: Replay speed relative to the recorded response times (2: twice as
+            fast); None answers instantly
+    """
+
+    def __init__(self, records: list, speed: float | None = 1.0) -> None:
+        self.speed = speed
+        self._queues = defaultdict(deque)
+        for record in records:
+            self._queues[urlsplit(record["url"]).path].append(record)
+        self._lock = threading.Lock()
+
+    def next(self, url: str) -> tuple:
+        """(response, delay) of the next exchange recorded for the path of url."""
+        path = urlsplit(url).path
+        with self._lock:
+            queue = self._queues.get(path)
+            if not queue:
+                raise ReplayError(f"No recorded response left for {path}")
+            record = queue.popleft()
+        delay = record["elapsed"] / self.speed if self.speed else 0.0
+        return ReplayResponse(record), delay
+
+    def remaining(self) -> int:
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+
+class _ReplaySession:
+    def __init__(self, replayer: Replayer) -> None:
+        self._replayer = replayer
+        self.headers = {}
+        self.cookies = {}
+
+    def get(self, url, **kwargs):
+        r, delay = self._replayer.next(url)
+        time.sleep(delay)
+        return r
+
+    def post(self, url=None, **kwargs):
+        r, delay = self._replayer.next(url or kwargs["url"])
+        time.sleep(delay)
+        return r
+
+    def close(self) -> None:
+        pass
+
+
+class _AsyncReplaySession(_ReplaySession):
+    async def get(self, url, **kwargs):
+        r, delay = self._replayer.next(url)
+        await asyncio.sleep(delay)
+        return r
+
+    async def post(self, url=None, **kwargs):
+        r, delay = self._replayer.next(url or kwargs["url"])
+        await asyncio.sleep(delay)
+        return r
+
+    async def close(self) -> None:
+        pass
+
+
+def _is_async(client) -> bool:
+    return inspect.iscoroutinefunction(client.login)
+
+
+def _sessions(client):
+    """(owner, session) pairs of a client and its NetFunnel helper."""
+    owners = [client]
+    netfunnel = getattr(client, "_netfunnel", None)
+    if netfunnel is not None:
+        owners.append(netfunnel)
+    return [(owner, owner._session) for owner in owners]
+
+
+def record(client, path) -> Archive:
+    """Record all requests of an SRT/Korail (sync or async) client to ``path``.
+
+    Returns:
+        Archive: Close it (or the client's process) to finish the archive
+    """
+    archive = Archive(path)
+    wrapper = _AsyncRecordingSession if _is_async(client) else _RecordingSession
+    for owner, session in _sessions(client):
+        owner._session = wrapper(session, archive)
+    return archive
+
+
+def replay(client, path, speed: float | None = 1.0):
+    """Answer all requests of an SRT/Korail client from the archive at ``path``.
+
+    The client must not have logged in yet (``auto_login=False``); its login is
+    answered from the archive like any other request.
+    """
+    replayer = Replayer(load_archive(path), speed)
+    is_async = _is_async(client)
+    for owner, session in _sessions(client):
+        if not is_async:
+            session.close()
+        owner._session = (_AsyncReplaySession if is_async else _ReplaySession)(replayer)
+        owner._session.headers.update(session.headers)
+    client._budget = None
+    return client
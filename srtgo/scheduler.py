@@ -1,11 +1,32 @@
 # srtgo/scheduler.py
 from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+import asyncio
+import math
 import time
 import inquirer
 from termcolor import colored
 import os
 import platform
 
+try:
+    import curl_cffi
+    HAS_CURL_CFFI = True
+except ImportError:
+    import requests
+    HAS_CURL_CFFI = False
+
+# 서버 시각(Date 헤더)을 읽어올 주소
+SERVER_URLS = {
+    "SRT": "https://app.srail.or.kr",
+    "KTX": "https://smart.letskorail.com",
+}
+CLOCK_SAMPLES = 8
+# 이 시간(초)보다 오래 기다리면 시작 직전에 시계 차이를 다시 잽니다
+REMEASURE_BEFORE = 60
+# 마지막 이 시간(초)은 sleep 대신 바쁜 대기(spin)로 맞춥니다
+SPIN_WINDOW = 0.02
+
 def shutdown_computer():
     """운영체제에 맞춰 컴퓨터를 종료합니다."""
     system_name = platform.system()
@@ -108,24 +129,153 @@ def select_schedule_time():
     answer = inquirer.prompt(question)
     return answer["schedule_dt"] if answer else None
 
-def wait_until(target_time):
+def _create_session():
+    if HAS_CURL_CFFI:
+        return curl_cffi.Session(impersonate="chrome")
+    return requests.session()
+
+
+def measure_clock_offset(url, samples=CLOCK_SAMPLES, session=None):
+    """
+    HTTP Date 헤더로 (서버 시각 - 로컬 시각)을 초 단위로 추정합니다.
+    반환값: (offset, error) - 실제 차이는 offset ± error 안에 있습니다.
+
+    Date 헤더는 1초 단위라 한 번의 응답으로는 [D - 도착 시각, D + 1 - 요청 시각)
+    범위만 알 수 있습니다. 다음 요청을 현재 추정치 기준으로 서버 시각이 초를
+    넘어가는 순간에 맞춰 보내면 범위가 매번 반 정도로 줄어듭니다.
+    """
+    own_session = session is None
+    session = session or _create_session()
+    lo, hi = -math.inf, math.inf
+    rtt = 0.0
+    try:
+        for i in range(samples):
+            if i:
+                # 응답이 서버에서 만들어지는 시점이 추정 범위 중앙 기준 초 경계에 오도록
+                mid = (lo + hi) / 2
+                boundary = math.ceil(time.time() + rtt + mid) - mid
+                time.sleep(max(0.0, boundary - rtt / 2 - time.time()))
+            sent = time.time()
+            r = session.head(url, timeout=5)
+            received = time.time()
+            rtt = received - sent
+            date = r.headers.get("Date")
+            if not date:
+                raise ValueError(f"{url} 응답에 Date 헤더가 없습니다")
+            server = parsedate_to_datetime(date).timestamp()
+            sample_lo, sample_hi = server - received, server + 1 - sent
+            if sample_lo > hi or sample_hi < lo:
+                # 서버마다 시계가 다르거나 시계가 바뀜: 최근 값을 믿음
+                lo, hi = sample_lo, sample_hi
+            else:
+                lo, hi = max(lo, sample_lo), min(hi, sample_hi)
+    finally:
+        if own_session:
+            session.close()
+    return (lo + hi) / 2, (hi - lo) / 2
+
+
+def server_clock_offset(rail_type):
+    """
+    열차 서버와의 시계 차이(초)를 재서 출력하고 반환합니다. 실패하면 0 (로컬 시계 사용).
+    """
+    try:
+        offset, error = measure_clock_offset(SERVER_URLS[rail_type])
+    except Exception as e:
+        print(colored(f"⚠️ {rail_type} 서버 시각을 확인하지 못해 이 컴퓨터 시계를 사용합니다: {e}", "yellow"))
+        return 0.0
+    print(f"🕒 {rail_type} 서버 시계 차이: {offset * 1000:+.0f}ms (±{error * 1000:.0f}ms)", flush=True)
+    return offset
+
+
+def sleep_until(timestamp):
+    """
+    로컬 시각 timestamp(time.time() 기준)까지 기다립니다.
+    마지막 SPIN_WINDOW 초는 바쁜 대기로 맞춰 sleep 의 오차(수 ms)를 없앱니다.
+    """
+    remaining = timestamp - time.time()
+    if remaining > SPIN_WINDOW:
+        time.sleep(remaining - SPIN_WINDOW)
+    deadline = time.perf_counter() + (timestamp - time.time())
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def async_sleep_until(timestamp):
+    """sleep_until 의 asyncio 버전 (바쁜 대기 구간만 이벤트 루프를 막습니다)."""
+    remaining = timestamp - time.time()
+    if remaining > SPIN_WINDOW:
+        await asyncio.sleep(remaining - SPIN_WINDOW)
+    sleep_until(timestamp)
+
+
+def start_timestamp(target_time, offset=0.0, lead=0.0):
+    """
+    서버 시각 target_time 보다 lead 초 먼저(음수면 늦게)인 순간의 로컬 timestamp.
+    """
+    return target_time.timestamp() - offset - lead
+
+
+def wait_for_server_time(target_time, rail_type, lead=0.0, warmup=0.0):
+    """
+    출력 없이 rail_type 서버 시각 target_time 의 lead 초 전까지 기다립니다 (무인 실행용).
+    시계 차이는 시작 REMEASURE_BEFORE 초 전에 잽니다.
+    warmup 을 주면 그만큼 일찍 돌아옵니다 (로그인/연결 준비용).
+    반환값: 시작할 로컬 timestamp
+    """
+    sleep_until(start_timestamp(target_time, 0.0, lead + warmup + REMEASURE_BEFORE))
+    start = start_timestamp(target_time, server_clock_offset(rail_type), lead)
+    sleep_until(start - warmup)
+    return start
+
+
+async def async_wait_for_server_time(target_time, rail_type, lead=0.0, warmup=0.0):
+    """wait_for_server_time 의 asyncio 버전."""
+    await async_sleep_until(start_timestamp(target_time, 0.0, lead + warmup + REMEASURE_BEFORE))
+    offset = await asyncio.to_thread(server_clock_offset, rail_type)
+    start = start_timestamp(target_time, offset, lead)
+    await async_sleep_until(start - warmup)
+    return start
+
+
+def wait_until(target_time, rail_type=None, lead=0.0, warmup=0.0):
     """
     target_time이 될 때까지 대기합니다.
+    rail_type 을 주면 해당 열차 서버의 시각 기준으로, lead 초 먼저 시작합니다.
+    warmup 을 주면 그만큼 일찍 돌아옵니다 (로그인/연결 준비용).
+    반환값: 시작할 로컬 timestamp
     """
     print(colored(f"\n⏰ 예약 모드 가동: {target_time.strftime('%Y-%m-%d %H:%M:%S')}에 예매를 시작합니다.", "yellow"))
     print(colored("⚠️ 컴퓨터를 끄거나 절전 모드로 전환하지 마세요.\n", "red"))
 
+    offset = server_clock_offset(rail_type) if rail_type else 0.0
+    remeasure = bool(rail_type) and (
+        start_timestamp(target_time, offset, lead + warmup) - time.time() > REMEASURE_BEFORE * 2
+    )
+
     while True:
-        now = datetime.now()
-        remaining = target_time - now
-        
-        if remaining.total_seconds() <= 0:
-            print(colored("\n🚀 예약 시간이 되었습니다! 예매를 시작합니다.", "green", "on_red"))
-            break
-
-        hours, rem = divmod(int(remaining.total_seconds()), 3600)
+        start = start_timestamp(target_time, offset, lead)
+        remaining = start - warmup - time.time()
+
+        if remeasure and remaining < REMEASURE_BEFORE:
+            # 오래 기다리는 동안 생긴 시계 차이를 시작 직전에 보정
+            print()
+            offset = server_clock_offset(rail_type)
+            remeasure = False
+            continue
+
+        if remaining <= 1:
+            sleep_until(start - warmup)
+            if warmup:
+                print(colored(f"\n🔥 시작 {warmup:.0f}초 전입니다. 로그인하고 연결을 준비합니다.", "green"))
+            else:
+                print(colored("\n🚀 예약 시간이 되었습니다! 예매를 시작합니다.", "green", "on_red"))
+            return start
+
+        hours, rem = divmod(int(remaining), 3600)
         minutes, seconds = divmod(rem, 60)
         time_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-        
+
         print(f"\r⏳ 실행 대기 중... 남은 시간: {time_str}", end="", flush=True)
-        time.sleep(1)
\ No newline at end of file
+        # 마지막 1초는 sleep_until 로 정확히 맞춤
+        time.sleep(min(1.0, remaining - 1))
\ No newline at end of file
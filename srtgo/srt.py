@@ -6,13 +6,19 @@ except ImportError:
     import requests
     HAS_CURL_CFFI = False
 
+import asyncio
 import json
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from datetime import datetime
 from typing import Dict, List, Pattern
 
+from . import budget, events, metrics
+from .availability import Availability, decode
+
 # Constants
 EMAIL_REGEX: Pattern = re.compile(r"[^@]+@[^@]+\.[^@]+")
 PHONE_NUMBER_REGEX: Pattern = re.compile(r"(\d{3})-(\d{3,4})-(\d{4})")
@@ -85,6 +91,9 @@ TRAIN_NAME = {
 
 WINDOW_SEAT = {None: "000", True: "012", False: "013"}
 
+# Maximum number of concurrent ticket_info requests in fetch_tickets()
+TICKET_FETCH_CONCURRENCY = 8
+
 SRT_MOBILE = "https://app.srail.or.kr:443"
 API_ENDPOINTS = {
     "main": f"{SRT_MOBILE}/main/main.do",
@@ -126,7 +135,8 @@ class SRTDuplicateError(SRTResponseError):
 
 
 class SRTNotLoggedInError(SRTError):
-    pass
+    def __init__(self, msg: str = "로그인 후 사용하십시오."):
+        super().__init__(msg)
 
 
 class SRTNetFunnelError(SRTError):
@@ -271,6 +281,19 @@ class SRTTicket:
         "206": "4~6급 장애인",
     }
 
+    __slots__ = (
+        "car",
+        "seat",
+        "seat_type_code",
+        "seat_type",
+        "passenger_type_code",
+        "passenger_type",
+        "price",
+        "original_price",
+        "discount",
+        "is_waiting",
+    )
+
     def __init__(self, data: dict) -> None:
         self.car = data.get("scarNo")
         self.seat = data.get("seatNo")
@@ -303,7 +326,38 @@ class SRTTicket:
 
 
 class SRTReservation:
-    def __init__(self, train, pay, tickets):
+    """Reservation summary from the reservation list.
+
+    Ticket details cost one extra request per reservation, so they are loaded
+    lazily through ``ticket_loader`` on first access of :attr:`tickets` (or in
+    bulk with ``SRT.fetch_tickets``).
+    """
+
+    __slots__ = (
+        "reservation_number",
+        "total_cost",
+        "seat_count",
+        "train_code",
+        "train_name",
+        "train_number",
+        "dep_date",
+        "dep_time",
+        "dep_station_code",
+        "dep_station_name",
+        "arr_time",
+        "arr_station_code",
+        "arr_station_name",
+        "payment_date",
+        "payment_time",
+        "paid",
+        "is_running",
+        "is_waiting",
+        "is_ticket",  # set by the reservation menu
+        "_tickets",
+        "_ticket_loader",
+    )
+
+    def __init__(self, train, pay, tickets=None, ticket_loader=None):
         self.reservation_number = train.get("pnrNo")
         self.total_cost = int(train.get("rcvdAmt"))
         self.seat_count = train.get("tkSpecNum") or int(train.get("seatNum"))
@@ -328,6 +382,7 @@ class SRTReservation:
         self.is_waiting = not (self.paid or self.payment_date or self.payment_time)
 
         self._tickets = tickets
+        self._ticket_loader = ticket_loader
 
     def __str__(self):
         return self.dump()
@@ -359,8 +414,18 @@ class SRTReservation:
 
     @property
     def tickets(self):
+        if self._tickets is None and self._ticket_loader is not None:
+            self._tickets = self._ticket_loader(self.reservation_number)
         return self._tickets
 
+    @tickets.setter
+    def tickets(self, tickets):
+        self._tickets = tickets
+
+    @property
+    def tickets_loaded(self) -> bool:
+        return self._tickets is not None
+
 
 # SRTResponseData class
 class SRTResponseData:
@@ -419,10 +484,32 @@ class SeatType(Enum):
 
 # Train class
 class Train:
-    pass
+    __slots__ = ()
 
 
 class SRTTrain(Train):
+    __slots__ = (
+        "train_code",
+        "train_name",
+        "train_number",
+        "dep_date",
+        "dep_time",
+        "dep_station_code",
+        "dep_station_name",
+        "dep_station_run_order",
+        "dep_station_constitution_order",
+        "arr_date",
+        "arr_time",
+        "arr_station_code",
+        "arr_station_name",
+        "arr_station_run_order",
+        "arr_station_constitution_order",
+        "general_seat_state",
+        "special_seat_state",
+        "reserve_wait_possible_name",
+        "reserve_wait_possible_code",
+    )
+
     def __init__(self, data):
         self.train_code = data["stlbTrnClsfCd"]
         self.train_name = TRAIN_NAME[self.train_code]
@@ -502,6 +589,9 @@ class NetFunnelHelper:
     WAIT_STATUS_FAIL = "201"
     ALREADY_COMPLETED = "502"
 
+    # Renew the key this many seconds before it expires when refreshing in background
+    REFRESH_MARGIN = 10
+
     OP_CODE = {
         "getTidchkEnter": "5101",
         "chkEnter": "5002",
@@ -529,63 +619,129 @@ class NetFunnelHelper:
     }
 
     def __init__(self, debug=False):
-        if HAS_CURL_CFFI:
-            self._session = curl_cffi.Session(impersonate="chrome")
-        else:
-            self._session = requests.session()
+        self._session = self._create_session()
         self._session.headers.update(self.DEFAULT_HEADERS)
         self._cached_key = None
         self._last_fetch_time = 0
         self._cache_ttl = 48  # 48 seconds
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._refresher = None
         self.debug = debug
 
+    @metrics.instrumented("SRT", "netfunnel")
     def run(self):
-        current_time = time.time()
-        if self._is_cache_valid(current_time):
+        if self._is_cache_valid(time.time()):
+            metrics.NETFUNNEL_KEYS.inc("SRT", "hit")
             return self._cached_key
 
-        try:
-            status, self._cached_key, nwait, ip = self._start()
-            self._last_fetch_time = current_time
-
-            # Keep checking until we get a pass status
-            while status == self.WAIT_STATUS_FAIL:
-                print(f"\r현재 {nwait}명 대기중...", end="", flush=True)
-                time.sleep(1)
-                status, self._cached_key, nwait, ip = self._check(ip)
-
-            # Complete the funnel process
-            status, *_ = self._complete(ip)
-            if status in (self.WAIT_STATUS_PASS, self.ALREADY_COMPLETED):
+        with self._lock:
+            if self._is_cache_valid(time.time()):
+                metrics.NETFUNNEL_KEYS.inc("SRT", "hit")
                 return self._cached_key
 
-            self.clear()
+            metrics.NETFUNNEL_KEYS.inc("SRT", "miss")
+            try:
+                return self._acquire()
+            except Exception as ex:
+                self.clear()
+                raise SRTNetFunnelError(str(ex))
+
+    def _acquire(self):
+        """Go through the funnel and swap in the new key once it has passed."""
+        fetched_at = time.time()
+        status, key, nwait, ip = self._start()
+
+        # Keep checking until we get a pass status
+        while status == self.WAIT_STATUS_FAIL:
+            print(f"\r현재 {nwait}명 대기중...", end="", flush=True)
+            metrics.NETFUNNEL_WAITS.inc("SRT")
+            metrics.NETFUNNEL_NWAIT.observe(int(nwait or 0), "SRT")
+            time.sleep(1)
+            status, key, nwait, ip = self._check(ip, key)
+
+        # Complete the funnel process
+        status, *_ = self._complete(ip, key)
+        if status not in (self.WAIT_STATUS_PASS, self.ALREADY_COMPLETED):
             raise SRTNetFunnelError("Failed to complete NetFunnel")
 
-        except Exception as ex:
-            self.clear()
-            raise SRTNetFunnelError(str(ex))
+        self._cached_key, self._last_fetch_time = key, fetched_at
+        return key
 
     def clear(self):
         self._cached_key = None
         self._last_fetch_time = 0
+        self._wake.set()
+
+    def start_refresher(self) -> None:
+        """Keep a valid key ready by renewing it in a background thread.
+
+        The key is renewed ``REFRESH_MARGIN`` seconds before it expires, so
+        :meth:`run` keeps returning a cached key without any round trip.
+        """
+        if self._refresher is not None:
+            return
+        self._refresher = threading.Thread(
+            target=self._refresh_loop, name="netfunnel-refresher", daemon=True
+        )
+        self._refresher.start()
+
+    def stop_refresher(self) -> None:
+        refresher, self._refresher = self._refresher, None
+        if refresher is not None:
+            self._wake.set()
+            refresher.join()
+
+    def _refresh_loop(self):
+        while self._refresher is threading.current_thread():
+            delay = self._refresh_delay()
+            if delay > 0:
+                if self._wake.wait(delay):
+                    self._wake.clear()
+                continue
+
+            try:
+                with self._lock:
+                    if self._refresh_delay() <= 0:
+                        self._acquire()
+            except Exception as ex:
+                # Keep the current key; it may still be valid for a while
+                if self.debug:
+                    print(f"NetFunnel refresh failed: {ex}")
+                self._wake.wait(1)
+                self._wake.clear()
+
+    def _refresh_delay(self) -> float:
+        if not self._cached_key:
+            return 0
+        return self._last_fetch_time + self._cache_ttl - self.REFRESH_MARGIN - time.time()
+
+    def _create_session(self):
+        if HAS_CURL_CFFI:
+            return curl_cffi.Session(impersonate="chrome")
+        return requests.session()
 
     def _start(self):
         return self._make_request("getTidchkEnter")
 
-    def _check(self, ip: str | None = None):
-        return self._make_request("chkEnter", ip)
+    def _check(self, ip: str | None = None, key: str | None = None):
+        return self._make_request("chkEnter", ip, key)
 
-    def _complete(self, ip: str | None = None):
-        return self._make_request("setComplete", ip)
+    def _complete(self, ip: str | None = None, key: str | None = None):
+        return self._make_request("setComplete", ip, key)
 
-    def _make_request(self, opcode: str, ip: str | None = None):
-        url = f"https://{ip or 'nf.letskorail.com'}/ts.wseq"
-        params = self._build_params(self.OP_CODE[opcode])
-        r = self._session.get(url, params=params, verify=False)
+    def _make_request(self, opcode: str, ip: str | None = None, key: str | None = None):
+        params = self._build_params(self.OP_CODE[opcode], key=key)
+        r = self._session.get(self._url(ip), params=params, verify=False)
+        return self._handle_response(r.text)
+
+    def _url(self, ip: str | None = None) -> str:
+        return f"https://{ip or 'nf.letskorail.com'}/ts.wseq"
+
+    def _handle_response(self, text: str):
         if self.debug:
-            print(r.text)
-        response = self._parse(r.text)
+            print(text)
+        response = self._parse(text)
         return map(response.get, ("status", "key", "nwait", "ip"))
 
     def _build_params(
@@ -630,6 +786,102 @@ class NetFunnelHelper:
         )
 
 
+class AsyncNetFunnelHelper(NetFunnelHelper):
+    """NetFunnelHelper for asyncio clients.
+
+    Waits in the queue with ``asyncio.sleep`` instead of blocking the process, and
+    lets concurrent callers share a single key acquisition.
+    """
+
+    def __init__(self, debug=False):
+        super().__init__(debug)
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+
+    @metrics.instrumented("SRT", "netfunnel")
+    async def run(self):
+        if self._is_cache_valid(time.time()):
+            metrics.NETFUNNEL_KEYS.inc("SRT", "hit")
+            return self._cached_key
+
+        async with self._lock:
+            if self._is_cache_valid(time.time()):
+                metrics.NETFUNNEL_KEYS.inc("SRT", "hit")
+                return self._cached_key
+
+            metrics.NETFUNNEL_KEYS.inc("SRT", "miss")
+            try:
+                return await self._acquire()
+            except Exception as ex:
+                self.clear()
+                raise SRTNetFunnelError(str(ex))
+
+    async def _acquire(self):
+        fetched_at = time.time()
+        status, key, nwait, ip = await self._start()
+
+        while status == self.WAIT_STATUS_FAIL:
+            print(f"\r현재 {nwait}명 대기중...", end="", flush=True)
+            metrics.NETFUNNEL_WAITS.inc("SRT")
+            metrics.NETFUNNEL_NWAIT.observe(int(nwait or 0), "SRT")
+            await asyncio.sleep(1)
+            status, key, nwait, ip = await self._check(ip, key)
+
+        status, *_ = await self._complete(ip, key)
+        if status not in (self.WAIT_STATUS_PASS, self.ALREADY_COMPLETED):
+            raise SRTNetFunnelError("Failed to complete NetFunnel")
+
+        self._cached_key, self._last_fetch_time = key, fetched_at
+        return key
+
+    def start_refresher(self) -> None:
+        """Keep a valid key ready by renewing it in a background task."""
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_loop())
+
+    async def stop_refresher(self) -> None:
+        refresher, self._refresher = self._refresher, None
+        if refresher is not None:
+            refresher.cancel()
+            await asyncio.gather(refresher, return_exceptions=True)
+
+    async def _refresh_loop(self):
+        while True:
+            delay = self._refresh_delay()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                    self._wake.clear()
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                async with self._lock:
+                    if self._refresh_delay() <= 0:
+                        await self._acquire()
+            except Exception as ex:
+                if self.debug:
+                    print(f"NetFunnel refresh failed: {ex}")
+                await asyncio.sleep(1)
+
+    async def close(self):
+        await self.stop_refresher()
+        await self._session.close()
+
+    def _create_session(self):
+        if not HAS_CURL_CFFI:
+            raise ImportError("AsyncNetFunnelHelper requires curl_cffi")
+        return curl_cffi.AsyncSession(impersonate="chrome")
+
+    async def _make_request(
+        self, opcode: str, ip: str | None = None, key: str | None = None
+    ):
+        params = self._build_params(self.OP_CODE[opcode], key=key)
+        r = await self._session.get(self._url(ip), params=params, verify=False)
+        return self._handle_response(r.text)
+
+
 # SRT class
 class SRT:
     """SRT client class for interacting with the SRT train booking system.
@@ -649,12 +901,10 @@ class SRT:
     def __init__(
         self, srt_id: str, srt_pw: str, auto_login: bool = True, verbose: bool = False
     ) -> None:
-        if HAS_CURL_CFFI:
-            self._session = curl_cffi.Session(impersonate="chrome")
-        else:
-            self._session = requests.session()
+        self._session = self._create_session()
         self._session.headers.update(DEFAULT_HEADERS)
-        self._netfunnel = NetFunnelHelper(debug=verbose)
+        self._netfunnel = self._create_netfunnel(verbose)
+        self._budget = self._create_budget()
         self.srt_id = srt_id
         self.srt_pw = srt_pw
         self.verbose = verbose
@@ -666,10 +916,47 @@ class SRT:
         if auto_login:
             self.login()
 
+    def _create_session(self):
+        if HAS_CURL_CFFI:
+            return curl_cffi.Session(impersonate="chrome")
+        return requests.session()
+
+    def _create_netfunnel(self, verbose: bool) -> NetFunnelHelper:
+        return NetFunnelHelper(debug=verbose)
+
+    def _create_budget(self):
+        return budget.connect()
+
     def _log(self, msg: str) -> None:
         if self.verbose:
             print("[*] " + msg)
 
+    def _on_response(self, endpoint: str, r, latency: float) -> None:
+        metrics.REQUEST_SECONDS.observe(latency, "SRT", endpoint)
+        events.emit(
+            "request",
+            rail="SRT",
+            endpoint=endpoint,
+            status=r.status_code,
+            size=len(r.text),
+            latency=round(latency, 4),
+        )
+        self._log(r.text)
+
+    def _wait_budget(self, endpoint: str) -> None:
+        if self._budget:
+            delay = self._budget.acquire(budget.priority_of(endpoint))
+            if delay >= 0.001:
+                self._log(f"Waited {delay:.3f}s for the request budget")
+
+    def _post(self, endpoint: str, **kwargs):
+        self._wait_budget(endpoint)
+        start = time.perf_counter()
+        r = self._session.post(url=API_ENDPOINTS[endpoint], **kwargs)
+        self._on_response(endpoint, r, time.perf_counter() - start)
+        return r
+
+    @metrics.instrumented("SRT")
     def login(self, srt_id: str | None = None, srt_pw: str | None = None) -> bool:
         """Login to SRT server.
 
@@ -685,6 +972,10 @@ class SRT:
         Raises:
             SRTLoginError: If login fails
         """
+        r = self._post("login", data=self._login_data(srt_id, srt_pw))
+        return self._on_login(r.text)
+
+    def _login_data(self, srt_id: str | None, srt_pw: str | None) -> dict:
         srt_id = srt_id or self.srt_id
         srt_pw = srt_pw or self.srt_pw
 
@@ -697,7 +988,7 @@ class SRT:
         if login_type == "3":
             srt_id = re.sub("-", "", srt_id)
 
-        data = {
+        return {
             "auto": "Y",
             "check": "Y",
             "page": "menu",
@@ -709,18 +1000,16 @@ class SRT:
             "hmpgPwdCphd": srt_pw,
         }
 
-        r = self._session.post(url=API_ENDPOINTS["login"], data=data)
-        self._log(r.text)
-
-        if "존재하지않는 회원입니다" in r.text:
-            raise SRTLoginError(r.json()["MSG"])
-        if "비밀번호 오류" in r.text:
-            raise SRTLoginError(r.json()["MSG"])
-        if "Your IP Address Blocked" in r.text:
-            raise SRTLoginError(r.text.strip())
+    def _on_login(self, text: str) -> bool:
+        if "존재하지않는 회원입니다" in text:
+            raise SRTLoginError(json.loads(text)["MSG"])
+        if "비밀번호 오류" in text:
+            raise SRTLoginError(json.loads(text)["MSG"])
+        if "Your IP Address Blocked" in text:
+            raise SRTLoginError(text.strip())
 
         self.is_login = True
-        user_info = json.loads(r.text)["userMap"]
+        user_info = json.loads(text)["userMap"]
         self.membership_number = user_info["MB_CRD_NO"]
         self.membership_name = user_info["CUST_NM"]
         self.phone_number = user_info["MBL_PHONE"]
@@ -742,9 +1031,10 @@ class SRT:
         if not self.is_login:
             return True
 
-        r = self._session.post(url=API_ENDPOINTS["logout"])
-        self._log(r.text)
+        r = self._post("logout")
+        return self._on_logout(r)
 
+    def _on_logout(self, r) -> bool:
         if not r.ok:
             raise SRTResponseError(r.text)
 
@@ -752,6 +1042,23 @@ class SRT:
         self.membership_number = None
         return True
 
+    def adopt_login(self, other: "SRT") -> None:
+        """Continue the login session of another client instead of logging in again.
+
+        Copies the session cookies and account details, e.g. from a logged-in
+        :class:`SRT` to an :class:`AsyncSRT`. A second login would end up with
+        two server sessions that can log each other out.
+
+        Args:
+            other: Logged-in client whose session to take over
+        """
+        self._session.cookies.update(other._session.cookies)
+        self.is_login = other.is_login
+        self.membership_number = other.membership_number
+        self.membership_name = other.membership_name
+        self.phone_number = other.phone_number
+
+    @metrics.instrumented("SRT")
     def search_train(
         self,
         dep: str,
@@ -779,6 +1086,20 @@ class SRT:
         Raises:
             ValueError: If invalid station names provided
         """
+        data = self._search_train_data(dep, arr, date, time, passengers)
+        data["netfunnelKey"] = self._netfunnel.run()
+
+        r = self._post("search_schedule", data=data)
+        return self._parse_search_train(r.text, time_limit, available_only)
+
+    def _search_train_data(
+        self,
+        dep: str,
+        arr: str,
+        date: str | None,
+        time: str | None,
+        passengers: list[Passenger] | None,
+    ) -> dict:
         if dep not in STATION_CODE or arr not in STATION_CODE:
             raise ValueError(f'Invalid station: "{dep}" or "{arr}"')
 
@@ -797,7 +1118,7 @@ class SRT:
 
         passengers = Passenger.combine(passengers or [Adult()])
 
-        data = {
+        return {
             "chtnDvCd": "1",
             "dptDt": date,
             "dptTm": time,
@@ -816,15 +1137,66 @@ class SRT:
             "tkTrnNo": "",
             "tkTripChgFlg": "",
             "dlayTnumAplFlg": "Y",
-            "netfunnelKey": self._netfunnel.run(),
+            "netfunnelKey": None,
         }
 
-        r = self._session.post(url=API_ENDPOINTS["search_schedule"], data=data)
-        self._log(r.text)
-        parser = SRTResponseData(r.text)
+    @metrics.instrumented("SRT")
+    def search_availability(
+        self,
+        dep: str,
+        arr: str,
+        date: str | None = None,
+        time: str | None = None,
+        time_limit: str | None = None,
+        passengers: list[Passenger] | None = None,
+    ) -> dict[str, Availability]:
+        """Search trains like :meth:`search_train`, returning only seat availability.
 
-        if not parser.success():
-            raise SRTResponseError(parser.message())
+        Lean variant for polling loops: only the fields needed to decide whether to
+        reserve are parsed, and the full SRTTrain is built on demand with
+        :meth:`Availability.train`.
+
+        Returns:
+            Availability of every SRT train keyed by train number, in departure order
+
+        Raises:
+            ValueError: If invalid station names provided
+        """
+        data = self._search_train_data(dep, arr, date, time, passengers)
+        data["netfunnelKey"] = self._netfunnel.run()
+
+        r = self._post("search_schedule", data=data)
+        return self._parse_availability(r.text, time_limit)
+
+    def _parse_availability(
+        self, text: str, time_limit: str | None
+    ) -> dict[str, Availability]:
+        j = decode(text)
+        status = j.get("resultMap", [{}])[0]
+        if status.get("strResult") != SRTResponseData.STATUS_SUCCESS:
+            self._parse_response(text)  # raises the same errors as search_train
+
+        availability = {}
+        for row in j["outDataSets"]["dsOutput1"]:
+            if row["stlbTrnClsfCd"] != "17":
+                continue
+            if time_limit and row["dptTm"] > time_limit:
+                continue
+            availability[row["trnNo"]] = Availability(
+                row["trnNo"],
+                row["dptTm"],
+                "예약가능" in row["gnrmRsvPsbStr"],
+                "예약가능" in row["sprmRsvPsbStr"],
+                int(row["rsvWaitPsbCd"]) == 9,
+                row,
+                SRTTrain,
+            )
+        return availability
+
+    def _parse_search_train(
+        self, text: str, time_limit: str | None, available_only: bool
+    ) -> list[SRTTrain]:
+        parser = self._parse_response(text)
 
         return [
             train
@@ -837,6 +1209,14 @@ class SRT:
             and (not time_limit or train.dep_time <= time_limit)
         ]
 
+    def _parse_response(self, text: str) -> SRTResponseData:
+        parser = SRTResponseData(text)
+
+        if not parser.success():
+            raise SRTResponseError(parser.message())
+
+        return parser
+
     def reserve(
         self,
         train: SRTTrain,
@@ -859,18 +1239,15 @@ class SRT:
             >>> trains = srt.search_train("수서", "부산", "210101", "000000")
             >>> srt.reserve(trains[0])
         """
-        if not train.seat_available() and train.reserve_wait_possible_code >= 0:
+        if self._needs_standby(train):
             reservation = self.reserve_standby(
                 train, passengers, option=option, mblPhone=self.phone_number
             )
             if self.phone_number:
-                agree_class_change = (
-                    option == SeatType.SPECIAL_FIRST or option == SeatType.GENERAL_FIRST
-                )
                 self.reserve_standby_option_settings(
                     reservation,
                     isAgreeSMS=True,
-                    isAgreeClassChange=agree_class_change,
+                    isAgreeClassChange=self._agree_class_change(option),
                     telNo=self.phone_number,
                 )
             return reservation
@@ -883,6 +1260,22 @@ class SRT:
             window_seat=window_seat,
         )
 
+    @staticmethod
+    def _needs_standby(train: SRTTrain) -> bool:
+        return not train.seat_available() and train.reserve_wait_possible_code >= 0
+
+    @staticmethod
+    def _agree_class_change(option: SeatType) -> bool:
+        return option == SeatType.SPECIAL_FIRST or option == SeatType.GENERAL_FIRST
+
+    @staticmethod
+    def _standby_option(option: SeatType) -> SeatType:
+        if option == SeatType.SPECIAL_FIRST:
+            return SeatType.SPECIAL_ONLY
+        if option == SeatType.GENERAL_FIRST:
+            return SeatType.GENERAL_ONLY
+        return option
+
     def reserve_standby(
         self,
         train: SRTTrain,
@@ -905,14 +1298,15 @@ class SRT:
             >>> trains = srt.search_train("수서", "부산", "210101", "000000")
             >>> srt.reserve_standby(trains[0])
         """
-        if option == SeatType.SPECIAL_FIRST:
-            option = SeatType.SPECIAL_ONLY
-        elif option == SeatType.GENERAL_FIRST:
-            option = SeatType.GENERAL_ONLY
         return self._reserve(
-            RESERVE_JOBID["STANDBY"], train, passengers, option, mblPhone=mblPhone
+            RESERVE_JOBID["STANDBY"],
+            train,
+            passengers,
+            self._standby_option(option),
+            mblPhone=mblPhone,
         )
 
+    @metrics.instrumented("SRT")
     def _reserve(
         self,
         jobid: str,
@@ -941,6 +1335,29 @@ class SRT:
             ValueError: If train is not SRT
             SRTError: If reservation not found after creation
         """
+        data = self._reserve_data(
+            jobid, train, passengers, option, mblPhone, window_seat
+        )
+        data["netfunnelKey"] = self._netfunnel.run()
+
+        r = self._post("reserve", data=data)
+        reservation_number = self._parse_reserve(r.text)
+
+        for ticket in self.get_reservations():
+            if ticket.reservation_number == reservation_number:
+                return ticket
+
+        raise SRTError("Ticket not found: check reservation status")
+
+    def _reserve_data(
+        self,
+        jobid: str,
+        train: SRTTrain,
+        passengers: list[Passenger] | None,
+        option: SeatType,
+        mblPhone: str | None,
+        window_seat: bool | None,
+    ) -> dict:
         if not self.is_login:
             raise SRTNotLoggedInError()
 
@@ -984,7 +1401,7 @@ class SRT:
             "dptStnRunOrdr1": train.dep_station_run_order,
             "arvStnRunOrdr1": train.arr_station_run_order,
             "mblPhone": mblPhone,
-            "netfunnelKey": self._netfunnel.run(),
+            "netfunnelKey": None,
         }
 
         if jobid == RESERVE_JOBID["PERSONAL"]:
@@ -995,21 +1412,11 @@ class SRT:
                 passengers, special_seat=is_special_seat, window_seat=window_seat
             )
         )
+        return data
 
-        r = self._session.post(url=API_ENDPOINTS["reserve"], data=data)
-        self._log(r.text)
-        parser = SRTResponseData(r.text)
-
-        if not parser.success():
-            raise SRTResponseError(parser.message())
-
-        reservation_number = parser.get_all()["reservListMap"][0]["pnrNo"]
-
-        for ticket in self.get_reservations():
-            if ticket.reservation_number == reservation_number:
-                return ticket
-
-        raise SRTError("Ticket not found: check reservation status")
+    def _parse_reserve(self, text: str) -> str:
+        parser = self._parse_response(text)
+        return parser.get_all()["reservListMap"][0]["pnrNo"]
 
     def reserve_standby_option_settings(
         self,
@@ -1034,27 +1441,43 @@ class SRT:
             >>> res = srt.reserve_standby(trains[0])
             >>> srt.reserve_standby_option_settings(res, True, True, "010-1234-xxxx")
         """
+        data = self._standby_option_data(
+            reservation, isAgreeSMS, isAgreeClassChange, telNo
+        )
+        r = self._post("standby_option", data=data)
+        return r.status_code == 200
+
+    def _standby_option_data(
+        self,
+        reservation: SRTReservation | int,
+        isAgreeSMS: bool,
+        isAgreeClassChange: bool,
+        telNo: str | None,
+    ) -> dict:
         if not self.is_login:
             raise SRTNotLoggedInError()
 
         reservation_number = getattr(reservation, "reservation_number", reservation)
 
-        data = {
+        return {
             "pnrNo": reservation_number,
             "psrmClChgFlg": "Y" if isAgreeClassChange else "N",
             "smsSndFlg": "Y" if isAgreeSMS else "N",
             "telNo": telNo if isAgreeSMS else "",
         }
 
-        r = self._session.post(url=API_ENDPOINTS["standby_option"], data=data)
-        self._log(r.text)
-        return r.status_code == 200
-
-    def get_reservations(self, paid_only: bool = False) -> list[SRTReservation]:
+    @metrics.instrumented("SRT")
+    def get_reservations(
+        self, paid_only: bool = False, with_tickets: bool = False
+    ) -> list[SRTReservation]:
         """Get all reservations.
 
+        Ticket details are fetched lazily on first access of
+        ``SRTReservation.tickets``, so listing costs a single request.
+
         Args:
             paid_only: Whether to only return paid reservations
+            with_tickets: Fetch the tickets of every reservation now (concurrently)
 
         Returns:
             List of SRTReservation objects
@@ -1066,18 +1489,48 @@ class SRT:
         if not self.is_login:
             raise SRTNotLoggedInError()
 
-        r = self._session.post(url=API_ENDPOINTS["tickets"], data={"pageNo": "0"})
-        self._log(r.text)
-        parser = SRTResponseData(r.text)
+        r = self._post("tickets", data={"pageNo": "0"})
 
-        if not parser.success():
-            raise SRTResponseError(parser.message())
+        reservations = [
+            SRTReservation(train, pay, ticket_loader=self.ticket_info)
+            for train, pay in self._parse_reservations(r.text, paid_only)
+        ]
+        if with_tickets:
+            self.fetch_tickets(reservations)
+        return reservations
+
+    def fetch_tickets(
+        self, reservations: list[SRTReservation]
+    ) -> list[SRTReservation]:
+        """Load the tickets of several reservations concurrently.
+
+        Reservations whose tickets are already loaded are skipped.
+
+        Args:
+            reservations: Reservations to fill in
+
+        Returns:
+            The same reservations, with tickets loaded
+        """
+        pending = [r for r in reservations if not r.tickets_loaded]
+        if not pending:
+            return reservations
+
+        workers = min(len(pending), TICKET_FETCH_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for reservation, tickets in zip(pending, pool.map(self.ticket_info, pending)):
+                reservation.tickets = tickets
+        return reservations
+
+    def _parse_reservations(
+        self, text: str, paid_only: bool
+    ) -> list[tuple[dict, dict]]:
+        parser = self._parse_response(text)
+        data = parser.get_all()
 
         return [
-            SRTReservation(train, pay, self.ticket_info(train["pnrNo"]))
-            for train, pay in zip(
-                parser.get_all()["trainListMap"], parser.get_all()["payListMap"]
-            )
+            (train, pay)
+            for train, pay in zip(data["trainListMap"], data["payListMap"])
             if not paid_only or pay["stlFlg"] != "N"
         ]
 
@@ -1094,23 +1547,21 @@ class SRT:
             SRTNotLoggedInError: If not logged in
             SRTResponseError: If server returns error
         """
+        r = self._post("ticket_info", data=self._ticket_info_data(reservation))
+        return self._parse_ticket_info(r.text)
+
+    def _ticket_info_data(self, reservation: SRTReservation | int) -> dict:
         if not self.is_login:
             raise SRTNotLoggedInError()
 
         reservation_number = getattr(reservation, "reservation_number", reservation)
+        return {"pnrNo": reservation_number, "jrnySqno": "1"}
 
-        r = self._session.post(
-            url=API_ENDPOINTS["ticket_info"],
-            data={"pnrNo": reservation_number, "jrnySqno": "1"},
-        )
-        self._log(r.text)
-        parser = SRTResponseData(r.text)
-
-        if not parser.success():
-            raise SRTResponseError(parser.message())
-
+    def _parse_ticket_info(self, text: str) -> list[SRTTicket]:
+        parser = self._parse_response(text)
         return [SRTTicket(ticket) for ticket in parser.get_all()["trainListMap"]]
 
+    @metrics.instrumented("SRT")
     def cancel(self, reservation: SRTReservation | int) -> bool:
         """Cancel a reservation.
 
@@ -1130,22 +1581,18 @@ class SRT:
             SRTNotLoggedInError: If not logged in
             SRTResponseError: If server returns error
         """
+        r = self._post("cancel", data=self._cancel_data(reservation))
+        self._parse_response(r.text)
+        return True
+
+    def _cancel_data(self, reservation: SRTReservation | int) -> dict:
         if not self.is_login:
             raise SRTNotLoggedInError()
 
         reservation_number = getattr(reservation, "reservation_number", reservation)
+        return {"pnrNo": reservation_number, "jrnyCnt": "1", "rsvChgTno": "0"}
 
-        data = {"pnrNo": reservation_number, "jrnyCnt": "1", "rsvChgTno": "0"}
-
-        r = self._session.post(url=API_ENDPOINTS["cancel"], data=data)
-        self._log(r.text)
-        parser = SRTResponseData(r.text)
-
-        if not parser.success():
-            raise SRTResponseError(parser.message())
-
-        return True
-
+    @metrics.instrumented("SRT")
     def pay_with_card(
         self,
         reservation: SRTReservation,
@@ -1178,10 +1625,32 @@ class SRT:
             SRTNotLoggedInError: If not logged in
             SRTResponseError: If payment fails
         """
+        data = self._payment_data(
+            reservation,
+            number,
+            password,
+            validation_number,
+            expire_date,
+            installment,
+            card_type,
+        )
+        r = self._post("payment", data=data)
+        return self._parse_payment(r.text)
+
+    def _payment_data(
+        self,
+        reservation: SRTReservation,
+        number: str,
+        password: str,
+        validation_number: str,
+        expire_date: str,
+        installment: int,
+        card_type: str,
+    ) -> dict:
         if not self.is_login:
             raise SRTNotLoggedInError()
 
-        data = {
+        return {
             "stlDmnDt": datetime.now().strftime("%Y%m%d"),
             "mbCrdNo": self.membership_number,
             "stlMnsSqno1": "1",
@@ -1215,9 +1684,8 @@ class SRT:
             "pageUrl": "",
         }
 
-        r = self._session.post(url=API_ENDPOINTS["payment"], data=data)
-        self._log(r.text)
-        response = json.loads(r.text)
+    def _parse_payment(self, text: str) -> bool:
+        response = json.loads(text)
 
         if response["outDataSets"]["dsOutput0"][0]["strResult"] == "FAIL":
             raise SRTResponseError(response["outDataSets"]["dsOutput0"][0]["msgTxt"])
@@ -1225,11 +1693,16 @@ class SRT:
         return True
 
     def reserve_info(self, reservation: SRTReservation | int) -> bool:
+        self._set_reserve_info_referer(reservation)
+        r = self._post("reserve_info")
+        return self._parse_reserve_info(r.text)
+
+    def _set_reserve_info_referer(self, reservation: SRTReservation | int) -> None:
         referer = API_ENDPOINTS["reserve_info_referer"] + reservation.reservation_number
         self._session.headers.update({"Referer": referer})
-        r = self._session.post(url=API_ENDPOINTS["reserve_info"])
-        self._log(r.text)
-        response = json.loads(r.text)
+
+    def _parse_reserve_info(self, text: str) -> dict:
+        response = json.loads(text)
         if response.get("ErrorCode") == "0" and response.get("ErrorMsg") == "":
             return response.get("outDataSets").get("dsOutput1")[0]
         else:
@@ -1237,7 +1710,12 @@ class SRT:
 
     def refund(self, reservation: SRTReservation | int) -> bool:
         info = self.reserve_info(reservation)
-        data = {
+        r = self._post("refund", data=self._refund_data(info))
+        self._parse_response(r.text)
+        return True
+
+    def _refund_data(self, info: dict) -> dict:
+        return {
             "pnr_no": info.get("pnrNo"),
             "cnc_dmn_cont": "승차권 환불로 취소",
             "saleDt": info.get("ogtkSaleDt"),
@@ -1247,15 +1725,288 @@ class SRT:
             "psgNm": info.get("buyPsNm"),
         }
 
-        r = self._session.post(url=API_ENDPOINTS["refund"], data=data)
-        self._log(r.text)
-        response = SRTResponseData(r.text)
+    def clear(self):
+        self._log("Clearing the netfunnel key")
+        self._netfunnel.clear()
+
+    def start_netfunnel_refresh(self) -> None:
+        """Prefetch the NetFunnel key and renew it in the background before it
+        expires, so searches and reservations never wait for the funnel inline.
+        """
+        self._netfunnel.start_refresher()
+
+    def stop_netfunnel_refresh(self) -> None:
+        self._netfunnel.stop_refresher()
+
+
+class AsyncSRT(SRT):
+    """asyncio counterpart of :class:`SRT` built on curl_cffi's ``AsyncSession``.
+
+    Request building and response parsing are shared with :class:`SRT`, so the
+    same ``SRTTrain``/``SRTReservation``/``SRTTicket`` models are returned. Many
+    requests can be in flight on one login and one NetFunnel key.
+
+    Login cannot happen in the constructor; use the client as an async context
+    manager (logs in when ``auto_login`` is set) or await :meth:`login`.
+
+    Examples:
+        >>> async with AsyncSRT("1234567890", YOUR_PASSWORD) as srt:
+        ...     trains = await srt.search_train("수서", "부산", "20250101", "000000")
+        ...     reservation = await srt.reserve(trains[0])
+    """
+
+    def __init__(
+        self, srt_id: str, srt_pw: str, auto_login: bool = True, verbose: bool = False
+    ) -> None:
+        super().__init__(srt_id, srt_pw, auto_login=False, verbose=verbose)
+        self._auto_login = auto_login
+
+    async def __aenter__(self) -> "AsyncSRT":
+        if self._auto_login and not self.is_login:
+            await self.login()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _create_session(self):
+        if not HAS_CURL_CFFI:
+            raise ImportError("AsyncSRT requires curl_cffi")
+        return curl_cffi.AsyncSession(impersonate="chrome")
+
+    def _create_netfunnel(self, verbose: bool) -> AsyncNetFunnelHelper:
+        return AsyncNetFunnelHelper(debug=verbose)
+
+    def _create_budget(self):
+        return budget.connect_async()
+
+    async def _wait_budget(self, endpoint: str) -> None:
+        if self._budget:
+            delay = await self._budget.acquire(budget.priority_of(endpoint))
+            if delay >= 0.001:
+                self._log(f"Waited {delay:.3f}s for the request budget")
+
+    async def _post(self, endpoint: str, **kwargs):
+        await self._wait_budget(endpoint)
+        start = time.perf_counter()
+        r = await self._session.post(url=API_ENDPOINTS[endpoint], **kwargs)
+        self._on_response(endpoint, r, time.perf_counter() - start)
+        return r
+
+    async def close(self) -> None:
+        """Close the underlying HTTP sessions."""
+        await self._session.close()
+        await self._netfunnel.close()
+        if self._budget:
+            await self._budget.close()
+
+    async def stop_netfunnel_refresh(self) -> None:
+        await self._netfunnel.stop_refresher()
+
+    @metrics.instrumented("SRT")
+    async def login(
+        self, srt_id: str | None = None, srt_pw: str | None = None
+    ) -> bool:
+        r = await self._post("login", data=self._login_data(srt_id, srt_pw))
+        return self._on_login(r.text)
+
+    async def logout(self) -> bool:
+        if not self.is_login:
+            return True
+
+        r = await self._post("logout")
+        return self._on_logout(r)
+
+    @metrics.instrumented("SRT")
+    async def search_train(
+        self,
+        dep: str,
+        arr: str,
+        date: str | None = None,
+        time: str | None = None,
+        time_limit: str | None = None,
+        passengers: list[Passenger] | None = None,
+        available_only: bool = True,
+    ) -> list[SRTTrain]:
+        data = self._search_train_data(dep, arr, date, time, passengers)
+        data["netfunnelKey"] = await self._netfunnel.run()
+
+        r = await self._post("search_schedule", data=data)
+        return self._parse_search_train(r.text, time_limit, available_only)
+
+    @metrics.instrumented("SRT")
+    async def search_availability(
+        self,
+        dep: str,
+        arr: str,
+        date: str | None = None,
+        time: str | None = None,
+        time_limit: str | None = None,
+        passengers: list[Passenger] | None = None,
+    ) -> dict[str, Availability]:
+        data = self._search_train_data(dep, arr, date, time, passengers)
+        data["netfunnelKey"] = await self._netfunnel.run()
+
+        r = await self._post("search_schedule", data=data)
+        return self._parse_availability(r.text, time_limit)
+
+    async def reserve(
+        self,
+        train: SRTTrain,
+        passengers: list[Passenger] | None = None,
+        option: SeatType = SeatType.GENERAL_FIRST,
+        window_seat: bool | None = None,
+    ) -> SRTReservation:
+        if self._needs_standby(train):
+            reservation = await self.reserve_standby(
+                train, passengers, option=option, mblPhone=self.phone_number
+            )
+            if self.phone_number:
+                await self.reserve_standby_option_settings(
+                    reservation,
+                    isAgreeSMS=True,
+                    isAgreeClassChange=self._agree_class_change(option),
+                    telNo=self.phone_number,
+                )
+            return reservation
+
+        return await self._reserve(
+            RESERVE_JOBID["PERSONAL"],
+            train,
+            passengers,
+            option,
+            window_seat=window_seat,
+        )
+
+    async def reserve_standby(
+        self,
+        train: SRTTrain,
+        passengers: list[Passenger] | None = None,
+        option: SeatType = SeatType.GENERAL_FIRST,
+        mblPhone: str | None = None,
+    ) -> SRTReservation:
+        return await self._reserve(
+            RESERVE_JOBID["STANDBY"],
+            train,
+            passengers,
+            self._standby_option(option),
+            mblPhone=mblPhone,
+        )
+
+    @metrics.instrumented("SRT")
+    async def _reserve(
+        self,
+        jobid: str,
+        train: SRTTrain,
+        passengers: list[Passenger] | None = None,
+        option: SeatType = SeatType.GENERAL_FIRST,
+        mblPhone: str | None = None,
+        window_seat: bool | None = None,
+    ) -> SRTReservation:
+        data = self._reserve_data(
+            jobid, train, passengers, option, mblPhone, window_seat
+        )
+        data["netfunnelKey"] = await self._netfunnel.run()
+
+        r = await self._post("reserve", data=data)
+        reservation_number = self._parse_reserve(r.text)
+
+        for ticket in await self.get_reservations():
+            if ticket.reservation_number == reservation_number:
+                return ticket
+
+        raise SRTError("Ticket not found: check reservation status")
+
+    async def reserve_standby_option_settings(
+        self,
+        reservation: SRTReservation | int,
+        isAgreeSMS: bool,
+        isAgreeClassChange: bool,
+        telNo: str | None = None,
+    ) -> bool:
+        data = self._standby_option_data(
+            reservation, isAgreeSMS, isAgreeClassChange, telNo
+        )
+        r = await self._post("standby_option", data=data)
+        return r.status_code == 200
+
+    @metrics.instrumented("SRT")
+    async def get_reservations(
+        self, paid_only: bool = False, with_tickets: bool = False
+    ) -> list[SRTReservation]:
+        """Get all reservations.
+
+        Tickets cannot be loaded from a property without blocking the event
+        loop, so they stay unloaded unless ``with_tickets`` is set or
+        :meth:`fetch_tickets` is awaited.
+        """
+        if not self.is_login:
+            raise SRTNotLoggedInError()
 
-        if not response.success():
-            raise SRTResponseError(response.message())
+        r = await self._post("tickets", data={"pageNo": "0"})
 
+        reservations = [
+            SRTReservation(train, pay)
+            for train, pay in self._parse_reservations(r.text, paid_only)
+        ]
+        if with_tickets:
+            await self.fetch_tickets(reservations)
+        return reservations
+
+    async def fetch_tickets(
+        self, reservations: list[SRTReservation]
+    ) -> list[SRTReservation]:
+        pending = [r for r in reservations if not r.tickets_loaded]
+        limit = asyncio.Semaphore(TICKET_FETCH_CONCURRENCY)
+
+        async def _fetch(reservation):
+            async with limit:
+                reservation.tickets = await self.ticket_info(reservation)
+
+        await asyncio.gather(*(_fetch(r) for r in pending))
+        return reservations
+
+    async def ticket_info(self, reservation: SRTReservation | int) -> list[SRTTicket]:
+        data = self._ticket_info_data(reservation)
+        r = await self._post("ticket_info", data=data)
+        return self._parse_ticket_info(r.text)
+
+    @metrics.instrumented("SRT")
+    async def cancel(self, reservation: SRTReservation | int) -> bool:
+        r = await self._post("cancel", data=self._cancel_data(reservation))
+        self._parse_response(r.text)
         return True
 
-    def clear(self):
-        self._log("Clearing the netfunnel key")
-        self._netfunnel.clear()
\ No newline at end of file
+    @metrics.instrumented("SRT")
+    async def pay_with_card(
+        self,
+        reservation: SRTReservation,
+        number: str,
+        password: str,
+        validation_number: str,
+        expire_date: str,
+        installment: int = 0,
+        card_type: str = "J",
+    ) -> bool:
+        data = self._payment_data(
+            reservation,
+            number,
+            password,
+            validation_number,
+            expire_date,
+            installment,
+            card_type,
+        )
+        r = await self._post("payment", data=data)
+        return self._parse_payment(r.text)
+
+    async def reserve_info(self, reservation: SRTReservation | int) -> dict:
+        self._set_reserve_info_referer(reservation)
+        r = await self._post("reserve_info")
+        return self._parse_reserve_info(r.text)
+
+    async def refund(self, reservation: SRTReservation | int) -> bool:
+        info = await self.reserve_info(reservation)
+        r = await self._post("refund", data=self._refund_data(info))
+        self._parse_response(r.text)
+        return True
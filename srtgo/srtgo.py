@@ -1,7 +1,5 @@
-from curl_cffi.requests.exceptions import ConnectionError
+from contextlib import closing
 from datetime import datetime, timedelta
-from json.decoder import JSONDecodeError
-from random import gammavariate
 from termcolor import colored
 from typing import Awaitable, Callable, List, Optional, Tuple, Union
 
@@ -12,11 +10,15 @@ import keyring
 import telegram
 import time
 import re
-from . import scheduler 
+import sqlite3
+from . import events, history, metrics, scheduler
+from .budget import main as budget_main
+from .bench import main as bench_main
 
 from .ktx import (
+    STATIONS as KTX_STATIONS,
+    AsyncKorail,
     Korail,
-    KorailError,
     ReserveOption,
     TrainType,
     AdultPassenger,
@@ -27,9 +29,9 @@ from .ktx import (
 )
 
 from .srt import (
+    AsyncSRT,
     SRT,
     SRTError,
-    SRTNetFunnelError,
     SeatType,
     Adult,
     Child,
@@ -39,7 +41,18 @@ from .srt import (
 )
 
 from .accounts import list_aliases, add_account, get_account_credentials
+from .daemon import Daemon, send_command
+from .jobs import JobError, load_job, read_job_file
+from .replay import ReplayError, record as record_traffic, replay as replay_traffic
 from .cards import list_card_aliases, add_card as add_card_info, get_card_credentials as get_card_info, remove_card as remove_card_info
+from .watch import (
+    WARMUP_BEFORE,
+    SearchTarget,
+    WatchAborted,
+    WatchEngine,
+    classify_error,
+    train_number,
+)
 
 
 
@@ -78,60 +91,58 @@ STATIONS = {
         "천안아산",
         "포항",
     ],
-    "KTX": [
-        "서울",
-        "용산",
-        "영등포",
-        "광명",
-        "수원",
-        "천안아산",
-        "오송",
-        "대전",
-        "서대전",
-        "김천구미",
-        "동대구",
-        "경주",
-        "포항",
-        "밀양",
-        "구포",
-        "부산",
-        "울산(통도사)",
-        "마산",
-        "창원중앙",
-        "경산",
-        "논산",
-        "익산",
-        "정읍",
-        "광주송정",
-        "목포",
-        "전주",
-        "순천",
-        "여수EXPO",
-        "청량리",
-        "강릉",
-        "행신",
-        "정동진",
-    ],
+    "KTX": list(KTX_STATIONS),
 }
 DEFAULT_STATIONS = {
     "SRT": ["수서", "대전", "동대구", "부산"],
     "KTX": ["서울", "대전", "동대구", "부산"],
 }
 
-# 예약 간격 (평균 간격 (초) = SHAPE * SCALE): gamma distribution (1.25 +/- 0.25 s)
-RESERVE_INTERVAL_SHAPE = 4
-RESERVE_INTERVAL_SCALE = 0.25
-RESERVE_INTERVAL_MIN = 0.25
-
 WAITING_BAR = ["|", "/", "-", "\\"]
 
 RailType = Union[str, None]
 ChoiceType = Union[int, None]
 
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.option("--debug", is_flag=True, help="Debug mode")
-def srtgo(debug=False):
+@click.option(
+    "--metrics-port",
+    type=int,
+    envvar="SRTGO_METRICS_PORT",
+    help="이 포트(localhost)에 Prometheus 형식의 /metrics 를 제공",
+)
+@click.option(
+    "--event-log",
+    type=click.Path(dir_okay=False),
+    envvar=events.EVENT_LOG_ENV,
+    help="예매 과정의 이벤트를 JSON lines 로 기록할 파일 (자동 교체)",
+)
+@click.option(
+    "--history",
+    "history_db",
+    type=click.Path(dir_okay=False),
+    envvar=history.HISTORY_ENV,
+    help="좌석 상태 변화를 기록할 SQLite 파일",
+)
+@click.pass_context
+def srtgo(ctx, debug=False, metrics_port=None, event_log=None, history_db=None):
+    ctx.obj = {"debug": debug, "history": history_db}
+    if event_log:
+        events.configure(event_log)
+    if history_db:
+        try:
+            history.configure(history_db)
+        except sqlite3.Error as e:
+            raise click.ClickException(f"history {history_db}: {e}")
+    if metrics_port:
+        try:
+            metrics.serve(metrics_port)
+        except OSError as e:
+            raise click.ClickException(f"metrics 포트 {metrics_port}: {e}")
+    if ctx.invoked_subcommand is not None:
+        return
+
     MENU_CHOICES = [
         ("예매 시작", 1),
         ("예매 확인/결제/취소", 2),
@@ -764,6 +775,7 @@ def reserve(rail_type="SRT", debug=False, is_schedule_mode=False):
     duration_mins = scheduler.select_duration() # 0이면 무제한, 그외 분 단위
 
     scheduled_dt = None
+    start_ts = None
     should_shutdown = False
     
     # [수정] 2. 종료 여부는 시간 선택 직후에 한 번만 물어봅니다. (성공이든 시간초과든 종료할지)
@@ -787,15 +799,8 @@ def reserve(rail_type="SRT", debug=False, is_schedule_mode=False):
         else:
             print(f"⏰ {start_str}부터 예매를 시작합니다 (무제한).")
 
-        # 3-3. 대기 및 재로그인
-        scheduler.wait_until(scheduled_dt)
-        print("\n🔄 세션 갱신을 위해 재로그인을 시도합니다...")
-        try:
-            rail = (SRT if rail_type == "SRT" else Korail)(user_id, password, verbose=debug)
-            print("✅ 재로그인 성공! 예매를 시작합니다.")
-        except Exception as e:
-            print(f"❌ 재로그인 실패: {e}")
-            return
+        # 3-3. 대기 (재로그인은 감시 시작 시 수행)
+        start_ts = scheduler.wait_until(scheduled_dt, rail_type, warmup=WARMUP_BEFORE)
     
     else:
         # 4. 즉시 모드 메시지 출력
@@ -819,148 +824,156 @@ def reserve(rail_type="SRT", debug=False, is_schedule_mode=False):
 
     # =========================================================================
 
-    def _reserve(train):
-        reserve = rail.reserve(train, passengers=passengers, option=options["type"])
-        msg = f"{reserve}"
-        if hasattr(reserve, "tickets") and reserve.tickets:
-            msg += "\n" + "\n".join(map(str, reserve.tickets))
-
-        print(colored(f"\n\n🎫 🎉 예매 성공!!! 🎉 🎫\n{msg}\n", "red", "on_green"))
-
-        if pay_now and not reserve.is_waiting:
-            num, pw, bd, exp = get_card_info(selected_card_alias)
-            ok = rail.pay_with_card(
-                reserve,
-                num, pw, bd, exp,
-                0,
-                "J" if len(bd) == 6 else "S",
+    # 선택한 열차는 목록 위치가 아닌 열차 번호로 추적
+    targets = [
+        SearchTarget(
+            dep=params["dep"],
+            arr=params["arr"],
+            date=params["date"],
+            time=params["time"],
+            trains=[train_number(trains[i]) for i in choice["trains"]],
+            options={"train_type": params["train_type"]} if "train_type" in params else {},
+        )
+    ]
+
+    try:
+        result = asyncio.run(
+            watch_and_reserve(
+                rail_type,
+                user_id,
+                password,
+                targets,
+                passengers,
+                options["type"],
+                deadline=limit_end_time,
+                card_alias=selected_card_alias if pay_now else None,
+                debug=debug,
+                on_poll=_progress_printer(),
+                on_error=_handle_error,
+                login_notice="✅ 재로그인 성공! 시작 시각까지 연결을 유지합니다." if is_schedule_mode else None,
+                start=start_ts,
+                # 바로 예매는 열차 조회에 쓴 세션을 이어 씀 (두 번 로그인하면 서로 로그아웃될 수 있음)
+                rail=None if is_schedule_mode else rail,
             )
-            if ok:
-                print(colored("\n\n💳 ✨ 결제 성공!!! ✨ 💳\n\n", "green", "on_red"), end="")
-                msg += "\n결제 완료"
+        )
+    except KeyboardInterrupt:
+        print("\n🛑 예매를 중단합니다. 메인 메뉴로 돌아갑니다.")
+        return
+    except WatchAborted:
+        return
 
-        tgprintf = get_telegram()
-        asyncio.run(tgprintf(msg))
-        
-        # [수정] 성공 시에도 종료 옵션 체크
-        if should_shutdown:
-            scheduler.shutdown_computer()
+    # [수정] 타임아웃 시에도 종료 옵션 체크
+    if result is None:
+        print(colored(f"\n\n🛑 설정한 예매 지속 시간({duration_mins}분)이 지났습니다. 예매를 종료합니다.", "yellow"))
 
-    # Reservation loop
-    i_try = 0
-    start_time = time.time()
-    while True:
-        try:
-            # [수정] 시간 제한 체크 (타임아웃 시에도 종료 옵션 체크)
-            if limit_end_time and datetime.now() > limit_end_time:
-                print(colored(f"\n\n🛑 설정한 예매 지속 시간({duration_mins}분)이 지났습니다. 예매를 종료합니다.", "yellow"))
-                
-                # 타임아웃 종료 시에도 컴퓨터 종료 실행
-                if should_shutdown:
-                    scheduler.shutdown_computer()
-                return
-
-            i_try += 1
-            elapsed_time = time.time() - start_time
-            hours, remainder = divmod(int(elapsed_time), 3600)
-            minutes, seconds = divmod(remainder, 60)
-            print(
-                f"\r예매 대기 중... {WAITING_BAR[i_try & 3]} {i_try:4d} ({hours:02d}:{minutes:02d}:{seconds:02d}) ",
-                end="",
-                flush=True,
-            )
+    if should_shutdown:
+        scheduler.shutdown_computer()
 
-            trains = rail.search_train(**params)
-            for i in choice["trains"]:
-                if _is_seat_available(trains[i], options["type"], rail_type):
-                    _reserve(trains[i])
-                    return
-            _sleep()
-            
-        except KeyboardInterrupt:
-            print("\n🛑 예매를 중단합니다. 메인 메뉴로 돌아갑니다.")
-            return
-        except SRTError as ex:
-            msg = ex.msg
-            if "정상적인 경로로 접근 부탁드립니다" in msg or isinstance(
-                ex, SRTNetFunnelError
-            ):
-                if debug:
-                    print(f"\nException: {ex}\nType: {type(ex)}\nArgs: {ex.args}\nMessage: {msg}")
-                rail.clear()
-            elif "로그인 후 사용하십시오" in msg:
-                if debug:
-                    print(f"\nException: {ex}\nType: {type(ex)}\nArgs: {ex.args}\nMessage: {msg}")
-                try:
-                     rail = (SRT if rail_type == "SRT" else Korail)(user_id, password, verbose=debug)
-                except:
-                     pass
-
-                if not rail.is_login and not _handle_error(ex):
-                    return
-            elif not any(
-                err in msg
-                for err in (
-                    "잔여석없음",
-                    "사용자가 많아 접속이 원활하지 않습니다",
-                    "예약대기 접수가 마감되었습니다",
-                    "예약대기자한도수초과",
-                )
-            ):
-                if not _handle_error(ex):
-                    return
-            _sleep()
-
-        except KorailError as ex:
-            msg = ex.msg
-            if "Need to Login" in msg:
-                try:
-                     rail = (SRT if rail_type == "SRT" else Korail)(user_id, password, verbose=debug)
-                except:
-                     pass
-                if not rail.is_login and not _handle_error(ex):
-                    return
-            elif not any(
-                err in msg
-                for err in ("Sold out", "잔여석없음", "예약대기자한도수초과")
-            ):
-                if not _handle_error(ex):
-                    return
-            _sleep()
-
-        except JSONDecodeError as ex:
-            if debug:
-                print(f"\nException: {ex}\nType: {type(ex)}\nArgs: {ex.args}\nMessage: {ex.msg}")
-            _sleep()
-            try:
-                 rail = (SRT if rail_type == "SRT" else Korail)(user_id, password, verbose=debug)
-            except:
-                 pass
 
-        except ConnectionError as ex:
-            if not _handle_error(ex, "연결이 끊겼습니다"):
-                return
-            try:
-                 rail = (SRT if rail_type == "SRT" else Korail)(user_id, password, verbose=debug)
-            except:
-                 pass
-
-        except Exception as ex:
-            if debug:
-                print("\nUndefined exception")
-            if not _handle_error(ex):
-                return
-            try:
-                 rail = (SRT if rail_type == "SRT" else Korail)(user_id, password, verbose=debug)
-            except:
-                 pass
+async def _on_reserved(arail, reserve, card_alias=None):
+    msg = f"{reserve}"
+    print(colored(f"\n\n🎫 🎉 예매 성공!!! 🎉 🎫\n{msg}\n", "red", "on_green"))
 
+    paid = False
+    if card_alias and not reserve.is_waiting:
+        num, pw, bd, exp = get_card_info(card_alias)
+        paid = await arail.pay_with_card(
+            reserve,
+            num, pw, bd, exp,
+            0,
+            "J" if len(bd) == 6 else "S",
+        )
+        if paid:
+            print(colored("\n\n💳 ✨ 결제 성공!!! ✨ 💳\n\n", "green", "on_red"), end="")
+
+    # 좌석 상세는 결제 이후에 조회 (예약~결제 사이 지연 최소화)
+    if isinstance(arail, AsyncSRT):
+        await arail.fetch_tickets([reserve])
+    if hasattr(reserve, "tickets") and reserve.tickets:
+        tickets = "\n".join(map(str, reserve.tickets))
+        print(tickets)
+        msg += "\n" + tickets
+    if paid:
+        msg += "\n결제 완료"
 
-def _sleep():
-    time.sleep(
-        gammavariate(RESERVE_INTERVAL_SHAPE, RESERVE_INTERVAL_SCALE)
-        + RESERVE_INTERVAL_MIN
-    )
+    tgprintf = get_telegram()
+    await tgprintf(msg)
+
+
+def _progress_printer():
+    start_time = time.time()
+
+    def _progress(target, i_try):
+        elapsed_time = time.time() - start_time
+        hours, remainder = divmod(int(elapsed_time), 3600)
+        minutes, seconds = divmod(remainder, 60)
+        print(
+            f"\r예매 대기 중... {WAITING_BAR[i_try & 3]} {i_try:4d} ({hours:02d}:{minutes:02d}:{seconds:02d}) "
+            f"{target.pacer.rate:.1f}회/초 ",
+            end="",
+            flush=True,
+        )
+
+    return _progress
+
+
+async def watch_and_reserve(
+    rail_type,
+    user_id,
+    password,
+    targets,
+    passengers,
+    option,
+    deadline=None,
+    card_alias=None,
+    debug=False,
+    on_poll=None,
+    on_error=None,
+    login_notice=None,
+    transport=None,
+    start=None,
+    speculative=False,
+    race=1,
+    rail=None,
+):
+    """
+    로그인 후 targets 를 감시하다가 예매에 성공하면 (card_alias 가 있으면 결제 후) 알림을 보냅니다.
+    deadline 이 지나면 None 을 반환합니다.
+    transport 는 로그인 전에 클라이언트에 적용됩니다 (replay.record / replay.replay).
+    start 를 주면 로그인 후 그 시각(로컬 timestamp)까지 연결을 유지하다가 시작합니다.
+    speculative 면 start 시각에 조회 없이 targets 의 첫 번째 열차를 바로 예약해 봅니다.
+    race 는 한 번의 조회에서 함께 풀린 열차를 동시에 예약해 볼 최대 개수입니다.
+    rail 에 로그인된 (동기) 클라이언트를 주면 다시 로그인하지 않고 그 세션을 이어 씁니다.
+    """
+    rail_cls = AsyncSRT if rail_type == "SRT" else AsyncKorail
+    async with rail_cls(user_id, password, auto_login=False, verbose=debug) as arail:
+        if transport:
+            transport(arail)
+        try:
+            if rail is not None and (rail.is_login if rail_type == "SRT" else rail.logined):
+                arail.adopt_login(rail)
+            else:
+                await arail.login()
+        except Exception as e:
+            print(f"❌ 로그인 실패: {e}")
+            raise WatchAborted(str(e)) from e
+        if login_notice:
+            print(login_notice)
+        engine = WatchEngine(
+            arail,
+            targets,
+            passengers=passengers,
+            option=option,
+            deadline=deadline,
+            on_poll=on_poll,
+            on_error=on_error,
+            speculative=speculative,
+            race=race,
+        )
+        result = await engine.run(start)
+        if result:
+            await _on_reserved(arail, result.reservation, card_alias)
+        return result
 
 
 def _handle_error(ex, msg=None):
@@ -974,25 +987,6 @@ def _handle_error(ex, msg=None):
     return inquirer.confirm(message="계속할까요", default=True)
 
 
-def _is_seat_available(train, seat_type, rail_type):
-    if rail_type == "SRT":
-        if not train.seat_available():
-            return train.reserve_standby_available()
-        if seat_type in [SeatType.GENERAL_FIRST, SeatType.SPECIAL_FIRST]:
-            return train.seat_available()
-        if seat_type == SeatType.GENERAL_ONLY:
-            return train.general_seat_available()
-        return train.special_seat_available()
-    else:
-        if not train.has_seat():
-            return train.has_waiting_list()
-        if seat_type in [ReserveOption.GENERAL_FIRST, ReserveOption.SPECIAL_FIRST]:
-            return train.has_seat()
-        if seat_type == ReserveOption.GENERAL_ONLY:
-            return train.has_general_seat()
-        return train.has_special_seat()
-
-
 def check_reservation(rail_type="SRT", debug=False):
     rail = login(rail_type, debug=debug)
 
@@ -1032,6 +1026,9 @@ def check_reservation(rail_type="SRT", debug=False):
             out = []
             if all_reservations:
                 out.append("[ 예매 내역 ]")
+                if rail_type == "SRT":
+                    # 승차권 정보를 예약마다 하나씩 조회하지 않고 한 번에 동시 조회
+                    rail.fetch_tickets(reservations)
                 for reservation in all_reservations:
                     out.append(f"🚅{reservation}")
                     if rail_type == "SRT":
@@ -1128,5 +1125,200 @@ def login_menu(rail_type: RailType, debug: bool=False) -> Optional[str]:
 
 
 
+@srtgo.command("run")
+@click.argument("job_file", type=click.Path(exists=True, dir_okay=False))
+@click.option("--debug", is_flag=True, help="Debug mode")
+@click.option("--record", type=click.Path(dir_okay=False), help="요청/응답을 기록할 파일 (.jsonl.gz)")
+@click.option("--replay", type=click.Path(exists=True, dir_okay=False), help="기록된 응답으로 실행 (서버에 접속하지 않음)")
+@click.option("--speed", type=float, default=1.0, show_default=True, help="재생 속도 배수 (0: 대기 없이)")
+@click.pass_context
+def run_job(ctx, job_file, debug=False, record=None, replay=None, speed=1.0):
+    """작업 파일(TOML/JSON)에 적힌 대로 프롬프트 없이 예매를 실행합니다.
+
+    종료 코드: 0 예매 성공, 1 오류, 2 예매 지속 시간 초과
+    """
+    debug = debug or ctx.obj["debug"]
+    if record and replay:
+        raise click.UsageError("--record 와 --replay 는 함께 쓸 수 없습니다")
+    try:
+        job = load_job(job_file)
+        user_id, password = get_account_credentials(job.rail, job.account)
+        if job.card:
+            get_card_info(job.card)
+        targets = job.targets()
+    except (JobError, KeyError) as e:
+        raise click.ClickException(str(e.args[0]))
+
+    print(f"[{job.rail}] {job.account}: " + ", ".join(map(str, targets)), flush=True)
+
+    start = None
+    if job.start_at and job.start_at > datetime.now() and not replay:
+        print(f"⏰ {job.start_at:%Y-%m-%d %H:%M:%S}에 예매를 시작합니다.", flush=True)
+        start = scheduler.wait_for_server_time(job.start_at, job.rail, job.lead, WARMUP_BEFORE)
+
+    archives = []
+    transport = None
+    on_error = _report_error
+    if record:
+        transport = lambda rail: archives.append(record_traffic(rail, record))
+    elif replay:
+        transport = lambda rail: replay_traffic(rail, replay, speed or None)
+        # 기록된 응답을 다 쓰면 재시도하지 않고 중단
+        on_error = lambda ex, msg=None: not isinstance(ex, ReplayError) and _report_error(ex, msg)
+
+    try:
+        result = asyncio.run(
+            watch_and_reserve(
+                job.rail,
+                user_id,
+                password,
+                targets,
+                job.passenger_list(),
+                job.seat_option(),
+                deadline=job.deadline(),
+                card_alias=job.card,
+                debug=debug,
+                on_error=on_error,
+                transport=transport,
+                start=start,
+                speculative=job.speculative,
+                race=job.race,
+            )
+        )
+    except WatchAborted:
+        ctx.exit(1)
+    except KeyboardInterrupt:
+        print("\n🛑 예매를 중단합니다.")
+        ctx.exit(130)
+    finally:
+        for archive in archives:
+            archive.close()
+
+    if result is None:
+        print(f"🛑 예매 지속 시간({job.duration}분)이 지났습니다. 예매를 종료합니다.", flush=True)
+        ctx.exit(2)
+
+
+@srtgo.command("daemon")
+@click.option("--debug", is_flag=True, help="Debug mode")
+@click.option(
+    "--shared-polling",
+    is_flag=True,
+    help="같은 구간/날짜를 감시하는 여러 계정의 작업이 조회를 한 번만 하고 결과를 공유",
+)
+@click.pass_context
+def run_daemon(ctx, debug=False, shared_polling=False):
+    """계정별 세션 하나로 여러 예매 작업을 실행하는 데몬을 시작합니다."""
+    daemon = Daemon(
+        debug=debug or ctx.obj["debug"],
+        on_reserved=_on_reserved,
+        on_error=_report_error,
+        shared_polling=shared_polling,
+    )
+    try:
+        asyncio.run(daemon.serve())
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        raise click.ClickException(str(e))
+
+
+@srtgo.command("ctl")
+@click.argument("action", type=click.Choice(["add", "remove", "list", "shutdown"]))
+@click.argument("target", required=False)
+def daemon_ctl(action, target=None):
+    """실행 중인 데몬을 제어합니다.
+
+    \b
+    srtgo ctl add job.toml
+    srtgo ctl remove <작업 ID>
+    srtgo ctl list
+    srtgo ctl shutdown
+    """
+    request = {"cmd": action}
+    if action in ("add", "remove"):
+        if not target:
+            raise click.UsageError(f"{action} 에는 {'작업 파일' if action == 'add' else '작업 ID'}가 필요합니다")
+        if action == "add":
+            try:
+                request["job"] = read_job_file(target)
+            except JobError as e:
+                raise click.ClickException(str(e))
+        else:
+            request["id"] = target
+
+    try:
+        reply = send_command(request)
+    except OSError as e:
+        raise click.ClickException(f"데몬에 연결할 수 없습니다: {e}")
+    if not reply.get("ok"):
+        raise click.ClickException(reply.get("error", "Unknown error"))
+
+    if action == "add":
+        print(f"작업 {reply['id']} 추가됨")
+    elif action == "list":
+        for job in reply["jobs"]:
+            line = (
+                f"[{job['id']}] {job['rail']} {job['account']} {job['route']} "
+                f"{','.join(job['dates'])} {job['status']} ({job['attempts']}회)"
+            )
+            if job["result"] or job["error"]:
+                line += f" - {job['result'] or job['error']}"
+            print(line)
+
+
+@srtgo.command("history")
+@click.argument("dep")
+@click.argument("arr")
+@click.option("--rail", type=click.Choice(["SRT", "KTX"]), help="열차 종류 (기본: 전체)")
+@click.option("--days", type=int, default=30, show_default=True, help="최근 며칠의 기록을 볼지")
+@click.pass_context
+def show_history(ctx, dep, arr, rail=None, days=30):
+    """구간의 시간대별, 출발 며칠 전별 좌석 오픈 횟수를 보여줍니다 (--history 로 기록한 파일).
+
+    \b
+    srtgo --history ~/.srtgo/history.db history 수서 부산
+    """
+    if not ctx.obj["history"]:
+        raise click.UsageError("--history 로 기록 파일을 지정하세요")
+    since = time.time() - days * 86400
+    with closing(history.connect(ctx.obj["history"])) as conn:
+        opened = history.openings_per_hour(conn, dep, arr, rail, since)
+        searched = history.searches_per_hour(conn, dep, arr, rail, since)
+        lead_opened = history.openings_per_lead(conn, dep, arr, rail, since)
+        lead_searched = history.searches_per_lead(conn, dep, arr, rail, since)
+    if not any(searched.values()):
+        print(f"{dep}~{arr} 기록이 없습니다")
+        return
+    print(f"{dep}~{arr} 최근 {days}일 시간대별 좌석 오픈 (오픈/조회)")
+    for hour in range(24):
+        if searched[hour] or opened[hour]:
+            print(f"{hour:02d}시  {opened[hour]:>5} / {searched[hour]:<7} {'#' * min(opened[hour], 50)}")
+    print(f"{dep}~{arr} 출발 며칠 전 좌석 오픈 (오픈/조회)")
+    for bucket, start in enumerate(history.LEAD_DAYS):
+        if lead_searched[bucket] or lead_opened[bucket]:
+            print(
+                f"{start:>2}일 전~  {lead_opened[bucket]:>5} / {lead_searched[bucket]:<7} "
+                f"{'#' * min(lead_opened[bucket], 50)}"
+            )
+
+
+srtgo.add_command(budget_main, "budget")
+srtgo.add_command(bench_main, "bench")
+
+
+def _report_error(ex, msg=None):
+    # 무인 실행용 오류 처리: 알리고, 서버/연결 오류면 계속 진행 (확인 프롬프트 없음)
+    # 그 밖의 오류(잘못된 입력, 버그)는 매 조회마다 반복되므로 중단
+    proceed = classify_error(ex) in ("rail", "connection")
+    msg = msg or f"Exception: {ex}, Type: {type(ex)}"
+    if not proceed:
+        msg += "\n🛑 예매를 중단합니다."
+    print(msg, flush=True)
+    tgprintf = get_telegram()
+    asyncio.run(tgprintf(msg))
+    return proceed
+
+
 if __name__ == "__main__":
     srtgo()
@@ -0,0 +1,1083 @@
+"""
+Concurrent watch engine for the reservation loop.
+
+One logged-in async client (:class:`~srtgo.srt.AsyncSRT` or
+:class:`~srtgo.ktx.AsyncKorail`) polls several search targets - routes and
+departure dates - at once, each at its own pace, and reserves the first matching
+train found on any of them. Searches feed an
+:class:`~srtgo.availability.AvailabilityTracker`; reservations are only attempted
+when a train's seats open up for the requested option.
+"""
+
+import asyncio
+import functools
+import time
+from contextlib import closing
+from curl_cffi.requests.exceptions import ConnectionError
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from json.decoder import JSONDecodeError
+from typing import Callable, List, Optional
+
+from . import events, history, scheduler
+from .availability import Availability, AvailabilityTracker, SeatKey, Transition
+from .pacing import AdaptivePacer, HistoryPacer, RESERVE_INTERVAL, RateController
+from .ktx import AdultPassenger, KorailError, NeedToLoginError, ReserveOption
+from .srt import Adult, SRT, SRTError, SRTNetFunnelError, SRTTrain, SeatType
+
+
+# Seconds before a scheduled start to log in and warm up the connections
+WARMUP_BEFORE = 60
+# Seconds between keep-alive searches while warming up
+KEEPALIVE_INTERVAL = 15
+
+# Log in again in the background once a session is this old (seconds)
+SESSION_MAX_AGE = 20 * 60
+# Error classes hinting at a stale session, and how many in a row trigger a
+# background login
+SESSION_ERROR_KINDS = ("decode", "connection", "unknown")
+SESSION_ERROR_THRESHOLD = 2
+# Seconds before retrying a failed background login
+SESSION_RETRY_INTERVAL = 30
+
+# Timetables repeat weekly: where to borrow train descriptors from when the
+# target date cannot be searched yet
+DESCRIPTOR_FALLBACK_DAYS = 7
+
+# Errors meaning the server is throttling us
+THROTTLE_MESSAGES = ("사용자가 많아 접속이 원활하지 않습니다",)
+
+# Errors that only mean "try again on the next poll"
+RETRYABLE_MESSAGES = {
+    "SRT": (
+        "잔여석없음",
+        "예약대기 접수가 마감되었습니다",
+        "예약대기자한도수초과",
+    ),
+    "KTX": ("Sold out", "잔여석없음", "예약대기자한도수초과"),
+}
+
+
+class WatchAborted(Exception):
+    """Raised when the error handler decides to stop watching."""
+
+
+@dataclass
+class SearchTarget:
+    """One (route, date, time) query watched by :class:`WatchEngine`.
+
+    Args:
+        dep: Departure station name
+        arr: Arrival station name
+        date: Departure date (YYYYMMDD)
+        time: Earliest departure time (HHMMSS)
+        trains: Train numbers to reserve, in order of preference (None: any train)
+        time_limit: Ignore trains departing after this time (HHMMSS)
+        interval: Mean seconds between two searches of this target (starting
+            interval for adaptive pacing)
+        options: Extra keyword arguments for ``search_train``
+        pacer: Rate controller for this target (default: set by the engine)
+    """
+
+    dep: str
+    arr: str
+    date: str
+    time: str = "000000"
+    trains: Optional[List[str]] = None
+    time_limit: Optional[str] = None
+    interval: float = RESERVE_INTERVAL
+    options: dict = field(default_factory=dict)
+    pacer: Optional[RateController] = field(default=None, repr=False, compare=False)
+
+    def __str__(self) -> str:
+        return f"{self.dep}~{self.arr} {self.date[4:6]}/{self.date[6:8]} {self.time[:2]}시"
+
+    def departure(self) -> datetime:
+        """Earliest departure time searched for."""
+        return datetime.strptime(self.date + self.time, "%Y%m%d%H%M%S")
+
+
+def adaptive_pacer(target: SearchTarget) -> RateController:
+    """Default pacing: adaptive, starting from the target's interval."""
+    return AdaptivePacer(
+        interval=target.interval,
+        min_interval=min(0.5, target.interval),
+        max_interval=max(10.0, target.interval),
+        departure=target.departure(),
+    )
+
+
+def history_pacer(rail: str, days: int = 30) -> Callable[[SearchTarget], RateController]:
+    """Pacing that follows the recorded seat openings of each target's route.
+
+    Adaptive pacing scaled by the route's :class:`~srtgo.pacing.HourlyProfile`
+    and, for the target's departure, its :class:`~srtgo.pacing.LeadTimeProfile`
+    from :mod:`srtgo.history`, which must be configured. Payment deadlines are
+    not modelled on their own: the searches do not show when other passengers'
+    unpaid reservations expire, so their releases only show up in these profiles.
+    """
+    path = history.database()
+    if path is None:
+        raise RuntimeError("History pacing needs a history database (--history)")
+
+    def pacing(target: SearchTarget) -> RateController:
+        with closing(history.connect(path)) as conn:
+            profile = history.route_profile(conn, target.dep, target.arr, rail, days)
+            lead = history.route_lead_profile(conn, target.dep, target.arr, rail, days)
+        return HistoryPacer(
+            adaptive_pacer(target),
+            profile,
+            min(0.5, target.interval),
+            lead=lead,
+            departure=target.departure(),
+        )
+
+    return pacing
+
+
+@dataclass
+class WatchResult:
+    target: SearchTarget
+    train: object
+    reservation: object
+
+
+def rail_type(rail) -> str:
+    return "SRT" if isinstance(rail, SRT) else "KTX"
+
+
+def train_number(train) -> str:
+    return train.train_number if isinstance(train, SRTTrain) else train.train_no
+
+
+def assume_seats(train, option) -> None:
+    """Mark the seat class ``option`` books as available on a cached train, so
+    ``reserve`` asks for a seat (not the waiting list) before seeing the search."""
+    special = getattr(option, "name", option) in ("SPECIAL_ONLY", "SPECIAL_FIRST")
+    if isinstance(train, SRTTrain):
+        if special:
+            train.special_seat_state = "예약가능"
+        else:
+            train.general_seat_state = "예약가능"
+    elif special:
+        train.special_seat = "11"
+    else:
+        train.general_seat = "11"
+
+
+def redate(train, date: str) -> None:
+    """Move a train descriptor to another departure date (YYYYMMDD)."""
+    delta = datetime.strptime(date, "%Y%m%d") - datetime.strptime(train.dep_date, "%Y%m%d")
+
+    def shift(value: str) -> str:
+        return (datetime.strptime(value, "%Y%m%d") + delta).strftime("%Y%m%d")
+
+    train.arr_date = shift(train.arr_date)
+    if not isinstance(train, SRTTrain):
+        train.run_date = shift(train.run_date)
+    train.dep_date = date
+
+
+def seat_state(availability: Availability) -> dict:
+    """Compact seat availability of a train for the event log."""
+    return {
+        "train": availability.train_no,
+        "dep": availability.dep_time,
+        "general": availability.general,
+        "special": availability.special,
+        "standby": availability.standby,
+    }
+
+
+def transition_state(transition: Transition) -> dict:
+    """Seat state change of a train for the event log."""
+    return {**seat_state(transition.availability), "change": transition.kind}
+
+
+def classify_error(ex: Exception) -> str:
+    """Sort an exception raised while polling into a handling class.
+
+    Returns one of ``"netfunnel"``, ``"login"``, ``"throttle"``, ``"retry"``,
+    ``"decode"``, ``"connection"``, ``"rail"`` (other SRT/Korail errors) or
+    ``"unknown"``.
+    """
+    if isinstance(ex, SRTError):
+        if isinstance(ex, SRTNetFunnelError) or "정상적인 경로로 접근 부탁드립니다" in ex.msg:
+            return "netfunnel"
+        if "로그인 후 사용하십시오" in ex.msg:
+            return "login"
+        if any(err in ex.msg for err in THROTTLE_MESSAGES):
+            return "throttle"
+        if any(err in ex.msg for err in RETRYABLE_MESSAGES["SRT"]):
+            return "retry"
+        return "rail"
+    if isinstance(ex, KorailError):
+        if isinstance(ex, NeedToLoginError) or "Need to Login" in ex.msg:
+            return "login"
+        if any(err in ex.msg for err in RETRYABLE_MESSAGES["KTX"]):
+            return "retry"
+        return "rail"
+    if isinstance(ex, JSONDecodeError):
+        return "decode"
+    if isinstance(ex, ConnectionError):
+        return "connection"
+    return "unknown"
+
+
+class WatchEngine:
+    """Poll many search targets concurrently and reserve the first match.
+
+    All targets share one login (and, for SRT, one NetFunnel key). Each target is
+    searched at the pace of its own rate controller, which sees the latency and
+    error class of every search; ``max_in_flight`` caps how many searches are
+    outstanding at the same time.
+
+    Args:
+        rail: Logged-in AsyncSRT or AsyncKorail client
+        targets: Search targets to watch
+        passengers: Passengers to reserve for (default: 1 adult)
+        option: SeatType (SRT) or ReserveOption (KTX)
+        deadline: Stop watching at this time and return None
+        max_in_flight: Maximum number of concurrent searches
+        pacing: Creates the rate controller of targets without ``pacer``
+            (default: :func:`adaptive_pacer`; ``GammaPacer`` keeps the fixed pace)
+        on_poll: Called as ``on_poll(target, attempts)`` after every search
+        on_error: Called as ``on_error(ex, msg)`` for unexpected errors; runs in a
+            worker thread so it may block (e.g. prompt). Returning False stops
+            watching with :class:`WatchAborted`.
+        login_guard: :class:`LoginGuard` shared by engines that share one client;
+            its owner runs the login monitor (default: a guard of this engine
+            alone, monitored while :meth:`run` runs)
+        refresh_netfunnel: Keep the SRT NetFunnel key refreshed while running; turn
+            off when the owner of a shared client manages the refresher
+        tracker: Seat state tracker fed by the searches; subscribe to it for
+            notifications or history (default: a tracker of this engine alone,
+            recorded to :mod:`srtgo.history` when that is configured)
+        race: Reserve up to this many trains that opened in the same search at
+            once, keep the most preferred booking and cancel the others
+        poller: :class:`SharedPoller` to take search results from instead of
+            searching; the engine then only reserves, with its own client
+        speculative: With a scheduled start, cache the train descriptors of
+            targets listing ``trains`` while warming up and send the reservation
+            of each target's preferred train right at the start, without
+            searching first; searching starts only if those are rejected
+
+    Examples:
+        >>> async with AsyncSRT(srt_id, srt_pw) as srt:
+        ...     engine = WatchEngine(srt, [
+        ...         SearchTarget("수서", "부산", "20250101", "080000"),
+        ...         SearchTarget("수서", "동대구", "20250102", "080000"),
+        ...     ])
+        ...     result = await engine.run()
+    """
+
+    def __init__(
+        self,
+        rail,
+        targets: List[SearchTarget],
+        passengers: list | None = None,
+        option=None,
+        deadline: datetime | None = None,
+        max_in_flight: int = 4,
+        pacing: Callable[[SearchTarget], RateController] = adaptive_pacer,
+        on_poll: Optional[Callable[[SearchTarget, int], None]] = None,
+        on_error: Optional[Callable[[Exception, Optional[str]], bool]] = None,
+        login_guard: Optional["LoginGuard"] = None,
+        refresh_netfunnel: bool = True,
+        tracker: Optional[AvailabilityTracker] = None,
+        race: int = 1,
+        poller: Optional["SharedPoller"] = None,
+        speculative: bool = False,
+    ) -> None:
+        if not targets:
+            raise ValueError("At least one search target is required")
+
+        self.rail = rail
+        self.rail_type = rail_type(rail)
+        self.targets = targets
+        self.passengers = passengers or [
+            Adult() if self.rail_type == "SRT" else AdultPassenger()
+        ]
+        self.option = option or (
+            SeatType.GENERAL_FIRST if self.rail_type == "SRT" else ReserveOption.GENERAL_FIRST
+        )
+        self.deadline = deadline
+        self.on_poll = on_poll
+        self.on_error = on_error
+        self.attempts = 0
+        self.refresh_netfunnel = refresh_netfunnel and self.rail_type == "SRT"
+        if poller is not None:
+            tracker = poller.tracker
+        elif tracker is None:
+            tracker = AvailabilityTracker()
+            if history.enabled():
+                tracker.subscribe(functools.partial(history.record, self.rail_type))
+        self.tracker = tracker
+        self.race = max(1, race)
+        self.poller = poller
+        self.speculative = speculative
+        self._descriptors: dict = {}
+
+        for target in targets:
+            if target.pacer is None:
+                target.pacer = pacing(target)
+
+        self._login = login_guard or LoginGuard(rail, on_error=on_error)
+        self._own_login = login_guard is None
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._reserve_lock = asyncio.Lock()
+        self._error_lock = asyncio.Lock()
+
+    async def run(self, start: float | None = None) -> Optional[WatchResult]:
+        """Watch until a train is reserved or the deadline passes.
+
+        Args:
+            start: Local timestamp (``time.time()``) of a scheduled start; until
+                then the session is kept warm (see :meth:`warm_up`)
+
+        Returns:
+            WatchResult of the reservation, or None if the deadline passed
+
+        Raises:
+            WatchAborted: If ``on_error`` asked to stop
+        """
+        if self.refresh_netfunnel:
+            # Keep a NetFunnel key ready so no search or reservation waits for it
+            self.rail.start_netfunnel_refresh()
+        if self._own_login:
+            self._login.start_monitor()
+        tasks = []
+        try:
+            if start is not None:
+                await self.warm_up(start)
+                result = await self._reserve_speculatively()
+                if result is not None:
+                    return result
+            watch = self._watch if self.poller is None else self._follow
+            tasks = [asyncio.create_task(watch(target)) for target in self.targets]
+            while True:
+                timeout = (
+                    max(0.0, (self.deadline - datetime.now()).total_seconds())
+                    if self.deadline
+                    else None
+                )
+                done, _ = await asyncio.wait(
+                    tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    return None
+                return done.pop().result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self.refresh_netfunnel:
+                await self.rail.stop_netfunnel_refresh()
+            if self._own_login:
+                await self._login.stop_monitor()
+
+    async def warm_up(self, start: float, keepalive: float = KEEPALIVE_INTERVAL) -> None:
+        """Keep the session ready until ``start``, then return on the dot.
+
+        Makes sure the client is logged in and (with the NetFunnel refresher
+        running) holds a NetFunnel key, and searches the first target every
+        ``keepalive`` seconds and once more shortly before ``start`` so the
+        pooled TLS connections stay open. The first real search goes out over
+        a warm connection right at ``start``.
+
+        With a ``poller`` the engine does not search, so it only logs in (and
+        fetches descriptors when speculative) and waits; keep-alive searches
+        from every account would duplicate the traffic the poller saves.
+        """
+        if not self._logged_in():
+            await self._relogin()
+        elif self._login.due_before(start + WARMUP_BEFORE):
+            # Log in again now rather than in the middle of the opening rush
+            await self._login.refresh("start")
+        if self.speculative:
+            for target in self.targets:
+                if target.trains:
+                    self._descriptors[id(target)] = await self._fetch_descriptors(target)
+        while self.poller is None and (remaining := start - time.time()) > 2:
+            await asyncio.sleep(min(keepalive, remaining - 2))
+            started = time.monotonic()
+            try:
+                await self.rail.search_availability(**self._search_kwargs(self.targets[0]))
+                outcome = "ok"
+            except Exception as ex:
+                # Sales may not be open yet; only a lost login needs fixing
+                outcome = classify_error(ex)
+                if outcome == "login":
+                    await self._relogin()
+            events.emit(
+                "warmup",
+                rail=self.rail_type,
+                latency=events.elapsed(started),
+                outcome=outcome,
+            )
+        await scheduler.async_sleep_until(start)
+
+    async def _fetch_descriptors(self, target: SearchTarget) -> list:
+        """Reservable train objects of the target's trains, most preferred first.
+
+        Searches the target date, or the same route a week earlier when the date
+        is not open for sale yet, and moves those trains to the target date.
+        """
+        kwargs = self._search_kwargs(target)
+        try:
+            availability = await self.rail.search_availability(**kwargs)
+        except Exception:
+            earlier = target.departure() - timedelta(days=DESCRIPTOR_FALLBACK_DAYS)
+            if earlier.date() < datetime.now().date():
+                return []
+            try:
+                availability = await self.rail.search_availability(
+                    **{**kwargs, "date": earlier.strftime("%Y%m%d")}
+                )
+            except Exception:
+                return []
+        trains = []
+        for no in target.trains:
+            if no in availability:
+                train = availability[no].train()
+                if train.dep_date != target.date:
+                    redate(train, target.date)
+                assume_seats(train, self.option)
+                trains.append(train)
+        return trains
+
+    async def _reserve_speculatively(self) -> Optional[WatchResult]:
+        """Reserve the preferred cached train of each target, skipping the search."""
+        for target in self.targets:
+            trains = self._descriptors.get(id(target))
+            if not trains:
+                continue
+            train = trains[0]
+            started = time.monotonic()
+            try:
+                async with self._reserve_lock:
+                    reservation = await self.rail.reserve(
+                        train, passengers=self.passengers, option=self.option
+                    )
+            except Exception as ex:
+                # Rejected (not open, sold out, stale descriptor): search instead
+                kind = classify_error(ex)
+                events.emit(
+                    "reserve",
+                    rail=self.rail_type,
+                    target=str(target),
+                    train=train_number(train),
+                    latency=events.elapsed(started),
+                    outcome=kind,
+                    reason=str(ex)[:200],
+                    speculative=True,
+                )
+                if kind == "login":
+                    await self._relogin()
+                continue
+            events.emit(
+                "reserve",
+                rail=self.rail_type,
+                target=str(target),
+                train=train_number(train),
+                latency=events.elapsed(started),
+                outcome="ok",
+                speculative=True,
+            )
+            return WatchResult(target, train, reservation)
+        return None
+
+    def rates(self) -> dict:
+        """Current search rate (requests per second) of every target."""
+        return {str(target): target.pacer.rate for target in self.targets}
+
+    async def _watch(self, target: SearchTarget) -> WatchResult:
+        while True:
+            if not self._logged_in() and not await self._relogin():
+                # Lost the session and could not log in again: wait for the next poll
+                await asyncio.sleep(target.pacer.next_delay())
+                continue
+            started = None
+            try:
+                async with self._in_flight:
+                    started = time.monotonic()
+                    availability = await self.rail.search_availability(
+                        **self._search_kwargs(target)
+                    )
+                    latency = time.monotonic() - started
+                    target.pacer.observe(latency)
+                    started = None
+                self._login.note_ok()
+                self.attempts += 1
+                history.count_search(self.rail_type, target.dep, target.arr, target.date)
+                transitions = self.tracker.update(
+                    availability, target.date, target.dep, target.arr
+                )
+                if events.enabled():
+                    events.emit(
+                        "search",
+                        rail=self.rail_type,
+                        target=str(target),
+                        attempt=self.attempts,
+                        latency=round(latency, 4),
+                        outcome="ok",
+                        interval=round(target.pacer.interval, 3),
+                        changes=[transition_state(t) for t in transitions],
+                    )
+                if self.on_poll:
+                    self.on_poll(target, self.attempts)
+
+            except Exception as ex:
+                kind = classify_error(ex)
+                if started is not None:
+                    target.pacer.observe(time.monotonic() - started, kind)
+                events.emit(
+                    "search",
+                    rail=self.rail_type,
+                    target=str(target),
+                    attempt=self.attempts,
+                    latency=events.elapsed(started) if started is not None else None,
+                    outcome=kind,
+                    reason=str(ex)[:200],
+                )
+                if not await self._handle_error(ex):
+                    raise WatchAborted(str(ex)) from ex
+
+            else:
+                result = await self._on_search(target, availability, transitions)
+                if result is not None:
+                    return result
+
+            await asyncio.sleep(target.pacer.next_delay())
+
+    async def _follow(self, target: SearchTarget) -> WatchResult:
+        """Reserve from the search results the shared poller publishes for target."""
+        results = asyncio.Queue()
+        unsubscribe = self.poller.subscribe(target, results.put_nowait)
+        try:
+            while True:
+                transitions = await results.get()
+                if isinstance(transitions, Exception):
+                    raise transitions
+                self.attempts += 1
+                if self.on_poll:
+                    self.on_poll(target, self.attempts)
+                result = await self._try_reserve(target, self._candidates(target, transitions))
+                if result is not None:
+                    return result
+        finally:
+            unsubscribe()
+
+    async def _on_search(
+        self, target: SearchTarget, availability: dict, transitions: List[Transition]
+    ) -> Optional[WatchResult]:
+        """Act on a successful search: reserve what opened for us."""
+        return await self._try_reserve(target, self._candidates(target, transitions))
+
+    async def _try_reserve(
+        self, target: SearchTarget, candidates: List[Availability]
+    ) -> Optional[WatchResult]:
+        """Reserve the best of ``candidates``; None if there are none or it failed
+        (the error is handled like a search error)."""
+        if not candidates:
+            return None
+        trains = [candidate.train() for candidate in candidates[: self.race]]
+        started = time.monotonic()
+        try:
+            async with self._reserve_lock:
+                train, reservation = await self._reserve_best(target, trains)
+        except Exception as ex:
+            # Seats that opened in this search were not taken: try them again
+            # on the next search if they still show up
+            for candidate in candidates:
+                self.tracker.invalidate(
+                    SeatKey(candidate.train_no, target.date, target.dep, target.arr)
+                )
+            events.emit(
+                "reserve",
+                rail=self.rail_type,
+                target=str(target),
+                attempt=self.attempts,
+                train=train_number(trains[0]),
+                latency=events.elapsed(started),
+                outcome=classify_error(ex),
+                reason=str(ex)[:200],
+            )
+            if not await self._handle_error(ex):
+                raise WatchAborted(str(ex)) from ex
+            return None
+        events.emit(
+            "reserve",
+            rail=self.rail_type,
+            target=str(target),
+            train=train_number(train),
+            latency=events.elapsed(started),
+            outcome="ok",
+        )
+        return WatchResult(target, train, reservation)
+
+    async def _reserve_best(self, target: SearchTarget, trains: list) -> tuple:
+        """Reserve all ``trains`` at once and keep the most preferred booking.
+
+        The other successful bookings are cancelled. Raises the error of the most
+        preferred train that failed with one if none could be reserved.
+        """
+        if len(trains) == 1:
+            return trains[0], await self.rail.reserve(
+                trains[0], passengers=self.passengers, option=self.option
+            )
+
+        started = time.monotonic()
+        results = await asyncio.gather(
+            *(
+                self.rail.reserve(train, passengers=self.passengers, option=self.option)
+                for train in trains
+            ),
+            return_exceptions=True,
+        )
+        booked = [(t, r) for t, r in zip(trains, results) if not isinstance(r, BaseException)]
+        for train, result in zip(trains, results):
+            if isinstance(result, Exception) and booked:
+                events.emit(
+                    "reserve",
+                    rail=self.rail_type,
+                    target=str(target),
+                    train=train_number(train),
+                    latency=events.elapsed(started),
+                    outcome=classify_error(result),
+                    reason=str(result)[:200],
+                )
+        if not booked:
+            task = asyncio.current_task()
+            cancelling = getattr(task, "cancelling", None)  # Python 3.11+
+            if cancelling is not None and cancelling():
+                raise asyncio.CancelledError()
+            # A leg may have been cancelled on its own; that is not a
+            # cancellation of the engine
+            errors = [r for r in results if isinstance(r, Exception)]
+            if errors:
+                raise errors[0]
+            raise RuntimeError("All reservation requests were cancelled")
+
+        for train, extra in booked[1:]:
+            cancel_started = time.monotonic()
+            try:
+                await self.rail.cancel(extra)
+                outcome = "ok"
+            except Exception as ex:
+                outcome = classify_error(ex)
+                await self._report(ex, f"추가로 잡힌 예약을 취소하지 못했습니다: {extra}")
+            events.emit(
+                "cancel",
+                rail=self.rail_type,
+                target=str(target),
+                train=train_number(train),
+                latency=events.elapsed(cancel_started),
+                outcome=outcome,
+            )
+        return booked[0]
+
+    def _search_kwargs(self, target: SearchTarget) -> dict:
+        total = sum(p.count for p in self.passengers)
+        kwargs = {
+            "dep": target.dep,
+            "arr": target.arr,
+            "date": target.date,
+            "time": target.time,
+        }
+        if self.rail_type == "SRT":
+            kwargs.update(passengers=[Adult(total)], time_limit=target.time_limit)
+        else:
+            kwargs.update(passengers=[AdultPassenger(total)])
+        kwargs.update(target.options)
+        return kwargs
+
+    def _candidates(self, target: SearchTarget, transitions: List[Transition]) -> List[Availability]:
+        """Trains whose seats opened for our option in a search, most preferred first."""
+        opened = {
+            t.key.train_no: t.availability for t in transitions if t.opened_for(self.option)
+        }
+        if target.trains is None:
+            return [
+                a
+                for a in opened.values()
+                if not target.time_limit or a.dep_time <= target.time_limit
+            ]
+        return [opened[no] for no in target.trains if no in opened]
+
+    async def _handle_error(self, ex: Exception) -> bool:
+        kind = classify_error(ex)
+
+        if kind == "netfunnel":
+            self.rail.clear()
+            return True
+        if kind in ("retry", "throttle"):
+            return True
+        if kind == "login":
+            # A failed login is reported by _relogin; the next poll tries again
+            await self._relogin()
+            return True
+        # Possibly a stale session: the login monitor refreshes it in the
+        # background if these keep coming, and the next poll goes ahead
+        self._login.note_error(kind)
+        if kind == "decode":
+            return True
+        if kind == "connection":
+            return await self._report(ex, "연결이 끊겼습니다")
+        return await self._report(ex)
+
+    async def _report(self, ex: Exception, msg: str | None = None) -> bool:
+        if self.on_error is None:
+            return True
+        async with self._error_lock:
+            return await asyncio.to_thread(self.on_error, ex, msg)
+
+    def _logged_in(self) -> bool:
+        return self._login.logged_in()
+
+    async def _relogin(self) -> bool:
+        """Log in again; returns whether the client is logged in afterwards."""
+        error = await self._login.relogin()
+        if error is not None and not await self._report(error, "재로그인에 실패했습니다"):
+            raise WatchAborted(str(error)) from error
+        return self._logged_in()
+
+
+class LoginGuard:
+    """Keeps the login of one client alive for everyone using it.
+
+    Reactively, several targets (or several engines sharing one client) usually
+    hit an expired session at the same time; only the first caller logs in again.
+    Proactively, :meth:`start_monitor` runs a background task that logs in again
+    once the session is ``max_age`` seconds old, or after ``error_threshold``
+    undecodable responses or dropped connections in a row, so searches do not
+    have to fail on an expired session first.
+
+    Logging in again reuses the client: the HTTP session with its pooled
+    connections and the NetFunnel key stay, and the new session cookies replace
+    the old ones when the login response arrives. Requests in flight finish on
+    the old session, and a failed background login keeps using it (reported to
+    ``on_error`` once per run of failures). A failed re-login after the session
+    expired marks the client logged out, so the watch loop logs in again before
+    its next search.
+
+    Args:
+        rail: Async client to keep logged in
+        max_age: Log in again in the background after this many seconds
+        error_threshold: Suspicious errors in a row that trigger a background login
+        on_error: Called as ``on_error(ex, msg)`` in a worker thread when a
+            background login fails (see :class:`WatchEngine`)
+    """
+
+    def __init__(
+        self,
+        rail,
+        max_age: float = SESSION_MAX_AGE,
+        error_threshold: int = SESSION_ERROR_THRESHOLD,
+        on_error: Optional[Callable[[Exception, Optional[str]], bool]] = None,
+    ) -> None:
+        self.rail = rail
+        self.max_age = max_age
+        self.error_threshold = error_threshold
+        self.on_error = on_error
+        self._lock = asyncio.Lock()
+        self._last_attempt = 0.0
+        self._failures = 0
+        # A client handed over logged in is taken as freshly logged in
+        self._logged_in_at = time.monotonic() if self.logged_in() else 0.0
+        self._errors = 0
+        self._wake = asyncio.Event()
+        self._monitor: Optional[asyncio.Task] = None
+
+    def logged_in(self) -> bool:
+        return self.rail.is_login if rail_type(self.rail) == "SRT" else self.rail.logined
+
+    def age(self) -> float:
+        """Seconds since the last successful login."""
+        return time.monotonic() - self._logged_in_at
+
+    def due_before(self, when: float) -> bool:
+        """Whether the background login would fall before ``when`` (``time.time()``)."""
+        return self.age() + max(0.0, when - time.time()) >= self.max_age
+
+    def note_ok(self) -> None:
+        """A request on the session succeeded."""
+        self._errors = 0
+
+    def note_error(self, kind: str) -> None:
+        """A request failed with error class ``kind`` (see :func:`classify_error`)."""
+        if kind not in SESSION_ERROR_KINDS:
+            return
+        self._errors += 1
+        if self._errors >= self.error_threshold:
+            self._wake.set()
+
+    async def login(self, reason: str = "start") -> None:
+        """Log in now; raises if the login fails."""
+        async with self._lock:
+            await self._login(reason)
+
+    async def relogin(self) -> Optional[Exception]:
+        """Log in again after the session expired, once for all callers.
+
+        Callers that waited for another caller's login share its outcome. If
+        the login fails the client counts as logged out.
+
+        Returns:
+            The error of the login this call made; None if it succeeded or
+            another caller made the login
+        """
+        started = time.monotonic()
+        async with self._lock:
+            if self._last_attempt > started:
+                return None
+            try:
+                await self._login("expired")
+            except Exception as ex:
+                self._set_logged_in(False)
+                return ex
+            return None
+
+    async def refresh(self, reason: str = "age") -> bool:
+        """Log in again while the session still works.
+
+        Returns:
+            Whether the login succeeded; if not, the old session stays in use
+        """
+        async with self._lock:
+            was_logged_in = self.logged_in()
+            try:
+                await self._login(reason)
+                self._failures = 0
+                return True
+            except Exception as ex:
+                error = ex
+            if was_logged_in:
+                # A rejected login does not end the old session (KTX clears the flag)
+                self._set_logged_in(True)
+            self._failures += 1
+        if self._failures == 1 and self.on_error is not None:
+            await asyncio.to_thread(
+                self.on_error, error, f"로그인 갱신에 실패했습니다 (기존 세션으로 계속): {error}"
+            )
+        return False
+
+    def start_monitor(self) -> None:
+        """Refresh the login in the background until :meth:`stop_monitor`."""
+        if self._monitor is None or self._monitor.done():
+            self._monitor = asyncio.create_task(self._run_monitor())
+
+    async def stop_monitor(self) -> None:
+        monitor, self._monitor = self._monitor, None
+        if monitor is not None:
+            monitor.cancel()
+            await asyncio.gather(monitor, return_exceptions=True)
+
+    async def _run_monitor(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), max(0.0, self.max_age - self.age()))
+                reason = "errors"
+            except asyncio.TimeoutError:
+                reason = "age"
+            self._wake.clear()
+            if not await self.refresh(reason):
+                await asyncio.sleep(SESSION_RETRY_INTERVAL)
+
+    async def _login(self, reason: str) -> None:
+        started = time.monotonic()
+        error = None
+        try:
+            await self.rail.login()
+            if not self.logged_in():
+                # Korail answers a rejected login with False instead of raising
+                raise KorailError("로그인에 실패했습니다")
+            self._logged_in_at = time.monotonic()
+            self._errors = 0
+        except Exception as ex:
+            error = ex
+            raise
+        finally:
+            self._last_attempt = time.monotonic()
+            events.emit(
+                "relogin",
+                rail=rail_type(self.rail),
+                reason=reason,
+                latency=events.elapsed(started),
+                outcome="ok" if error is None else classify_error(error),
+                **({"error": str(error)[:200]} if error is not None else {}),
+            )
+
+    def _set_logged_in(self, value: bool) -> None:
+        if rail_type(self.rail) == "SRT":
+            self.rail.is_login = value
+        else:
+            self.rail.logined = value
+
+
+def snapshot(target: SearchTarget, availability: dict) -> List[Transition]:
+    """A search result as transitions from "not seen", for new subscribers."""
+    return [
+        Transition(SeatKey(no, target.date, target.dep, target.arr), None, a)
+        for no, a in availability.items()
+    ]
+
+
+class _RouteWatcher(WatchEngine):
+    """Search loop of one route of a :class:`SharedPoller`; publishes instead of
+    reserving."""
+
+    def __init__(self, *args, publish: Callable, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.publish = publish
+        self.last: dict = {}
+
+    async def _on_search(self, target, availability, transitions) -> None:
+        if not self.last:
+            # The shared tracker may remember this route from an earlier watcher
+            transitions = snapshot(target, availability)
+        self.last = availability
+        self.publish(transitions)
+
+
+class SharedPoller:
+    """Searches each route once for every engine (account) that watches it.
+
+    Engines created with ``poller=`` subscribe their targets; targets with the
+    same route, date, time and search options share one search loop on the
+    poller's client, paced by one rate controller, and every subscriber gets
+    the seat transitions of each search to reserve with its own client. The
+    number of searches stays the same however many accounts watch a route.
+
+    Searches are made for one passenger, so openings of a single seat are seen
+    by everyone; engines reserving for more passengers may get 잔여석없음 and
+    try again on the next opening.
+
+    Args:
+        rail: Logged-in async client used for searching
+        login_guard: LoginGuard of ``rail``; its owner runs the login monitor
+            (default: a new one, monitored while routes are searched)
+        pacing: Creates the rate controller of each route
+        on_error: Error handler of the searches (see :class:`WatchEngine`)
+        max_in_flight: Maximum number of concurrent searches
+
+    Examples:
+        >>> poller = SharedPoller(srt_a)
+        >>> engines = [
+        ...     WatchEngine(srt_a, [target], poller=poller),
+        ...     WatchEngine(srt_b, [target], passengers=[Adult(2)], poller=poller),
+        ... ]
+        >>> results = await asyncio.gather(*(engine.run() for engine in engines))
+    """
+
+    def __init__(
+        self,
+        rail,
+        login_guard: Optional["LoginGuard"] = None,
+        pacing: Callable[[SearchTarget], RateController] = adaptive_pacer,
+        on_error: Optional[Callable[[Exception, Optional[str]], bool]] = None,
+        max_in_flight: int = 4,
+    ) -> None:
+        self.rail = rail
+        self.login_guard = login_guard or LoginGuard(rail, on_error=on_error)
+        self._own_login = login_guard is None
+        self.pacing = pacing
+        self.on_error = on_error
+        self.tracker = AvailabilityTracker()
+        if history.enabled():
+            self.tracker.subscribe(functools.partial(history.record, rail_type(rail)))
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._routes: dict = {}
+
+    @staticmethod
+    def route_key(target: SearchTarget) -> tuple:
+        return (
+            target.dep,
+            target.arr,
+            target.date,
+            target.time,
+            tuple(sorted((k, str(v)) for k, v in target.options.items())),
+        )
+
+    def subscribe(self, target: SearchTarget, callback: Callable[[List[Transition]], None]):
+        """Call ``callback(transitions)`` after every search of target's route.
+
+        The first call reports every train of the latest search as new, so a
+        late subscriber sees seats that are already open. If the route's search
+        loop stops on an error (``on_error`` returned False), the callback gets
+        the exception instead.
+
+        Returns:
+            Function that cancels the subscription
+        """
+        key = self.route_key(target)
+        route = self._routes.get(key)
+        if route is None:
+            route = self._routes[key] = self._start_route(target)
+        watcher, subscribers, _ = route
+        subscribers.append(callback)
+        if watcher.last:
+            callback(snapshot(target, watcher.last))
+
+        def unsubscribe() -> None:
+            subscribers.remove(callback)
+            if not subscribers and self._routes.get(key) is route:
+                del self._routes[key]
+                route[2].cancel()
+
+        return unsubscribe
+
+    def routes(self) -> int:
+        """Number of routes being searched."""
+        return len(self._routes)
+
+    async def close(self) -> None:
+        """Stop all search loops."""
+        tasks = [task for _, _, task in self._routes.values()]
+        self._routes.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._own_login:
+            await self.login_guard.stop_monitor()
+
+    def _start_route(self, target: SearchTarget) -> tuple:
+        search_target = SearchTarget(
+            target.dep,
+            target.arr,
+            target.date,
+            target.time,
+            interval=target.interval,
+            options=dict(target.options),
+        )
+        subscribers = []
+
+        def publish(transitions: List[Transition]) -> None:
+            for callback in list(subscribers):
+                callback(transitions)
+
+        watcher = _RouteWatcher(
+            self.rail,
+            [search_target],
+            pacing=self.pacing,
+            on_error=self.on_error,
+            login_guard=self.login_guard,
+            refresh_netfunnel=False,
+            tracker=self.tracker,
+            publish=publish,
+        )
+        watcher._in_flight = self._in_flight
+        if self._own_login:
+            self.login_guard.start_monitor()
+        task = asyncio.create_task(watcher.run())
+
+        def stopped(task: asyncio.Task) -> None:
+            if task.cancelled() or task.exception() is None:
+                return
+            key = self.route_key(search_target)
+            if self._routes.get(key, (None, None, None))[2] is task:
+                del self._routes[key]
+            publish(task.exception())
+
+        task.add_done_callback(stopped)
+        return watcher, subscribers, task
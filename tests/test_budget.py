@@ -0,0 +1,46 @@
+import getpass
+import os
+import threading
+import time
+
+from srtgo import budget, daemon
+
+
+def test_socket_paths_without_user_name(monkeypatch):
+    def no_user():
+        raise OSError("No username set in the environment")
+
+    monkeypatch.setattr(getpass, "getuser", no_user)
+    monkeypatch.delenv(budget.BUDGET_SOCKET_ENV, raising=False)
+    monkeypatch.delenv(daemon.DAEMON_SOCKET_ENV, raising=False)
+    assert budget.socket_path().name == f"srtgo-budget-{os.getuid()}.sock"
+    assert daemon.socket_path().name == f"srtgo-daemon-{os.getuid()}.sock"
+
+
+def test_reservation_lookups_are_urgent():
+    for endpoint in ("reserve", "tickets", "myreservationview", "myreservationlist", "pay"):
+        assert budget.priority_of(endpoint) == budget.URGENT
+    assert budget.priority_of("search_schedule") == budget.NORMAL
+
+
+def test_urgent_requests_are_served_before_queued_searches():
+    bucket = budget.TokenBucket(rate=20, burst=1)
+    bucket.acquire()  # drain the burst
+    order = []
+
+    def take(name, priority):
+        bucket.acquire(priority)
+        order.append(name)
+
+    searches = [
+        threading.Thread(target=take, args=(f"search{i}", budget.priority_of("search_schedule")))
+        for i in range(3)
+    ]
+    for thread in searches:
+        thread.start()
+    time.sleep(0.01)
+    lookup = threading.Thread(target=take, args=("tickets", budget.priority_of("tickets")))
+    lookup.start()
+    for thread in (*searches, lookup):
+        thread.join()
+    assert order.index("tickets") <= 1
@@ -0,0 +1,31 @@
+import asyncio
+import threading
+
+import pytest
+
+from srtgo import daemon
+
+
+@pytest.fixture
+def running_daemon(tmp_path):
+    path = tmp_path / "daemon.sock"
+    d = daemon.Daemon(path=path)
+    thread = threading.Thread(target=lambda: asyncio.run(d.serve()), daemon=True)
+    thread.start()
+    for _ in range(100):
+        if path.exists():
+            break
+        thread.join(0.01)
+    yield path
+    daemon.send_command({"cmd": "shutdown"}, path)
+    thread.join(5)
+
+
+def test_remove_unknown_job(running_daemon):
+    reply = daemon.send_command({"cmd": "remove", "id": "7"}, running_daemon)
+    assert reply == {"ok": False, "error": "Unknown job id: 7"}
+
+
+def test_bad_request_gets_a_reply(running_daemon):
+    reply = daemon.send_command(["not", "an", "object"], running_daemon)
+    assert reply["ok"] is False
@@ -0,0 +1,33 @@
+import time
+from contextlib import closing
+
+from srtgo import history
+from srtgo.pacing import lead_bucket
+
+
+def test_searches_and_openings_by_lead_time(tmp_path):
+    path = tmp_path / "history.db"
+    now = time.time()
+    date = time.strftime("%Y%m%d", time.localtime(now + 3 * 86400))
+    history.configure(path)
+    try:
+        for _ in range(3):
+            history.count_search("SRT", "수서", "부산", date)
+        history.count_search("SRT", "수서", "부산")
+    finally:
+        history.close()
+    with closing(history.connect(path)) as conn:
+        with conn:
+            conn.execute(
+                "INSERT INTO transitions VALUES (?, 'SRT', '수서', '부산', ?, '301', '080000', 0, 1)",
+                (now, date),
+            )
+        searched = history.searches_per_lead(conn, "수서", "부산")
+        opened = history.openings_per_lead(conn, "수서", "부산")
+        profile = history.route_lead_profile(conn, "수서", "부산")
+        assert sum(history.searches_per_hour(conn, "수서", "부산").values()) == 4
+
+    bucket = lead_bucket(3)
+    assert searched[bucket] == 3 and sum(searched.values()) == 3
+    assert opened[bucket] == 1 and sum(opened.values()) == 1
+    assert len(profile.factors) == len(history.LEAD_DAYS)
@@ -0,0 +1,89 @@
+import asyncio
+import contextlib
+import io
+from datetime import datetime, timedelta
+
+import pytest
+
+from srtgo.bench import make_client, search_args
+from srtgo.jobs import JobError, job_from_dict
+from srtgo.mockserver import MockConfig, MockRailServer
+from srtgo.watch import WatchEngine
+
+JOB = {
+    "rail": "SRT",
+    "account": "test",
+    "departure": "수서",
+    "arrival": "부산",
+    "dates": ["20300101"],
+}
+
+
+def job(**fields):
+    return job_from_dict({**JOB, **fields})
+
+
+class OfflineRail:
+    """Stands in for a logged-in client; the engine is only built, not run."""
+
+    is_login = logined = True
+
+
+@pytest.mark.parametrize("pacing", ["adaptive", "fixed"])
+def test_slow_interval_builds_engine(pacing):
+    j = job(interval=15, pacing=pacing)
+    targets = j.targets()
+
+    async def build():
+        return WatchEngine(OfflineRail(), targets, refresh_netfunnel=False)
+
+    engine = asyncio.run(build())
+    assert targets[0].pacer.interval == 15
+    assert engine.rates()[str(targets[0])] == pytest.approx(1 / 15)
+
+
+def test_slow_interval_job_runs_against_mock_server():
+    date = search_args("SRT")[2]
+    j = job(dates=[date], interval=15, duration=1)
+
+    async def run(server):
+        client = make_client(server, "SRT", use_async=True)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                await client.login()
+            engine = WatchEngine(
+                client,
+                j.targets(),
+                deadline=datetime.now() + timedelta(seconds=1),
+                refresh_netfunnel=False,
+            )
+            return engine, await engine.run()
+        finally:
+            await client.close()
+
+    with MockRailServer(MockConfig(latency=0, jitter=0)) as server:
+        server.reset(seats_open_at=60)
+        engine, result = asyncio.run(run(server))
+    assert result is None
+    assert engine.attempts == 1  # searched once, then waits ~15 s
+
+
+def test_unknown_station_is_rejected():
+    with pytest.raises(JobError):
+        job(arrival="없는역")
+
+
+def test_aware_start_at_becomes_local_time():
+    start_at = job(start_at="2030-01-01T07:00:00+09:00").start_at
+    assert start_at.tzinfo is None
+    assert start_at > datetime.now()
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [{}, {"start_at": "2030-01-01 07:00:00"}, {"trains": ["301"]}],
+)
+def test_speculative_needs_start_at_and_trains(fields):
+    with pytest.raises(JobError, match="speculative"):
+        job(speculative=True, **fields)
+    job(speculative=True, **{"start_at": "2030-01-01 07:00:00", "trains": ["301"]})
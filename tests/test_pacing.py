@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from srtgo.pacing import (
+    LEAD_DAYS,
+    AdaptivePacer,
+    GammaPacer,
+    HistoryPacer,
+    HourlyProfile,
+    LeadTimeProfile,
+    lead_bucket,
+)
+from srtgo.watch import SearchTarget, adaptive_pacer
+
+
+def target(interval):
+    return SearchTarget("수서", "부산", "20300101", "080000", interval=interval)
+
+
+def test_adaptive_pacer_accepts_interval_above_default_max():
+    pacer = adaptive_pacer(target(15))
+    assert isinstance(pacer, AdaptivePacer)
+    assert pacer.interval == 15
+    assert pacer.max_interval >= 15
+    assert pacer.next_delay() > 0
+
+
+def test_history_pacer_wraps_slow_adaptive_pacer():
+    pacer = HistoryPacer(adaptive_pacer(target(15)), HourlyProfile.flat())
+    assert pacer.interval == 15
+    assert pacer.next_delay() > 0
+
+
+def test_gamma_pacer_without_room_for_jitter():
+    assert GammaPacer(1.0, minimum=1.0).next_delay() == 1.0
+
+
+def test_lead_bucket():
+    assert [lead_bucket(d) for d in (-1, 0, 1, 2, 5, 7, 20, 45)] == [0, 0, 1, 2, 3, 4, 5, 6]
+
+
+def test_lead_time_profile_favours_openings_and_keeps_effort():
+    searches = dict.fromkeys(range(len(LEAD_DAYS)), 1000)
+    openings = dict.fromkeys(range(len(LEAD_DAYS)), 1)
+    openings[1] = 50
+    profile = LeadTimeProfile.from_counts(openings, searches)
+    assert profile.factors[1] == max(profile.factors)
+    assert sum(profile.factors) / len(profile.factors) == pytest.approx(1.0)
+
+    now = datetime(2030, 1, 1, 12)
+    assert profile.factor(now + timedelta(days=1), now) == profile.factors[1]
+    assert LeadTimeProfile.from_counts({}, searches).factors == LeadTimeProfile.flat().factors
+
+
+def test_history_pacer_scales_by_lead_time():
+    factors = [1.0] * len(LEAD_DAYS)
+    factors[lead_bucket(0)] = 2.0
+    departure = datetime.now() + timedelta(minutes=1)
+    pacer = HistoryPacer(
+        adaptive_pacer(target(4)),
+        HourlyProfile.flat(),
+        lead=LeadTimeProfile(factors),
+        departure=departure,
+    )
+    assert pacer.interval == pytest.approx(pacer.pacer.interval / 2)
@@ -0,0 +1,44 @@
+import asyncio
+import contextlib
+import io
+from datetime import datetime, timedelta
+
+import pytest
+
+from srtgo.bench import PASSWORD, USER_ID, make_client, search_args
+from srtgo.mockserver import MockConfig, MockRailServer, redirect
+from srtgo.srtgo import watch_and_reserve
+from srtgo.watch import SearchTarget
+
+
+def unbudgeted(server):
+    def transport(client):
+        client._budget = None
+        redirect(client, server.url)
+
+    return transport
+
+
+@pytest.mark.parametrize("rail_type", ["SRT", "KTX"])
+def test_watch_reuses_the_login_of_the_search_client(rail_type):
+    dep, arr, date, time = search_args(rail_type)[:4]
+    with MockRailServer(MockConfig(seats_open_at=3600)) as server:
+        rail = make_client(server, rail_type)
+        with contextlib.redirect_stdout(io.StringIO()):
+            rail.login()
+            result = asyncio.run(
+                watch_and_reserve(
+                    rail_type,
+                    USER_ID,
+                    PASSWORD,
+                    [SearchTarget(dep, arr, date, time, interval=0.2)],
+                    [],
+                    None,
+                    deadline=datetime.now() + timedelta(seconds=0.5),
+                    transport=unbudgeted(server),
+                    rail=rail,
+                )
+            )
+        logins = server.state.requests[f"{rail_type}:login"]
+    assert result is None
+    assert logins == 1